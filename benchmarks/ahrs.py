@@ -0,0 +1,84 @@
+"""
+Micro benchmark of the orientation filter over the IMU samples.
+
+Integrates a synthetic recording of a slowly turning device:
+- legacy: IMU.imuAHRSupdate, one call per sample with its fixed 24ms step, as the
+  accelerometer did on every request
+- mahony / madgwick: Ahrs.update() over the whole recording, with the real time steps
+
+Reports samples per second, the share of a CPU it takes at the ODR, and the final
+yaw error against the real one. The legacy yaw is far off, its step is not the real one.
+
+Run it from the root of the project:
+    python -m benchmarks.ahrs --seconds 60 --odr 125
+"""
+import argparse, math, time
+import numpy as np
+
+from pyxavi import Config, Dictionary
+from kleine.lib.accelerometer.ahrs import Ahrs
+from kleine.lib.accelerometer.IMU import IMU
+
+def generate_recording(seconds: float, odr: float) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    A flat device turning at 10 degrees per second, with sensor noise.
+    Returns timestamps, gyroscope in rad/s, acceleration, magnetometer and the real yaw.
+    """
+    rng = np.random.default_rng(1)
+    samples = int(seconds * odr)
+    timestamps = np.arange(samples) / odr
+    rate = math.radians(10)
+    headings = rate * timestamps
+    gyroscope = np.zeros((samples, 3))
+    gyroscope[:, 2] = rate
+    gyroscope += rng.normal(0, 0.002, (samples, 3))
+    acceleration = np.tile([0.0, 0.0, 1.0], (samples, 1)) + rng.normal(0, 0.01, (samples, 3))
+    # The horizontal field turns the other way in the frame of the device
+    magnetometer = np.stack([0.4 * np.cos(headings), -0.4 * np.sin(headings), np.full(samples, -0.9)], axis=1)
+    magnetometer += rng.normal(0, 0.01, (samples, 3))
+    return timestamps, gyroscope, acceleration, magnetometer, headings
+
+def integrate_legacy(gyroscope: np.ndarray, acceleration: np.ndarray, magnetometer: np.ndarray) -> float:
+    imu = IMU.__new__(IMU)
+    imu.q0, imu.q1, imu.q2, imu.q3 = 1.0, 0.0, 0.0, 0.0
+    for (gx, gy, gz), (ax, ay, az), (mx, my, mz) in zip(gyroscope.tolist(), acceleration.tolist(), magnetometer.tolist()):
+        imu.imuAHRSupdate(gx, gy, gz, ax, ay, az, mx, my, mz)
+    return math.atan2(-2 * imu.q1 * imu.q2 - 2 * imu.q0 * imu.q3, 2 * imu.q2 * imu.q2 + 2 * imu.q3 * imu.q3 - 1)
+
+def integrate(algorithm: str, odr: float, recording: tuple) -> float:
+    timestamps, gyroscope, acceleration, magnetometer, _ = recording
+    ahrs = Ahrs(config=Config(params={"accelerometer": {"ahrs": {"algorithm": algorithm}}}), params=Dictionary({}))
+    ahrs.update(timestamps, gyroscope, acceleration, magnetometer, max_step=4 / odr)
+    return math.radians(ahrs.pitch_roll_yaw()[2])
+
+def yaw_error(yaw: float, initial_yaw: float, real_heading: float) -> float:
+    # The yaw of the filter starts at 180 and grows with the rotation around Z
+    return math.degrees((yaw - initial_yaw - real_heading + math.pi) % (2 * math.pi) - math.pi)
+
+def measure(name: str, compute: callable, samples: int, initial_yaw: float, real_heading: float):
+    start = time.perf_counter()
+    yaw = compute()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {samples / elapsed:12.0f} samples/s   yaw error {yaw_error(yaw, initial_yaw, real_heading):8.2f} degrees")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="AHRS benchmark")
+    parser.add_argument("--seconds", type=float, default=60, help="Seconds of recording")
+    parser.add_argument("--odr", type=float, default=125, help="Samples per second of the IMU")
+    args = parser.parse_args()
+
+    recording = generate_recording(args.seconds, args.odr)
+    timestamps, gyroscope, acceleration, magnetometer, headings = recording
+    samples = len(timestamps)
+    real_heading = float(headings[-1])
+    initial_yaw = math.pi
+
+    print(f"{samples} samples, {args.seconds:.0f}s at {args.odr}Hz")
+    legacy_time = measure("legacy", lambda: integrate_legacy(gyroscope, acceleration, magnetometer), samples, initial_yaw, real_heading)
+    for algorithm in [Ahrs.ALGORITHM_MAHONY, Ahrs.ALGORITHM_MADGWICK]:
+        elapsed = measure(algorithm, lambda: integrate(algorithm, args.odr, recording), samples, initial_yaw, real_heading)
+        print(f"{'':<10} x{legacy_time / elapsed:.1f}, {elapsed / args.seconds * 100:.2f}% of a CPU at {args.odr}Hz")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,115 @@
+"""
+Micro benchmark of the speed computed between consecutive GPS fixes.
+
+Computes the speed along a synthetic track of 1Hz fixes:
+- legacy: the per pair code that Calculations used to have (haversine twice, times
+  combined with today's date)
+- per pair: Geodesy, one GeoPoint per fix, reusing the previous one as Main does
+- batch: Geodesy.speeds() over numpy arrays of the whole track, as for the recorded tracks
+
+Checks that all of them get the same speeds.
+
+Run it from the root of the project:
+    python -m benchmarks.geodesy --fixes 36000
+"""
+import argparse, math, time
+from datetime import datetime, date, time as datetime_time, timedelta
+import numpy as np
+
+from kleine.lib.utils.geodesy import Geodesy
+
+def generate_track(fixes: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    A drive of 1Hz fixes from Barcelona at around 50km/h, turning slowly
+    """
+    rng = np.random.default_rng(1)
+    headings = np.radians(np.cumsum(rng.normal(0, 5, fixes)))
+    steps = rng.normal(14, 2, fixes)
+    latitudes = 41.3851 + np.cumsum(steps * np.cos(headings)) / 111320
+    longitudes = 2.1734 + np.cumsum(steps * np.sin(headings)) / (111320 * math.cos(math.radians(41.3851)))
+    timestamps = np.arange(fixes, dtype=np.float64)
+    return latitudes, longitudes, timestamps
+
+def to_times(timestamps: np.ndarray) -> list[datetime_time]:
+    # Starting in the morning, the legacy code can't cross midnight
+    start = datetime.combine(date.today(), datetime_time(8, 0, 0))
+    return [(start + timedelta(seconds=float(seconds))).time() for seconds in timestamps]
+
+def legacy_speed(previous_point: dict, current_point: dict, previous_time: datetime_time, current_time: datetime_time) -> float:
+    from math import radians, sin, cos, sqrt, atan2
+
+    R = 6371.0
+    lat1 = radians(previous_point["latitude"])
+    lon1 = radians(previous_point["longitude"])
+    lat2 = radians(current_point["latitude"])
+    lon2 = radians(current_point["longitude"])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    distance_nm = R * c * 0.539957
+
+    current_date = date.today()
+    previous_seconds = datetime.combine(current_date, previous_time).timestamp()
+    current_seconds = datetime.combine(current_date, current_time).timestamp()
+    time_diff_secs = current_seconds - previous_seconds
+    speed_knots = distance_nm / (time_diff_secs / 3600) if time_diff_secs > 0 else 0.0
+    return speed_knots * 1.852
+
+def speeds_legacy(latitudes: list[float], longitudes: list[float], times: list[datetime_time]) -> list[float]:
+    speeds = []
+    previous_point = {"latitude": latitudes[0], "longitude": longitudes[0]}
+    for index in range(1, len(latitudes)):
+        current_point = {"latitude": latitudes[index], "longitude": longitudes[index]}
+        speeds.append(legacy_speed(previous_point, current_point, times[index - 1], times[index]))
+        previous_point = current_point
+    return speeds
+
+def speeds_per_pair(latitudes: list[float], longitudes: list[float], times: list[datetime_time]) -> list[float]:
+    speeds = []
+    previous_point = Geodesy.point(latitudes[0], longitudes[0])
+    for index in range(1, len(latitudes)):
+        current_point = Geodesy.point(latitudes[index], longitudes[index])
+        speeds.append(Geodesy.speed_kmh(
+            Geodesy.distance_between(previous_point, current_point),
+            Geodesy.seconds_between(times[index - 1], times[index])
+        ))
+        previous_point = current_point
+    return speeds
+
+def measure(name: str, compute: callable, rounds: int) -> float:
+    compute()  # Warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compute()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{name:<10} {elapsed * 1000:10.2f} ms")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="Geodesy benchmark")
+    parser.add_argument("--fixes", type=int, default=36000, help="Fixes in the track, 36000 is 10h at 1Hz")
+    parser.add_argument("--rounds", type=int, default=5, help="Times the whole track is computed per case")
+    args = parser.parse_args()
+
+    latitudes, longitudes, timestamps = generate_track(args.fixes)
+    latitudes_list, longitudes_list = latitudes.tolist(), longitudes.tolist()
+    times = to_times(timestamps)
+
+    legacy = np.array(speeds_legacy(latitudes_list, longitudes_list, times))
+    per_pair = np.array(speeds_per_pair(latitudes_list, longitudes_list, times))
+    batch = Geodesy.speeds(latitudes, longitudes, timestamps)
+    assert np.allclose(legacy, per_pair, atol=1e-6), "The per pair speeds differ from the legacy ones"
+    assert np.allclose(legacy, batch, atol=1e-6), "The batch speeds differ from the legacy ones"
+
+    print(f"{args.fixes} fixes, mean speed {batch.mean():.1f} km/h, {args.rounds} rounds")
+    legacy_time = measure("legacy", lambda: speeds_legacy(latitudes_list, longitudes_list, times), args.rounds)
+    per_pair_time = measure("per pair", lambda: speeds_per_pair(latitudes_list, longitudes_list, times), args.rounds)
+    batch_time = measure("batch", lambda: Geodesy.speeds(latitudes, longitudes, timestamps), args.rounds)
+    print(f"Speed up per pair: x{legacy_time / per_pair_time:.1f}, batch: x{legacy_time / batch_time:.1f}")
+
+if __name__ == "__main__":
+    run()
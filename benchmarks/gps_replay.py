@@ -0,0 +1,48 @@
+"""
+Throughput of the whole GPS path: framing aside, every sentence of a NMEA log goes
+through the NmeaReplay in fast mode, the same parsing and merging as the NMEAReader,
+and the FixStream that the rest of the app listens to.
+
+Uses a synthetic log of a multi constellation receiver unless a recorded one is given.
+
+Run it from the root of the project:
+    python -m benchmarks.gps_replay --epochs 3600
+    python -m benchmarks.gps_replay --log storage/gps/recorded.nmea
+"""
+import argparse, os, tempfile, time
+from pyxavi import Config, Dictionary
+
+from kleine.lib.gps.nmea_replay import NmeaReplay
+from benchmarks.nmea_log import generate_nmea_log
+
+def run():
+    parser = argparse.ArgumentParser(description="GPS replay throughput benchmark")
+    parser.add_argument("--log", type=str, default=None, help="Recorded NMEA log. A synthetic one is used if missing")
+    parser.add_argument("--epochs", type=int, default=3600, help="Seconds of synthetic log")
+    args = parser.parse_args()
+
+    log_path = args.log
+    if log_path is None:
+        handle, log_path = tempfile.mkstemp(suffix=".nmea")
+        with os.fdopen(handle, "wb") as file:
+            file.writelines(generate_nmea_log(epochs=args.epochs))
+
+    config = Config(params={
+        "logger": {"loglevel": 30, "file": {"active": False}, "stdout": {"active": False}},
+        "gps": {"activate_logging": False, "replay_file": log_path, "replay": {"mode": NmeaReplay.MODE_FAST, "loop": False}},
+    })
+    start = time.perf_counter()
+    replay = NmeaReplay(config=config, params=Dictionary({}))
+    replay.receiver_thread.join()
+    elapsed = time.perf_counter() - start
+    replay.close()
+    fixes = replay.get_latest_fix().sequence
+
+    if args.log is None:
+        os.remove(log_path)
+
+    print(f"{replay.sentences_replayed} sentences, {fixes} fixes in {elapsed:.2f}s")
+    print(f"{replay.sentences_replayed / elapsed:10.0f} sentences/s {fixes / elapsed:10.0f} fixes/s")
+
+if __name__ == "__main__":
+    run()
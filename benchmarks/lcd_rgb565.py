@@ -0,0 +1,71 @@
+"""
+Micro benchmark of the host side cost of sending a frame to the ST7789.
+
+Compares the legacy path (fancy indexed RGB565, flatten().tolist() and 4096 element
+chunks for spidev.writebytes) with the Rgb565Converter buffer handed to writebytes2.
+The SPI device is replaced by a sink, so the wire time is not measured: only the
+CPU time spent in Python and NumPy before the bytes reach spidev.
+
+Run it from the root of the project:
+    python -m benchmarks.lcd_rgb565 --frames 100
+"""
+import argparse, time
+import numpy as np
+
+from kleine.lib.lcd.rgb565 import Rgb565Converter
+
+WIDTH = 320
+HEIGHT = 240
+
+def synthetic_image(seed: int = 0) -> np.ndarray:
+    # Random noise plus a gradient, so there is nothing the conversion can take advantage of
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    image[..., 0] = np.linspace(0, 255, WIDTH, dtype=np.uint8)
+    return image
+
+def legacy_path(img: np.ndarray, sink: list):
+    pix = np.zeros((HEIGHT, WIDTH, 2), dtype=np.uint8)
+    pix[...,[0]] = np.add(np.bitwise_and(img[...,[0]],0xF8),np.right_shift(img[...,[1]],5))
+    pix[...,[1]] = np.add(np.bitwise_and(np.left_shift(img[...,[1]],3),0xE0), np.right_shift(img[...,[2]],3))
+    pix = pix.flatten().tolist()
+    for i in range(0, len(pix), 4096):
+        # spidev.writebytes() copies every list element into its own C buffer
+        sink[0] += len(bytes(pix[i:i+4096]))
+
+def buffer_path(img: np.ndarray, sink: list, converter: Rgb565Converter):
+    pix = converter.convert(img)
+    # spidev.writebytes2() reads the buffer directly
+    sink[0] += pix.nbytes
+
+def measure(name: str, frames: int, callback: callable):
+    callback()  # Warm up
+    start = time.perf_counter()
+    for _ in range(frames):
+        callback()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {frames / elapsed:10.1f} frames/s {elapsed / frames * 1000:10.3f} ms/frame")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="RGB888 to RGB565 conversion and SPI hand-off benchmark")
+    parser.add_argument("--frames", type=int, default=100, help="Frames to convert per path")
+    args = parser.parse_args()
+
+    image = synthetic_image()
+    converter = Rgb565Converter(WIDTH, HEIGHT)
+
+    # Both paths must produce exactly the same bytes
+    legacy = np.zeros((HEIGHT, WIDTH, 2), dtype=np.uint8)
+    legacy[...,[0]] = np.add(np.bitwise_and(image[...,[0]],0xF8),np.right_shift(image[...,[1]],5))
+    legacy[...,[1]] = np.add(np.bitwise_and(np.left_shift(image[...,[1]],3),0xE0), np.right_shift(image[...,[2]],3))
+    assert legacy.tobytes() == bytes(converter.convert(image)), "The RGB565 outputs differ"
+
+    print(f"Frame of {WIDTH}x{HEIGHT}, {WIDTH * HEIGHT * 2} bytes, {args.frames} frames")
+    sink = [0]
+    legacy_time = measure("legacy", args.frames, lambda: legacy_path(image, sink))
+    buffer_time = measure("buffer", args.frames, lambda: buffer_path(image, sink, converter))
+    print(f"Speed up: x{legacy_time / buffer_time:.1f}")
+
+if __name__ == "__main__":
+    run()
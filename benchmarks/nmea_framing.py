@@ -0,0 +1,113 @@
+"""
+CPU cost of the GPS reader thread, reading a NMEA stream from a serial port.
+
+A pseudo terminal stands in for the GPS UART: a writer thread sends the log at the
+given baud rate and the reader thread goes through a real pyserial port, so every
+read() and readline() costs what it costs on the device. Three readers are compared:
+- readline: readline(), decode, strip and pynmea2.parse(), as the reader used to do
+- readline + fast parser: readline() and the NmeaParser
+- framer + fast parser: the NmeaFramer reading what is waiting and the NmeaParser
+
+The CPU time of the reader thread comes from time.thread_time().
+
+Run it from the root of the project (Linux or macOS):
+    python -m benchmarks.nmea_framing --epochs 30 --baud 115200
+"""
+import argparse, os, threading, time
+import pynmea2, serial
+
+from kleine.lib.gps.nmea_framer import NmeaFramer
+from kleine.lib.gps.nmea_parser import NmeaParser
+from benchmarks.nmea_log import generate_nmea_log, load_nmea_log
+
+def read_with_readline(port: serial.Serial, total: int):
+    count = 0
+    while count < total:
+        line = port.readline().decode("ascii", errors="replace").strip()
+        if line == "":
+            continue
+        count += 1
+        if not line.startswith("$"):
+            continue
+        try:
+            pynmea2.parse(line)
+        except pynmea2.ParseError:
+            pass
+
+def read_with_readline_and_fast_parser(port: serial.Serial, total: int):
+    count = 0
+    while count < total:
+        line = port.readline()
+        if len(line) == 0:
+            continue
+        count += 1
+        try:
+            NmeaParser.parse(line)
+        except pynmea2.ParseError:
+            pass
+
+def read_with_framer_and_fast_parser(port: serial.Serial, total: int):
+    framer = NmeaFramer()
+    count = 0
+    while count < total:
+        framer.read_from(port)
+        for line in framer.sentences():
+            count += 1
+            try:
+                NmeaParser.parse(line)
+            except pynmea2.ParseError:
+                pass
+
+def write_paced(fd: int, data: bytes, baud: int):
+    """
+    Send the data as a UART would: 10 bits per byte, in chunks of a 16 bytes FIFO
+    """
+    chunk_size = 16
+    seconds_per_chunk = chunk_size * 10 / baud
+    start = time.perf_counter()
+    for index, offset in enumerate(range(0, len(data), chunk_size)):
+        delay = start + index * seconds_per_chunk - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        os.write(fd, data[offset:offset + chunk_size])
+
+def measure(name: str, reader: callable, lines: list[bytes], baud: int) -> float:
+    master, slave = os.openpty()
+    port = serial.Serial(os.ttyname(slave), baud, timeout=1)
+    result = {}
+
+    def reader_thread():
+        start = time.thread_time()
+        reader(port, len(lines))
+        result["cpu"] = time.thread_time() - start
+
+    thread = threading.Thread(target=reader_thread)
+    wall_start = time.perf_counter()
+    thread.start()
+    write_paced(master, b"".join(lines), baud)
+    thread.join()
+    wall = time.perf_counter() - wall_start
+    port.close()
+    os.close(master)
+    os.close(slave)
+
+    cpu = result["cpu"]
+    print(f"{name:<24} {cpu * 1000:9.1f} ms CPU {cpu / len(lines) * 1000000:8.1f} us/sentence {cpu / wall * 100:6.2f}% of {wall:.1f}s")
+    return cpu
+
+def run():
+    parser = argparse.ArgumentParser(description="GPS reader thread CPU benchmark")
+    parser.add_argument("--log", type=str, default=None, help="Recorded NMEA log. A synthetic one is used if missing")
+    parser.add_argument("--epochs", type=int, default=30, help="Seconds of synthetic log")
+    parser.add_argument("--baud", type=int, default=115200, help="Serial speed to simulate")
+    args = parser.parse_args()
+
+    lines = load_nmea_log(args.log) if args.log is not None else generate_nmea_log(epochs=args.epochs)
+    print(f"{len(lines)} sentences, {sum(len(line) for line in lines)} bytes at {args.baud} baud")
+    legacy = measure("readline", read_with_readline, lines, args.baud)
+    measure("readline + fast parser", read_with_readline_and_fast_parser, lines, args.baud)
+    framed = measure("framer + fast parser", read_with_framer_and_fast_parser, lines, args.baud)
+    print(f"CPU reduction: x{legacy / framed:.1f}")
+
+if __name__ == "__main__":
+    run()
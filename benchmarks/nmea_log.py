@@ -0,0 +1,91 @@
+"""
+Generates a synthetic NMEA log, like the one a multi constellation receiver sends.
+
+Every epoch (one per second by default) has the sentences a BN-880 sends with GPS,
+GLONASS, Galileo and BeiDou enabled: GGA, GLL, RMC, VTG, one GSA per constellation
+and the GSV sentences with the satellites in view. The position moves along a
+straight line at a constant speed, so the fixes change on every epoch.
+
+It is used by the NMEA benchmarks when no recorded log is given. It can also write
+the log into a file:
+    python -m benchmarks.nmea_log --epochs 3600 --output storage/gps/synthetic.nmea
+"""
+import argparse, math
+from datetime import datetime, timedelta, timezone
+
+def checksum(body: str) -> str:
+    value = 0
+    for char in body.encode("ascii"):
+        value ^= char
+    return f"{value:02X}"
+
+def sentence(body: str) -> bytes:
+    return f"${body}*{checksum(body)}\r\n".encode("ascii")
+
+def degrees_to_nmea(value: float, degree_digits: int) -> tuple[str, bool]:
+    """
+    Signed decimal degrees into "ddmm.mmmmm" and whether it is positive
+    """
+    absolute = abs(value)
+    degrees = int(absolute)
+    minutes = (absolute - degrees) * 60
+    return f"{degrees:0{degree_digits}d}{minutes:08.5f}", value >= 0
+
+def generate_nmea_log(epochs: int = 600, interval: float = 1.0, latitude: float = 41.3851, longitude: float = 2.1734,
+                      speed_kmh: float = 36.0, heading: float = 45.0) -> list[bytes]:
+    """
+    Returns the lines of the log, each one ending with "\\r\\n"
+    """
+    lines = []
+    start = datetime(2025, 6, 1, 10, 0, 0, tzinfo=timezone.utc)
+    meters_per_epoch = speed_kmh / 3.6 * interval
+    for epoch in range(epochs):
+        now = start + timedelta(seconds=epoch * interval)
+        hhmmss = now.strftime("%H%M%S") + f".{now.microsecond // 10000:02d}"
+        ddmmyy = now.strftime("%d%m%y")
+        distance = meters_per_epoch * epoch
+        lat = latitude + distance * math.cos(math.radians(heading)) / 111320
+        lon = longitude + distance * math.sin(math.radians(heading)) / (111320 * math.cos(math.radians(latitude)))
+        lat_text, north = degrees_to_nmea(lat, 2)
+        lon_text, east = degrees_to_nmea(lon, 3)
+        lat_dir = "N" if north else "S"
+        lon_dir = "E" if east else "W"
+        altitude = 12.0 + (epoch % 50) / 10
+        knots = speed_kmh / 1.852
+
+        lines.append(sentence(f"GNGGA,{hhmmss},{lat_text},{lat_dir},{lon_text},{lon_dir},1,12,0.80,{altitude:.1f},M,49.5,M,,"))
+        lines.append(sentence(f"GNGLL,{lat_text},{lat_dir},{lon_text},{lon_dir},{hhmmss},A,A"))
+        lines.append(sentence(f"GNRMC,{hhmmss},A,{lat_text},{lat_dir},{lon_text},{lon_dir},{knots:.3f},{heading:.2f},{ddmmyy},,,A"))
+        lines.append(sentence(f"GNVTG,{heading:.2f},T,,M,{knots:.3f},N,{speed_kmh:.3f},K,A"))
+        for system_id in range(1, 5):
+            lines.append(sentence(f"GNGSA,A,3,{system_id:02d},{system_id + 4:02d},{system_id + 8:02d},,,,,,,,,,1.40,0.80,1.15,{system_id}"))
+        for talker in ["GP", "GL", "GA", "GB"]:
+            satellites = [(10 + index, 20 + (index * 7) % 70, (index * 37) % 360, 30 + index % 20) for index in range(10)]
+            messages = math.ceil(len(satellites) / 4)
+            for message in range(messages):
+                group = satellites[message * 4:(message + 1) * 4]
+                details = ",".join(f"{prn:02d},{elevation:02d},{azimuth:03d},{snr:02d}" for prn, elevation, azimuth, snr in group)
+                lines.append(sentence(f"{talker}GSV,{messages},{message + 1},{len(satellites):02d},{details}"))
+    return lines
+
+def load_nmea_log(path: str) -> list[bytes]:
+    """
+    Lines of a recorded log, each one ending with "\\r\\n"
+    """
+    with open(path, "rb") as file:
+        return [line.rstrip(b"\r\n") + b"\r\n" for line in file if line.strip()]
+
+def run():
+    parser = argparse.ArgumentParser(description="Synthetic NMEA log generator")
+    parser.add_argument("--epochs", type=int, default=600, help="Seconds of log to generate")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between fixes")
+    parser.add_argument("--output", type=str, required=True, help="File to write the log into")
+    args = parser.parse_args()
+
+    lines = generate_nmea_log(epochs=args.epochs, interval=args.interval)
+    with open(args.output, "wb") as file:
+        file.writelines(lines)
+    print(f"Written {len(lines)} sentences into {args.output}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+"""
+Micro benchmark of the NMEA sentence parsing done in the GPS reader thread.
+
+Parses a log with pynmea2, the way the reader used to (decode, strip, parse and then
+pick the fields from the GGA/RMC/GLL objects), and with the NmeaParser fast path.
+Checks that both get the same values from every GGA, RMC and GLL sentence.
+
+Uses a synthetic log of a multi constellation receiver unless a recorded one is given.
+
+Run it from the root of the project:
+    python -m benchmarks.nmea_parser --epochs 600
+    python -m benchmarks.nmea_parser --log storage/gps/recorded.nmea
+"""
+import argparse, time
+import pynmea2
+
+from kleine.lib.gps.nmea_parser import NmeaParser
+from benchmarks.nmea_log import generate_nmea_log, load_nmea_log
+
+FIELDS = ["timestamp", "latitude", "longitude", "lat_dir", "lon_dir", "status", "gps_qual",
+          "num_sats", "altitude", "altitude_units", "spd_over_grnd", "true_course", "datestamp"]
+
+def parse_with_pynmea2(lines: list[bytes]) -> list[dict]:
+    results = []
+    for raw in lines:
+        line = raw.decode("ascii", errors="replace").strip()
+        if not line.startswith("$"):
+            continue
+        try:
+            msg = pynmea2.parse(line)
+        except pynmea2.ParseError:
+            continue
+        if isinstance(msg, (pynmea2.types.talker.GGA, pynmea2.types.talker.RMC, pynmea2.types.talker.GLL)):
+            results.append({field: getattr(msg, field) if hasattr(msg, field) else None for field in FIELDS})
+    return results
+
+def parse_with_fast_path(lines: list[bytes]) -> list[dict]:
+    results = []
+    for line in lines:
+        try:
+            sentence = NmeaParser.parse(line)
+        except pynmea2.ParseError:
+            continue
+        if sentence is not None:
+            results.append({field: getattr(sentence, field) for field in FIELDS})
+    return results
+
+def normalise(values: dict) -> dict:
+    # pynmea2 gives the number of satellites as text
+    values = dict(values)
+    if values["num_sats"] is not None:
+        values["num_sats"] = int(values["num_sats"])
+    return values
+
+def measure(name: str, parse: callable, lines: list[bytes], rounds: int) -> float:
+    parse(lines)  # Warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse(lines)
+    elapsed = time.perf_counter() - start
+    sentences = len(lines) * rounds
+    print(f"{name:<10} {sentences / elapsed:12.0f} sentences/s {elapsed / sentences * 1000000:8.2f} us/sentence")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="NMEA parsing benchmark")
+    parser.add_argument("--log", type=str, default=None, help="Recorded NMEA log. A synthetic one is used if missing")
+    parser.add_argument("--epochs", type=int, default=600, help="Seconds of synthetic log")
+    parser.add_argument("--rounds", type=int, default=5, help="Times the whole log is parsed per case")
+    args = parser.parse_args()
+
+    lines = load_nmea_log(args.log) if args.log is not None else generate_nmea_log(epochs=args.epochs)
+
+    legacy = [normalise(values) for values in parse_with_pynmea2(lines)]
+    fast = parse_with_fast_path(lines)
+    assert legacy == fast, "The fast path parser does not get the same values as pynmea2"
+
+    print(f"{len(lines)} sentences, {len(fast)} of them GGA/RMC/GLL, {args.rounds} rounds")
+    legacy_time = measure("pynmea2", parse_with_pynmea2, lines, args.rounds)
+    fast_time = measure("fast path", parse_with_fast_path, lines, args.rounds)
+    print(f"Speed up: x{legacy_time / fast_time:.1f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,77 @@
+"""
+Micro benchmark of the decoding of the IMU registers.
+
+Decodes random blocks as they come from smbus2 (lists of bytes):
+- legacy: shifts and the if >= 32767: -= 65535 chains that IMU.QMI8658_Gyro_Accel_Read had
+- registers: Registers.int16_le over the 12 bytes of a read
+- per frame: the FIFO drain decoded as 12 bytes reads, with the legacy code
+- array: Registers.int16_array over the whole FIFO drain
+
+Checks every result against int.from_bytes(signed=True) and counts the values that
+the legacy code got wrong: with 65535 instead of 65536 every negative value is 1 off.
+
+Run it from the root of the project:
+    python -m benchmarks.registers --reads 20000 --frames 128
+"""
+import argparse, time
+import numpy as np
+
+from kleine.lib.utils.registers import Registers
+
+def legacy_decode(data: list[int]) -> tuple[int, ...]:
+    values = [(data[1]<<8)|data[0], (data[3]<<8)|data[2], (data[5]<<8)|data[4],
+              (data[7]<<8)|data[6], (data[9]<<8)|data[8], (data[11]<<8)|data[10]]
+    for index in range(6):
+        if values[index]>=32767:
+            values[index]=values[index]-65535
+        elif values[index]<=-32767:
+            values[index]=values[index]+65535
+    return tuple(values)
+
+def reference_decode(data: list[int]) -> tuple[int, ...]:
+    return tuple(int.from_bytes(bytes(data[index:index + 2]), "little", signed=True) for index in range(0, len(data), 2))
+
+def measure(name: str, compute: callable, values: int) -> float:
+    start = time.perf_counter()
+    compute()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {elapsed * 1000:10.2f} ms   {elapsed / values * 1e9:8.1f} ns per value")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="Register decoding benchmark")
+    parser.add_argument("--reads", type=int, default=20000, help="12 bytes reads of accelerometer and gyroscope")
+    parser.add_argument("--frames", type=int, default=128, help="Frames in a FIFO drain")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    reads = rng.integers(0, 256, (args.reads, 12)).tolist()
+    # Make sure that the extremes are there
+    reads[0] = [0x00, 0x80, 0xFF, 0xFF, 0xFF, 0x7F, 0x01, 0x80, 0xFE, 0xFF, 0x00, 0x00]
+    drain = rng.integers(0, 256, args.frames * 12).tolist()
+
+    expected = [reference_decode(read) for read in reads]
+    legacy = [legacy_decode(read) for read in reads]
+    decoded = [Registers.int16_le(read, 6) for read in reads]
+    assert decoded == expected, "Registers.int16_le differs from the reference"
+    wrong = sum(a != b for legacy_read, read in zip(legacy, expected) for a, b in zip(legacy_read, read))
+    print(f"Legacy decoding got {wrong} of {args.reads * 6} values wrong")
+
+    array = Registers.int16_array(drain).reshape(-1, 6)
+    assert array.tolist() == [list(reference_decode(drain[index:index + 12])) for index in range(0, len(drain), 12)], \
+        "Registers.int16_array differs from the reference"
+
+    print(f"{args.reads} reads of 12 bytes")
+    legacy_time = measure("legacy", lambda: [legacy_decode(read) for read in reads], args.reads * 6)
+    registers_time = measure("registers", lambda: [Registers.int16_le(read, 6) for read in reads], args.reads * 6)
+    print(f"Speed up: x{legacy_time / registers_time:.1f}")
+
+    rounds = max(1, args.reads // args.frames)
+    print(f"{rounds} FIFO drains of {args.frames} frames")
+    frames = [drain[index:index + 12] for index in range(0, len(drain), 12)]
+    per_frame_time = measure("per frame", lambda: [[legacy_decode(frame) for frame in frames] for _ in range(rounds)], rounds * args.frames * 6)
+    array_time = measure("array", lambda: [Registers.int16_array(drain).reshape(-1, 6) for _ in range(rounds)], rounds * args.frames * 6)
+    print(f"Speed up: x{per_frame_time / array_time:.1f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,93 @@
+"""
+Micro benchmark of the shared status bar (header and footer) rendering.
+
+Draws the full status header and the footer of the Power module (the one with the
+three buttons) over and over, with and without the TextCache, and checks that both
+produce the same pixels.
+
+The emoji font is not shipped in the repository; when it is missing the benchmark
+falls back to Font01.ttf, so the emojis render as missing glyphs but the work done
+per text is comparable.
+
+Run it from the root of the project:
+    python -m benchmarks.status_bar --frames 500
+"""
+import argparse, os, time
+from pyxavi import Dictionary
+from PIL import Image, ImageDraw, ImageFont, ImageChops
+
+from kleine.lib.canvas.canvas import Canvas
+from kleine.lib.canvas.text_cache import TextCache
+from kleine.lib.modules.helpers import ScreenSections
+from kleine.lib.objects.module_definitions import ModuleDefinitions
+from kleine.lib.objects.gps_signal_quality import GPSSignalQuality
+from kleine.lib.objects.point import Point
+
+WIDTH = 320
+HEIGHT = 240
+
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    font_file = Canvas.FONT_FILE
+    if not os.path.exists(font_file):
+        font_file = os.path.join(Canvas.DEFAULT_FONT_PATH, "Font01.ttf")
+    return ImageFont.truetype(font_file, size)
+
+def status_bar_parameters(text_cache: TextCache = None) -> Dictionary:
+    return Dictionary({
+        "screen_size": Point(WIDTH, HEIGHT),
+        "statusbar_font": load_font(Canvas.DEFAULT_FONT_SIZE_SMALL),
+        "statusbar_font_emoji": load_font(Canvas.DEFAULT_FONT_SIZE_SMALL_EMOJI),
+        "statusbar_font_color": (255, 255, 255),
+        "statusbar_nav_icon": "⛔️",
+        "current_module": ModuleDefinitions.POWER,
+        "battery_percentage": 80,
+        "battery_is_charging": False,
+        "temperature": 21.5,
+        "gps_signal_quality": GPSSignalQuality.SIGNAL_GOOD,
+        "wifi_signal_strength": 60,
+        "text_cache": text_cache,
+        "color": {
+            "white": (255, 255, 255),
+            "green": (0, 255, 0),
+            "red": (255, 0, 0),
+            "blue": (0, 0, 255),
+            "yellow": (255, 255, 0),
+            "orange": (255, 165, 0),
+        },
+    })
+
+def render(parameters: Dictionary) -> Image.Image:
+    image = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    ScreenSections.shared_status_header(draw, parameters)
+    ScreenSections.shared_status_footer(draw, parameters)
+    return image
+
+def measure(name: str, frames: int, parameters: Dictionary) -> float:
+    render(parameters)  # Warm up, and fills the cache
+    start = time.perf_counter()
+    for _ in range(frames):
+        render(parameters)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {frames / elapsed:10.1f} frames/s {elapsed / frames * 1000:10.3f} ms/frame")
+    return elapsed
+
+def run():
+    parser = argparse.ArgumentParser(description="Status bar rendering benchmark")
+    parser.add_argument("--frames", type=int, default=500, help="Status bars to render per case")
+    args = parser.parse_args()
+
+    text_cache = TextCache()
+    uncached_parameters = status_bar_parameters()
+    cached_parameters = status_bar_parameters(text_cache)
+
+    difference = ImageChops.difference(render(uncached_parameters), render(cached_parameters)).getbbox()
+    assert difference is None, f"The cached status bar differs in {difference}"
+
+    print(f"Status header and footer, {args.frames} frames")
+    uncached_time = measure("uncached", args.frames, uncached_parameters)
+    cached_time = measure("cached", args.frames, cached_parameters)
+    print(f"Speed up: x{uncached_time / cached_time:.1f} ({len(text_cache)} sprites, {text_cache.hits} hits, {text_cache.misses} misses)")
+
+if __name__ == "__main__":
+    run()
@@ -4,9 +4,11 @@ from kleine.lib.canvas.canvas import Canvas
 from kleine.lib.lcd.lcd import Lcd
 from kleine.lib.objects.errors import LackOfSetupError
 from kleine.lib.objects.point import Point
+from kleine.lib.objects.rectangle import Rectangle
 from kleine.lib.modules.helpers import ScreenSections
 
-from PIL import ImageDraw
+from PIL import Image, ImageDraw, ImageFont
+from datetime import datetime
 
 class DisplayModule(PyXavi):
     """
@@ -22,6 +24,10 @@ class DisplayModule(PyXavi):
 
     screen_size: Point = None
 
+    # Last rendered status header strip and the inputs that produced it
+    _status_header_strip: Image.Image = None
+    _status_header_inputs: tuple = None
+
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(DisplayModule, self).init_pyxavi(config=config, params=params)
 
@@ -48,6 +54,7 @@ class DisplayModule(PyXavi):
             "statusbar_font_emoji": self.canvas.FONT_SMALL_EMOJI,
             "statusbar_font_color": self.canvas.COLOR_WHITE,
             "screen_size": self.screen_size,
+            "text_cache": self.canvas.text_cache,
             "color": {
                 "white": self.canvas.COLOR_WHITE,
                 "green": self.canvas.COLOR_GREEN,
@@ -59,11 +66,112 @@ class DisplayModule(PyXavi):
         }))
 
     def _shared_status_header(self, draw: ImageDraw.ImageDraw, parameters: Dictionary, module_icon: str = ""):
-        ScreenSections.shared_status_header(draw, self._merge_statusbar_params_into(parameters)
+        self._paste_or_draw_status_header(parameters, ("full", module_icon), lambda: ScreenSections.shared_status_header(
+            draw, self._merge_statusbar_params_into(parameters).merge(Dictionary({
+                "statusbar_nav_icon": module_icon
+            }))))
+    
+    def _shared_status_header_static(self, draw: ImageDraw.ImageDraw, parameters: Dictionary, module_icon: str = ""):
+        ScreenSections.shared_status_header_static(draw, self._merge_statusbar_params_into(parameters)
             .merge(Dictionary({
                 "statusbar_nav_icon": module_icon
             })))
-    
+
+    def _shared_status_header_dynamic(self, draw: ImageDraw.ImageDraw, parameters: Dictionary):
+        self._paste_or_draw_status_header(parameters, ("dynamic",), lambda: ScreenSections.shared_status_header_dynamic(
+            draw, self._merge_statusbar_params_into(parameters)))
+
+    def _status_header_inputs_from(self, parameters: Dictionary) -> tuple:
+        """
+        Everything the status header shows. If none of it changed, the header looks the same.
+        """
+        show_time = parameters.get("statusbar_show_time", True)
+        show_battery = parameters.get("statusbar_show_battery", True)
+        show_temperature = parameters.get("statusbar_show_temperature", True)
+        show_gps = parameters.get("statusbar_show_gps_signal_quality", True)
+        show_wifi = parameters.get("statusbar_show_wifi_signal_strength", True)
+        return (
+            datetime.now().strftime("%H:%M") if show_time else None,
+            (parameters.get("battery_percentage"), parameters.get("battery_is_charging")) if show_battery else None,
+            parameters.get("temperature") if show_temperature else None,
+            parameters.get("gps_signal_quality") if show_gps else None,
+            parameters.get("wifi_signal_strength") if show_wifi else None,
+        )
+
+    def _paste_or_draw_status_header(self, parameters: Dictionary, variant: tuple, draw_header: callable):
+        """
+        Paste the last rendered status header strip if its inputs did not change, otherwise
+        draw it and keep the strip. The area under the header must be the same on every
+        frame of this module, which the static layer guarantees.
+        """
+        image = self.canvas.get_image()
+        inputs = variant + self._status_header_inputs_from(parameters)
+        if self._status_header_strip is not None and inputs == self._status_header_inputs:
+            image.paste(self._status_header_strip, (0, 0))
+            return
+
+        draw_header()
+        self._status_header_strip = image.crop((0, 0, self.screen_size.x, ScreenSections.STATUS_HEADER_HEIGHT))
+        self._status_header_inputs = inputs
+
+    def _get_layered_canvas(self, parameters: Dictionary, module_icon: str = "", draw_static_layer: callable = None) -> ImageDraw.ImageDraw:
+        """
+        Start a frame of this module over its cached static layer.
+
+        The static layer has the black background, whatever draw_static_layer(draw) paints
+        (labels, frames...), the fixed parts of the status header and the footer.
+        The returned draw already has the dynamic part of the status header: the module
+        only needs to draw its values and then the modal message, if any.
+        """
+        statusbar_active = parameters.get("statusbar_active", True)
+
+        def draw_static(draw: ImageDraw.ImageDraw):
+            draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
+                           fill=self.canvas.COLOR_BLACK)
+            if draw_static_layer is not None:
+                draw_static_layer(draw)
+            if statusbar_active:
+                self._shared_status_header_static(draw, parameters, module_icon)
+                self._shared_status_footer(draw, parameters)
+
+        draw = self.canvas.get_layered_canvas(
+            static_key=f"{self.__class__.__name__}:{module_icon}:{statusbar_active}",
+            draw_static_layer=draw_static
+        )
+        if statusbar_active:
+            self._shared_status_header_dynamic(draw, parameters)
+        return draw
+
+    def _line_height(self, draw: ImageDraw.ImageDraw, font: ImageFont.FreeTypeFont, spacing: int = 4) -> int:
+        """
+        Distance between lines, the same that draw.text() uses for multiline text
+        """
+        return draw.textbbox((0, 0), "A", font=font)[3] + spacing
+
+    def _draw_labels(self, draw: ImageDraw.ImageDraw, origin: Point, labels: list[str], font: ImageFont.FreeTypeFont):
+        """
+        Draw a column of labels, one per line. Meant for the static layer.
+        """
+        line_height = self._line_height(draw, font)
+        for index, label in enumerate(labels):
+            draw.text((origin.x, origin.y + index * line_height),
+                      text=label,
+                      font=font,
+                      fill=self.canvas.COLOR_WHITE,
+                      align="left")
+
+    def _draw_values_after_labels(self, draw: ImageDraw.ImageDraw, origin: Point, labels: list[str], values: list[str], font: ImageFont.FreeTypeFont):
+        """
+        Draw each value right after its label, as if both were a single line of text.
+        """
+        line_height = self._line_height(draw, font)
+        for index, (label, value) in enumerate(zip(labels, values)):
+            draw.text((origin.x + draw.textlength(label + " ", font=font), origin.y + index * line_height),
+                      text=value,
+                      font=font,
+                      fill=self.canvas.COLOR_WHITE,
+                      align="left")
+
     def _shared_status_footer(self, draw: ImageDraw.ImageDraw, parameters: Dictionary):
         params = self._merge_statusbar_params_into(parameters)
         ScreenSections.shared_status_footer(draw, params)
@@ -1,5 +1,6 @@
 import time, math
 import smbus2 as smbus
+from kleine.lib.utils.registers import Registers
 
 true                                 =0x01
 false                                =0x00
@@ -16,6 +17,14 @@ QMI8658Register_Ctrl2       = 0x03 # Accelerometer control.
 QMI8658Register_Ctrl3       = 0x04 # Gyroscope control.
 QMI8658Register_Ctrl5       = 0x06 # Data processing settings.
 QMI8658Register_Ctrl7       = 0x08 # Sensor enabled status.
+QMI8658Register_Ctrl9       = 0x0A # Host commands.
+
+QMI8658Register_FifoWtmTh   = 0x13 # FIFO watermark, in samples.
+QMI8658Register_FifoCtrl    = 0x14 # FIFO mode, size and read mode.
+QMI8658Register_FifoSmplCnt = 0x15 # FIFO sample count, least significant byte.
+QMI8658Register_FifoStatus  = 0x16 # FIFO flags and sample count most significant bits.
+QMI8658Register_FifoData    = 0x17 # FIFO data output.
+QMI8658Register_StatusInt   = 0x2D # Sensor data availability and command done.
 
 QMI8658Register_Ax_L        = 0x35 # Accelerometer X axis least significant byte.
 QMI8658Register_Ax_H        = 0x36 # Accelerometer X axis most significant byte.
@@ -71,6 +80,27 @@ QMI8658GyrOdr_125Hz         = 0x06 # !< \brief High resolution 8000Hz output rat
 QMI8658GyrOdr_62_5Hz        = 0x07 # !< \brief High resolution 8000Hz output rate.
 QMI8658GyrOdr_31_25Hz       = 0x08 # !< \brief High resolution 8000Hz output rate.
 
+QMI8658FifoMode_Bypass      = 0x00 # !< \brief FIFO disabled.
+QMI8658FifoMode_Fifo        = 0x01 # !< \brief Stops writing when full.
+QMI8658FifoMode_Stream      = 0x02 # !< \brief Overwrites the oldest samples when full.
+
+QMI8658FifoSize_16          = 0x00 << 2 # !< \brief 16 samples per sensor.
+QMI8658FifoSize_32          = 0x01 << 2 # !< \brief 32 samples per sensor.
+QMI8658FifoSize_64          = 0x02 << 2 # !< \brief 64 samples per sensor.
+QMI8658FifoSize_128         = 0x03 << 2 # !< \brief 128 samples per sensor.
+
+QMI8658FifoStatus_Overflow  = 0x20 # Samples were lost since the last read.
+QMI8658StatusInt_CmdDone    = 0x80 # The Ctrl9 command was executed.
+
+QMI8658Ctrl9Cmd_Ack         = 0x00 # Acknowledge the end of a command.
+QMI8658Ctrl9Cmd_RstFifo     = 0x04 # Empty the FIFO.
+QMI8658Ctrl9Cmd_ReqFifo     = 0x05 # Enter the FIFO read mode.
+
+# Every FIFO frame has the accelerometer and the gyroscope samples, XYZ little endian
+QMI8658_FIFO_FRAME_BYTES    = 12
+# A SMBus block read carries 32 bytes at most, read whole frames on every transfer
+QMI8658_FIFO_BURST_BYTES    = 24
+
 # define QMI8658 Register  end
 
 # define AK09918 Register
@@ -124,8 +154,10 @@ class IMU(object):
   q0 = 1.0
   q1=q2=q3=0.0
   angles=[0.0,0.0,0.0]
+  _fifo_ctrl = QMI8658FifoMode_Bypass
 
-  def __init__(self):
+  def __init__(self, gyro_offset=None):
+    # gyro_offset: a previously measured GyroOffset, to skip measuring it again
     self._bus = smbus.SMBus(1)
     if self._read_byte(I2C_ADD_IMU_QMI8658,0x00) != 0x05:
       print("QMI8658_init fail\n")
@@ -138,7 +170,10 @@ class IMU(object):
       self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl3,QMI8658GyrRange_512dps | QMI8658GyrOdr_500Hz) # 设置陀螺仪模式  512dps 500Hz
       self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl5,0x00) # 传感器数据处理设置
       self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl7,QMI8658_CTRL7_ACC_ENABLE | QMI8658_CTRL7_GYR_ENABLE | 0x80) # 使能加速度跟陀螺仪传感器
-      self.QMI8658_GyroOffset()
+      if gyro_offset is None:
+        self.QMI8658_GyroOffset()
+      else:
+        self.GyroOffset = list(gyro_offset)
     if self._read_byte(I2C_ADD_IMU_AK09918,AK09918_WIA2) != 0x0C:
       print("AK09918 init fail\r\n")
       return 0
@@ -164,37 +199,9 @@ class IMU(object):
 
   def QMI8658_Gyro_Accel_Read(self):
     data =self._read_block(I2C_ADD_IMU_QMI8658,QMI8658Register_Ax_L, 12)
-    self.Accel[0] = (data[1]<<8)|data[0]
-    self.Accel[1] = (data[3]<<8)|data[2]
-    self.Accel[2] = (data[5]<<8)|data[4]
-    self.Gyro[0]  = ((data[7]<<8)|data[6]) - self.GyroOffset[0]
-    self.Gyro[1]  = ((data[9]<<8)|data[8]) - self.GyroOffset[1]
-    self.Gyro[2]  = ((data[11]<<8)|data[10]) - self.GyroOffset[2]
-    # print(data)
-    if self.Accel[0]>=32767:             #Solve the problem that Python shift will not overflow
-      self.Accel[0]=self.Accel[0]-65535
-    elif self.Accel[0]<=-32767:
-      self.Accel[0]=self.Accel[0]+65535
-    if self.Accel[1]>=32767:
-      self.Accel[1]=self.Accel[1]-65535
-    elif self.Accel[1]<=-32767:
-      self.Accel[1]=self.Accel[1]+65535
-    if self.Accel[2]>=32767:
-      self.Accel[2]=self.Accel[2]-65535
-    elif self.Accel[2]<=-32767:
-      self.Accel[2]=self.Accel[2]+65535
-    if self.Gyro[0]>=32767:
-      self.Gyro[0]=self.Gyro[0]-65535
-    elif self.Gyro[0]<=-32767:
-      self.Gyro[0]=self.Gyro[0]+65535
-    if self.Gyro[1]>=32767:
-      self.Gyro[1]=self.Gyro[1]-65535
-    elif self.Gyro[1]<=-32767:
-      self.Gyro[1]=self.Gyro[1]+65535
-    if self.Gyro[2]>=32767:
-      self.Gyro[2]=self.Gyro[2]-65535
-    elif self.Gyro[2]<=-32767:
-      self.Gyro[2]=self.Gyro[2]+65535
+    ax, ay, az, gx, gy, gz = Registers.int16_le(data, 6)
+    self.Accel = [ax, ay, az]
+    self.Gyro = [gx - self.GyroOffset[0], gy - self.GyroOffset[1], gz - self.GyroOffset[2]]
     return (self.Gyro[0],self.Gyro[1],self.Gyro[2]),(self.Accel[0],self.Accel[1],self.Accel[2])
 
   def AK09918_MagRead(self):
@@ -207,31 +214,71 @@ class IMU(object):
       counter -= 1
     
     if counter!=0:
+      # 8 reads of X, Y, Z, TMPS and ST2, averaged
+      data = bytearray()
       for i in range(0,8):
-        pu8data =self._read_block(I2C_ADD_IMU_AK09918,AK09918_HXL, 8)
-        self.U8tempX[i] = (pu8data[1]<<8)|pu8data[0]
-        self.U8tempY[i] = (pu8data[3]<<8)|pu8data[2]
-        self.U8tempZ[i] = (pu8data[5]<<8)|pu8data[4]
-      self.Mag[0]=(self.U8tempX[0]+self.U8tempX[1]+self.U8tempX[2]+self.U8tempX[3]+self.U8tempX[4]+self.U8tempX[5]+self.U8tempX[6]+self.U8tempX[7])/8
-      self.Mag[1]=(self.U8tempY[0]+self.U8tempY[1]+self.U8tempY[2]+self.U8tempY[3]+self.U8tempY[4]+self.U8tempY[5]+self.U8tempY[6]+self.U8tempY[7])/8
-      self.Mag[2]=(self.U8tempZ[0]+self.U8tempZ[1]+self.U8tempZ[2]+self.U8tempZ[3]+self.U8tempZ[4]+self.U8tempZ[5]+self.U8tempZ[6]+self.U8tempZ[7])/8
-    if self.Mag[0]>=32767:            #Solve the problem that Python shift will not overflow
-      self.Mag[0]=self.Mag[0]-65535
-    elif self.Mag[0]<=-32767:
-      self.Mag[0]=self.Mag[0]+65535
-    if self.Mag[1]>=32767:
-      self.Mag[1]=self.Mag[1]-65535
-    elif self.Mag[1]<=-32767:
-      self.Mag[1]=self.Mag[1]+65535
-    if self.Mag[2]>=32767:
-      self.Mag[2]=self.Mag[2]-65535
-    elif self.Mag[2]<=-32767:
-      self.Mag[2]=self.Mag[2]+65535
+        data += bytes(self._read_block(I2C_ADD_IMU_AK09918,AK09918_HXL, 8))
+      self.Mag = Registers.int16_array(data).reshape(8, 4)[:, 0:3].mean(axis=0).tolist()
     return (self.Mag[0],self.Mag[1],self.Mag[2])
 
+  def QMI8658_FifoEnable(self, odr=QMI8658AccOdr_125Hz, size=QMI8658FifoSize_128):
+    # Both sensors at the same rate, so that every FIFO frame has a sample of each one.
+    # The SyncSample mode (Ctrl7 bit 7) is left off, it locks the output registers instead.
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl7,0x00)
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl2,QMI8658AccRange_2g | odr)
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl3,QMI8658GyrRange_512dps | odr)
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoWtmTh,0x00)
+    self._fifo_ctrl = size | QMI8658FifoMode_Stream
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoCtrl,self._fifo_ctrl)
+    self._ctrl9_command(QMI8658Ctrl9Cmd_RstFifo)
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl7,QMI8658_CTRL7_ACC_ENABLE | QMI8658_CTRL7_GYR_ENABLE)
+
+  def QMI8658_FifoDisable(self):
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoCtrl,QMI8658FifoMode_Bypass)
+
+  def QMI8658_FifoRead(self):
+    # Returns the ((gx, gy, gz), (ax, ay, az)) of every frame waiting, oldest first,
+    # and whether the FIFO overflowed since the last read.
+    status = self._read_block(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoSmplCnt, 2)
+    overflow = (status[1] & QMI8658FifoStatus_Overflow) != 0
+    # The count is in 2 bytes words
+    available = ((((status[1] & 0x03) << 8) | status[0]) * 2) // QMI8658_FIFO_FRAME_BYTES * QMI8658_FIFO_FRAME_BYTES
+    if available == 0:
+      return [], overflow
+
+    self._ctrl9_command(QMI8658Ctrl9Cmd_ReqFifo)
+    data = bytearray()
+    while len(data) < available:
+      length = min(QMI8658_FIFO_BURST_BYTES, available - len(data))
+      data += bytes(self._read_block(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoData, length))
+    # Leave the read mode
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_FifoCtrl,self._fifo_ctrl)
+
+    values = Registers.int16_array(data).reshape(-1, 6)
+    accelerations = map(tuple, values[:, 0:3].tolist())
+    gyroscopes = map(tuple, (values[:, 3:6] - self.GyroOffset).tolist())
+    return list(zip(gyroscopes, accelerations)), overflow
+
+  def AK09918_MagReadLatest(self):
+    # One measurement if there is a new one, without waiting for it. None otherwise.
+    # A single transfer from ST1 to ST2: reading ST2 releases the data registers.
+    data = self._read_block(I2C_ADD_IMU_AK09918,AK09918_ST1, 9)
+    if (data[0] & AK09918_DRDY_BIT) == 0:
+      return None
+    return Registers.int16_le(data, 3, offset=1)
+
+  def _ctrl9_command(self, command, timeout=0.05):
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl9,command)
+    deadline = time.monotonic() + timeout
+    while (self._read_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_StatusInt) & QMI8658StatusInt_CmdDone) == 0:
+      if time.monotonic() > deadline:
+        raise TimeoutError("QMI8658 did not complete the Ctrl9 command 0x%02x" % command)
+      time.sleep(0.0005)
+    self._write_byte(I2C_ADD_IMU_QMI8658,QMI8658Register_Ctrl9,QMI8658Ctrl9Cmd_Ack)
+
   def QMI8658_readTemp(self):
       temp = self._read_block(I2C_ADD_IMU_QMI8658,QMI8658Register_Tempearture_L, 2)
-      return float((temp[1] << 8) | temp[0]) / 256.0
+      return Registers.int16_le(temp)[0] / 256.0
 
   def QMI8658_GyroOffset(self):
     s32TempGx = 0
@@ -247,13 +294,12 @@ class IMU(object):
     self.GyroOffset[1] = s32TempGy >> 5
     self.GyroOffset[2] = s32TempGz >> 5
 
-  def imuAHRSupdate(self,gx, gy,gz,ax,ay,az,mx,my,mz):    
+  def imuAHRSupdate(self,gx, gy,gz,ax,ay,az,mx,my,mz,halfT=0.024):    
     norm=0.0
     hx = hy = hz = bx = bz = 0.0
     vx = vy = vz = wx = wy = wz = 0.0
     exInt = eyInt = ezInt = 0.0
     ex=ey=ez=0.0 
-    halfT = 0.024
     q0q0 = self.q0 * self.q0
     q0q1 = self.q0 * self.q1
     q0q2 = self.q0 * self.q2
@@ -1,47 +1,197 @@
-from pyxavi import Config, Dictionary
+from pyxavi import Config, Dictionary, full_stack
 from kleine.lib.abstract.pyxavi import PyXavi
 
 from kleine.lib.accelerometer.mocked_IMU import MockedIMU
-import math, time
+from kleine.lib.accelerometer.imu_sampler import ImuSampler
+from kleine.lib.accelerometer.ahrs import Ahrs
+from kleine.lib.accelerometer.imu_calibration import ImuCalibration
+from kleine.lib.objects.imu_snapshot import ImuSnapshot
+import math, threading, time
+import numpy as np
 
 
 class Accelerometer(PyXavi):
+    """
+    The IMU of the Sense HAT: QMI8658 accelerometer and gyroscope, AK09918 magnetometer.
+
+    Two acquisition modes, from `accelerometer.acquisition`:
+    - fifo: an ImuSampler keeps reading the FIFO of the QMI8658 in background. The getters
+      return the latest sample and the orientation integrates every sample, without I2C.
+    - polling: every getter reads the registers.
+
+    snapshot() gives all the values at once, with a single read of each chip when polling.
+    The orientation comes from the Ahrs, fed with the real time between samples and
+    with the magnetometer calibrated by ImuCalibration.
+
+    The driver and the Ahrs are shared by the IMU sensor worker, the sampler thread and the
+    calibrations, so they are only touched holding _lock. The sampler uses it as its bus_lock.
+    """
+
+    ACQUISITION_FIFO: str = "fifo"
+    ACQUISITION_POLLING: str = "polling"
+
+    # Raw acceleration units per g, the IMU is set to +/-2g
+    ACCELERATION_LSB_PER_G: int = 16384
+    # Raw rotation units per degree per second, the IMU is set to +/-512dps
+    GYROSCOPE_LSB_PER_DPS: int = 64
+
+    ACQUISITION: str = ACQUISITION_FIFO
+    # Expected seconds between snapshots when polling, the tick of the realtime tasks
+    POLLING_PERIOD: float = 0.25
+    # Seconds that the magnetometer calibration collects readings for
+    MAGNETOMETER_CALIBRATION_SECONDS: float = 20.0
 
     driver: MockedIMU = None
+    sampler: ImuSampler = None
+    ahrs: Ahrs = None
+    calibration: ImuCalibration = None
+    _lock: threading.RLock = None
+    # Pitch, roll and yaw after the last integrated values
+    _orientation: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    # The magnetometer measures slower than it is polled, keep its last values
+    _magnetometer: tuple[int, int, int] = (0, 0, 0)
 
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(Accelerometer, self).init_pyxavi(config=config, params=params)
 
+        self._lock = threading.RLock()
+
+        self.MAGNETOMETER_CALIBRATION_SECONDS = self._xconfig.get(
+            "accelerometer.calibration.magnetometer_seconds", self.MAGNETOMETER_CALIBRATION_SECONDS)
+        self.calibration = ImuCalibration(config=self._xconfig, params=self._xparams)
+
         if self._xconfig.get("accelerometer.mock", True):
             self.driver = MockedIMU(config=config, params=params)
         else:
             from kleine.lib.accelerometer.IMU import IMU
-            self.driver = IMU()
+            gyroscope_offset = self.calibration.get_gyroscope_offset()
+            self.driver = IMU(gyro_offset=gyroscope_offset)
+            if gyroscope_offset is None:
+                self.calibration.save_gyroscope_offset(self.driver.GyroOffset)
+            else:
+                self._xlog.info(f"Reusing the stored gyroscope offset {gyroscope_offset}")
+
+        self.ahrs = Ahrs(config=self._xconfig, params=self._xparams)
+        self.ACQUISITION = self._xconfig.get("accelerometer.acquisition", self.ACQUISITION)
+        if self.ACQUISITION == self.ACQUISITION_FIFO:
+            self.start_sampling()
+
+    def start_sampling(self):
+        """
+        Starts the FIFO sampling. If the IMU does not take it, stays in polling mode.
+        """
+        try:
+            self.sampler = ImuSampler(self.driver, on_samples=self._integrate_samples, bus_lock=self._lock,
+                                      config=self._xconfig, params=self._xparams)
+            self.sampler.start()
+        except Exception as e:
+            self._xlog.warning(f"Could not start the IMU FIFO sampling, polling instead: {e}")
+            self._xlog.debug(full_stack())
+            self.sampler = None
+
+    def close(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
 
     def get_magnetometer_values(self) -> tuple[int, int, int]:
-        return self.driver.AK09918_MagRead()
+        if self.sampler is not None:
+            latest = self.sampler.get_latest()
+            return (0, 0, 0) if latest is None else latest.magnetometer
+        with self._lock:
+            return self.driver.AK09918_MagRead()
 
     def get_gyroscope_values(self) -> tuple[int, int, int]:
-        return self.driver.QMI8658_Gyro_Accel_Read()[0]
+        if self.sampler is not None:
+            latest = self.sampler.get_latest()
+            return (0, 0, 0) if latest is None else latest.gyroscope
+        with self._lock:
+            return self.driver.QMI8658_Gyro_Accel_Read()[0]
 
     def get_accelerometer_values(self) -> tuple[int, int, int]:
-        return self.driver.QMI8658_Gyro_Accel_Read()[1]
+        if self.sampler is not None:
+            latest = self.sampler.get_latest()
+            return (0, 0, 0) if latest is None else latest.acceleration
+        with self._lock:
+            return self.driver.QMI8658_Gyro_Accel_Read()[1]
 
     def get_temperature(self) -> float:
-        return self.driver.QMI8658_readTemp()
+        with self._lock:
+            return self.driver.QMI8658_readTemp()
     
     def get_pitch_roll_yaw(self) -> tuple[float, float, float]:
-        MotionVal=[0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0]
-        self.driver.QMI8658_Gyro_Accel_Read()
-        self.driver.AK09918_MagRead()
-        MotionVal = self.driver.icm20948CalAvgValue(MotionVal=MotionVal)
-        self.driver.imuAHRSupdate(MotionVal[0] * 0.0175, MotionVal[1] * 0.0175,MotionVal[2] * 0.0175,
-                    MotionVal[3],MotionVal[4],MotionVal[5], 
-                    MotionVal[6], MotionVal[7], MotionVal[8])
-        pitch = math.asin(-2 * self.driver.q1 * self.driver.q3 + 2 * self.driver.q0 * self.driver.q2) * 57.3
-        roll  = math.atan2(2 * self.driver.q2 * self.driver.q3 + 2 * self.driver.q0 * self.driver.q1, -2 * self.driver.q1 * self.driver.q1 - 2 * self.driver.q2 * self.driver.q2 + 1) * 57.3
-        yaw   = math.atan2(-2 * self.driver.q1 * self.driver.q2 - 2 * self.driver.q0 * self.driver.q3, 2 * self.driver.q2 * self.driver.q2 + 2 * self.driver.q3 * self.driver.q3 - 1) * 57.3
-        return pitch, roll, yaw
+        if self.sampler is not None:
+            return self._orientation
+        return self.snapshot().pitch_roll_yaw
+
+    def snapshot(self) -> ImuSnapshot:
+        """
+        Acceleration, rotation, magnetic field and orientation of the same moment.
+
+        When sampling it is the latest sample, without I2C. When polling it is one block
+        read of the QMI8658 and one of the AK09918, integrated into the orientation.
+        """
+        if self.sampler is not None:
+            latest = self.sampler.get_latest()
+            if latest is None:
+                return ImuSnapshot(time.time(), (0, 0, 0), (0, 0, 0), (0, 0, 0), self._orientation)
+            return ImuSnapshot(latest.timestamp, latest.acceleration, latest.gyroscope, latest.magnetometer, self._orientation)
+
+        with self._lock:
+            gyroscope, acceleration = self.driver.QMI8658_Gyro_Accel_Read()
+            magnetometer = self.driver.AK09918_MagReadLatest()
+            if magnetometer is not None:
+                self._magnetometer = magnetometer
+            now = time.time()
+            self.ahrs.update([now], np.radians(np.array([gyroscope], dtype=np.float64) / self.GYROSCOPE_LSB_PER_DPS),
+                             [acceleration], self.calibration.apply_magnetometer([self._magnetometer]), max_step=self.POLLING_PERIOD)
+            self._orientation = self.ahrs.pitch_roll_yaw()
+            return ImuSnapshot(now, acceleration, gyroscope, self._magnetometer, self._orientation)
+
+    def _integrate_samples(self, samples: list):
+        # Called from the sampler thread with every drain, holding _lock
+        timestamps, accelerations, gyroscopes, magnetometers = zip(*samples)
+        # After lost samples the real step is unknown, don't integrate it as a long rotation
+        self.ahrs.update(timestamps, np.radians(np.array(gyroscopes, dtype=np.float64) / self.GYROSCOPE_LSB_PER_DPS),
+                         accelerations, self.calibration.apply_magnetometer(magnetometers), max_step=4 / self.sampler.ODR)
+        # Published as a whole new tuple, readers never see half of it
+        self._orientation = self.ahrs.pitch_roll_yaw()
+
+    def calibrate_magnetometer(self) -> bool:
+        """
+        Collects magnetometer readings for MAGNETOMETER_CALIBRATION_SECONDS while the
+        device is rotated in all directions, and fits the calibration with them.
+        Blocks meanwhile, run it from the IMU sensor worker. Returns False if the
+        readings were not good enough.
+        """
+        self._xlog.info(f"Calibrating the magnetometer for {self.MAGNETOMETER_CALIBRATION_SECONDS}s")
+        readings = []
+        deadline = time.monotonic() + self.MAGNETOMETER_CALIBRATION_SECONDS
+        while time.monotonic() < deadline:
+            # Only for each read, the sampler keeps draining in between
+            with self._lock:
+                magnetometer = self.driver.AK09918_MagReadLatest()
+            if magnetometer is not None and any(magnetometer):
+                readings.append(magnetometer)
+            # The magnetometer measures at 20Hz
+            time.sleep(0.05)
+        return self.calibration.fit_magnetometer(readings)
+
+    def calibrate_gyroscope(self) -> bool:
+        """
+        Measures the gyroscope offset again, with the device still, and stores it.
+        Run it from the IMU sensor worker.
+        """
+        self._xlog.info("Calibrating the gyroscope")
+        # Nothing reads or integrates the gyroscope until the new offset is in place
+        with self._lock:
+            # The measurement averages the readings minus the current offset
+            self.driver.GyroOffset = [0, 0, 0]
+            self.driver.QMI8658_GyroOffset()
+            # What the filter learnt about the drift belongs to the previous offset
+            self.ahrs.reset()
+        self.calibration.save_gyroscope_offset(self.driver.GyroOffset)
+        return True
 
     def test(self):
 
@@ -0,0 +1,208 @@
+from pyxavi import Config, Dictionary
+from kleine.lib.abstract.pyxavi import PyXavi
+
+import math
+import numpy as np
+
+class Ahrs(PyXavi):
+    """
+    Orientation from the accelerometer, the gyroscope and the magnetometer (AHRS).
+
+    Two filters, from `accelerometer.ahrs.algorithm`:
+    - mahony: a PI controller corrects the gyroscope with the gravity and the magnetic
+      north. The integral part learns the gyroscope drift and is kept between calls.
+    - madgwick: a gradient descent step towards the gravity and the north, weighted by beta.
+
+    update() takes a batch of samples with their timestamps and integrates each one with
+    its real time step. The unit conversions, norms and time steps of the whole batch
+    are done with numpy; the filter itself is recursive, so it walks the samples in a
+    plain float loop. Samples without magnetometer use the gravity only, samples without
+    acceleration the gyroscope only, so a zero vector never divides.
+
+    The config lives under `accelerometer.ahrs`.
+    """
+
+    ALGORITHM_MAHONY: str = "mahony"
+    ALGORITHM_MADGWICK: str = "madgwick"
+
+    ALGORITHM: str = ALGORITHM_MAHONY
+    # Mahony gains: proportional and integral, per unit of error
+    MAHONY_KP: float = 1.0
+    MAHONY_KI: float = 0.05
+    # Madgwick gain, in rad/s
+    MADGWICK_BETA: float = 0.1
+
+    # Orientation quaternion w, x, y, z
+    quaternion: tuple[float, float, float, float] = (1.0, 0.0, 0.0, 0.0)
+
+    # Mahony integral feedback, rad/s
+    _integral: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    _last_timestamp: float = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(Ahrs, self).init_pyxavi(config=config, params=params)
+
+        self.ALGORITHM = self._xconfig.get("accelerometer.ahrs.algorithm", self.ALGORITHM)
+        self.MAHONY_KP = self._xconfig.get("accelerometer.ahrs.mahony_kp", self.MAHONY_KP)
+        self.MAHONY_KI = self._xconfig.get("accelerometer.ahrs.mahony_ki", self.MAHONY_KI)
+        self.MADGWICK_BETA = self._xconfig.get("accelerometer.ahrs.madgwick_beta", self.MADGWICK_BETA)
+        if self.ALGORITHM not in [self.ALGORITHM_MAHONY, self.ALGORITHM_MADGWICK]:
+            self._xlog.warning(f"Unknown AHRS algorithm [{self.ALGORITHM}], using {self.ALGORITHM_MAHONY}")
+            self.ALGORITHM = self.ALGORITHM_MAHONY
+
+    def reset(self):
+        self.quaternion = (1.0, 0.0, 0.0, 0.0)
+        self._integral = (0.0, 0.0, 0.0)
+        self._last_timestamp = None
+
+    def update(self, timestamps: np.ndarray, gyroscope: np.ndarray, acceleration: np.ndarray,
+               magnetometer: np.ndarray, max_step: float):
+        """
+        Integrates n samples, oldest first: timestamps in seconds (n), gyroscope in rad/s (n x 3),
+        acceleration and magnetometer in any unit (n x 3).
+
+        The very first sample has no step. A step longer than max_step (lost samples, a pause)
+        is integrated as max_step, not as a long rotation.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return
+
+        previous = timestamps[0] if self._last_timestamp is None else self._last_timestamp
+        steps = np.clip(np.diff(timestamps, prepend=previous), 0.0, max_step)
+        self._last_timestamp = float(timestamps[-1])
+
+        acceleration, has_acceleration = self._normalised(acceleration)
+        magnetometer, has_magnetometer = self._normalised(magnetometer)
+        step = self._mahony_step if self.ALGORITHM == self.ALGORITHM_MAHONY else self._madgwick_step
+        step(steps.tolist(), np.asarray(gyroscope, dtype=np.float64).tolist(),
+             acceleration.tolist(), has_acceleration.tolist(),
+             magnetometer.tolist(), has_magnetometer.tolist())
+
+    def pitch_roll_yaw(self) -> tuple[float, float, float]:
+        """
+        Degrees, with the axes convention the accelerometer module always used
+        """
+        q0, q1, q2, q3 = self.quaternion
+        pitch = math.degrees(math.asin(max(-1.0, min(1.0, -2 * q1 * q3 + 2 * q0 * q2))))
+        roll = math.degrees(math.atan2(2 * q2 * q3 + 2 * q0 * q1, -2 * q1 * q1 - 2 * q2 * q2 + 1))
+        yaw = math.degrees(math.atan2(-2 * q1 * q2 - 2 * q0 * q3, 2 * q2 * q2 + 2 * q3 * q3 - 1))
+        return pitch, roll, yaw
+
+    @staticmethod
+    def _normalised(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Unit vectors, and which ones were not zero
+        vectors = np.asarray(vectors, dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=1)
+        valid = norms > 0
+        unit = np.zeros_like(vectors)
+        unit[valid] = vectors[valid] / norms[valid, None]
+        return unit, valid
+
+    def _mahony_step(self, steps: list, gyroscope: list, acceleration: list, has_acceleration: list,
+                     magnetometer: list, has_magnetometer: list):
+        q0, q1, q2, q3 = self.quaternion
+        ix, iy, iz = self._integral
+        kp, ki = self.MAHONY_KP, self.MAHONY_KI
+
+        for dt, (gx, gy, gz), (ax, ay, az), use_acceleration, (mx, my, mz), use_magnetometer in zip(
+                steps, gyroscope, acceleration, has_acceleration, magnetometer, has_magnetometer):
+            if use_acceleration:
+                q0q0, q0q1, q0q2, q0q3 = q0 * q0, q0 * q1, q0 * q2, q0 * q3
+                q1q1, q1q2, q1q3 = q1 * q1, q1 * q2, q1 * q3
+                q2q2, q2q3, q3q3 = q2 * q2, q2 * q3, q3 * q3
+
+                # Gravity as the current orientation sees it, and its error against the measured one
+                vx, vy, vz = 2 * (q1q3 - q0q2), 2 * (q0q1 + q2q3), q0q0 - q1q1 - q2q2 + q3q3
+                ex, ey, ez = ay * vz - az * vy, az * vx - ax * vz, ax * vy - ay * vx
+
+                if use_magnetometer:
+                    # The magnetic field on the earth frame, with its horizontal part to the north
+                    hx = 2 * (mx * (0.5 - q2q2 - q3q3) + my * (q1q2 - q0q3) + mz * (q1q3 + q0q2))
+                    hy = 2 * (mx * (q1q2 + q0q3) + my * (0.5 - q1q1 - q3q3) + mz * (q2q3 - q0q1))
+                    bx = math.sqrt(hx * hx + hy * hy)
+                    bz = 2 * (mx * (q1q3 - q0q2) + my * (q2q3 + q0q1) + mz * (0.5 - q1q1 - q2q2))
+                    wx = 2 * (bx * (0.5 - q2q2 - q3q3) + bz * (q1q3 - q0q2))
+                    wy = 2 * (bx * (q1q2 - q0q3) + bz * (q0q1 + q2q3))
+                    wz = 2 * (bx * (q0q2 + q1q3) + bz * (0.5 - q1q1 - q2q2))
+                    ex += my * wz - mz * wy
+                    ey += mz * wx - mx * wz
+                    ez += mx * wy - my * wx
+
+                if ki > 0:
+                    ix += ki * ex * dt
+                    iy += ki * ey * dt
+                    iz += ki * ez * dt
+                gx += kp * ex + ix
+                gy += kp * ey + iy
+                gz += kp * ez + iz
+
+            half_dt = 0.5 * dt
+            q0, q1, q2, q3 = (
+                q0 + (-q1 * gx - q2 * gy - q3 * gz) * half_dt,
+                q1 + (q0 * gx + q2 * gz - q3 * gy) * half_dt,
+                q2 + (q0 * gy - q1 * gz + q3 * gx) * half_dt,
+                q3 + (q0 * gz + q1 * gy - q2 * gx) * half_dt,
+            )
+            norm = 1 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+            q0, q1, q2, q3 = q0 * norm, q1 * norm, q2 * norm, q3 * norm
+
+        self.quaternion = (q0, q1, q2, q3)
+        self._integral = (ix, iy, iz)
+
+    def _madgwick_step(self, steps: list, gyroscope: list, acceleration: list, has_acceleration: list,
+                       magnetometer: list, has_magnetometer: list):
+        q0, q1, q2, q3 = self.quaternion
+        beta = self.MADGWICK_BETA
+
+        for dt, (gx, gy, gz), (ax, ay, az), use_acceleration, (mx, my, mz), use_magnetometer in zip(
+                steps, gyroscope, acceleration, has_acceleration, magnetometer, has_magnetometer):
+            # Rate of change of the quaternion from the gyroscope
+            dq0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+            dq1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+            dq2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+            dq3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+            if use_acceleration and use_magnetometer:
+                # The magnetic field on the earth frame, with its horizontal part to the north
+                hx = mx * (q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3) + 2 * my * (q1 * q2 - q0 * q3) + 2 * mz * (q1 * q3 + q0 * q2)
+                hy = 2 * mx * (q1 * q2 + q0 * q3) + my * (q0 * q0 - q1 * q1 + q2 * q2 - q3 * q3) + 2 * mz * (q2 * q3 - q0 * q1)
+                bx2 = 2 * math.sqrt(hx * hx + hy * hy)
+                bz2 = 2 * (2 * mx * (q1 * q3 - q0 * q2) + 2 * my * (q2 * q3 + q0 * q1) + mz * (q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3))
+                bx4, bz4 = 2 * bx2, 2 * bz2
+
+                # Objective function (gravity and magnetic field errors) ...
+                f1 = 2 * (q1 * q3 - q0 * q2) - ax
+                f2 = 2 * (q0 * q1 + q2 * q3) - ay
+                f3 = 1 - 2 * (q1 * q1 + q2 * q2) - az
+                f4 = bx2 * (0.5 - q2 * q2 - q3 * q3) + bz2 * (q1 * q3 - q0 * q2) - mx
+                f5 = bx2 * (q1 * q2 - q0 * q3) + bz2 * (q0 * q1 + q2 * q3) - my
+                f6 = bx2 * (q0 * q2 + q1 * q3) + bz2 * (0.5 - q1 * q1 - q2 * q2) - mz
+                # ... times its Jacobian gives the gradient
+                s0 = -2 * q2 * f1 + 2 * q1 * f2 - bz2 * q2 * f4 + (-bx2 * q3 + bz2 * q1) * f5 + bx2 * q2 * f6
+                s1 = 2 * q3 * f1 + 2 * q0 * f2 - 4 * q1 * f3 + bz2 * q3 * f4 + (bx2 * q2 + bz2 * q0) * f5 + (bx2 * q3 - bz4 * q1) * f6
+                s2 = -2 * q0 * f1 + 2 * q3 * f2 - 4 * q2 * f3 + (-bx4 * q2 - bz2 * q0) * f4 + (bx2 * q1 + bz2 * q3) * f5 + (bx2 * q0 - bz4 * q2) * f6
+                s3 = 2 * q1 * f1 + 2 * q2 * f2 + (-bx4 * q3 + bz2 * q1) * f4 + (-bx2 * q0 + bz2 * q2) * f5 + bx2 * q1 * f6
+            elif use_acceleration:
+                f1 = 2 * (q1 * q3 - q0 * q2) - ax
+                f2 = 2 * (q0 * q1 + q2 * q3) - ay
+                f3 = 1 - 2 * (q1 * q1 + q2 * q2) - az
+                s0 = -2 * q2 * f1 + 2 * q1 * f2
+                s1 = 2 * q3 * f1 + 2 * q0 * f2 - 4 * q1 * f3
+                s2 = -2 * q0 * f1 + 2 * q3 * f2 - 4 * q2 * f3
+                s3 = 2 * q1 * f1 + 2 * q2 * f2
+            else:
+                s0 = s1 = s2 = s3 = 0.0
+
+            norm = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+            if norm > 0:
+                dq0 -= beta * s0 / norm
+                dq1 -= beta * s1 / norm
+                dq2 -= beta * s2 / norm
+                dq3 -= beta * s3 / norm
+
+            q0, q1, q2, q3 = q0 + dq0 * dt, q1 + dq1 * dt, q2 + dq2 * dt, q3 + dq3 * dt
+            norm = 1 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+            q0, q1, q2, q3 = q0 * norm, q1 * norm, q2 * norm, q3 * norm
+
+        self.quaternion = (q0, q1, q2, q3)
@@ -0,0 +1,148 @@
+from pyxavi import Config, Dictionary, Storage
+from kleine.lib.abstract.pyxavi import PyXavi
+
+import os, time
+import numpy as np
+
+class ImuCalibration(PyXavi):
+    """
+    Calibration of the IMU, kept in the storage between boots.
+
+    - Magnetometer: the metal around it shifts (hard iron) and deforms (soft iron) the
+      magnetic field, so rotating the device draws an ellipsoid instead of a sphere
+      centred at 0. fit_magnetometer() fits that ellipsoid and apply_magnetometer()
+      maps the readings back to a sphere, one affine transform for a whole batch.
+    - Gyroscope: the offset that the IMU measures at start, while still. Reusing a recent
+      one skips the measurement.
+
+    The config lives under `accelerometer.calibration`.
+    """
+
+    DEFAULT_STORAGE_PATH: str = "storage/"
+    DEFAULT_CALIBRATION_FILE: str = "accelerometer/calibration.yaml"
+
+    # Fewer magnetometer readings than these can't describe the ellipsoid
+    MIN_MAGNETOMETER_SAMPLES: int = 100
+    # Maximum ratio between the longest and the shortest axis of the ellipsoid. Over it, the
+    # device was not rotated in all directions (or something magnetic was too close).
+    MAX_AXIS_RATIO: float = 3.0
+    # Seconds that a measured gyroscope offset is reused for. 0 to always measure it
+    GYROSCOPE_OFFSET_MAX_AGE: float = 7 * 86400
+
+    calibration_file: str = None
+    # Hard iron offset and soft iron matrix, replaced together as a tuple
+    _magnetometer_transform: tuple[np.ndarray, np.ndarray] = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(ImuCalibration, self).init_pyxavi(config=config, params=params)
+
+        self.GYROSCOPE_OFFSET_MAX_AGE = self._xconfig.get("accelerometer.calibration.gyroscope_offset_max_age", self.GYROSCOPE_OFFSET_MAX_AGE)
+        self.calibration_file = os.path.join(
+            self._xconfig.get("storage.path", self.DEFAULT_STORAGE_PATH),
+            self._xconfig.get("accelerometer.calibration.file", self.DEFAULT_CALIBRATION_FILE)
+        )
+
+        magnetometer = self._load().get("magnetometer", None)
+        if magnetometer is not None:
+            self._magnetometer_transform = (
+                np.array(magnetometer["hard_iron"], dtype=np.float64),
+                np.array(magnetometer["soft_iron"], dtype=np.float64)
+            )
+
+    def has_magnetometer_calibration(self) -> bool:
+        return self._magnetometer_transform is not None
+
+    def apply_magnetometer(self, values: np.ndarray) -> np.ndarray:
+        """
+        Calibrated magnetometer readings (n x 3). Readings of zeros mean that there
+        was no measurement, they stay zeros.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        transform = self._magnetometer_transform
+        if transform is None:
+            return values
+        hard_iron, soft_iron = transform
+        measured = np.any(values != 0, axis=1)
+        calibrated = np.zeros_like(values)
+        calibrated[measured] = (values[measured] - hard_iron) @ soft_iron.T
+        return calibrated
+
+    def fit_magnetometer(self, samples: np.ndarray) -> bool:
+        """
+        Fits the ellipsoid of raw magnetometer readings (n x 3), taken while rotating the
+        device in all directions, and keeps the calibration. False if they can't describe it.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if len(samples) < self.MIN_MAGNETOMETER_SAMPLES:
+            self._xlog.warning(f"Only {len(samples)} magnetometer readings, at least {self.MIN_MAGNETOMETER_SAMPLES} are needed")
+            return False
+
+        # Scaled to around 1 so the least squares are well conditioned
+        scale = np.abs(samples).max()
+        x, y, z = (samples / scale).T
+        # Ellipsoid: a x2 + b y2 + c z2 + 2f yz + 2g xz + 2h xy + 2p x + 2q y + 2r z = 1
+        design = np.stack([x * x, y * y, z * z, 2 * y * z, 2 * x * z, 2 * x * y, 2 * x, 2 * y, 2 * z], axis=1)
+        a, b, c, f, g, h, p, q, r = np.linalg.lstsq(design, np.ones(len(samples)), rcond=None)[0]
+        quadratic = np.array([[a, h, g], [h, b, f], [g, f, c]])
+        try:
+            centre = -np.linalg.solve(quadratic, np.array([p, q, r]))
+        except np.linalg.LinAlgError:
+            self._xlog.warning("The magnetometer readings do not describe an ellipsoid")
+            return False
+        # Centred: (v - centre)' M (v - centre) = 1
+        shape = quadratic / (1 + centre @ quadratic @ centre)
+        eigenvalues, eigenvectors = np.linalg.eigh(shape)
+        if np.any(eigenvalues <= 0):
+            self._xlog.warning("The magnetometer readings do not describe an ellipsoid")
+            return False
+        radii = 1 / np.sqrt(eigenvalues)
+        if radii.max() / radii.min() > self.MAX_AXIS_RATIO:
+            self._xlog.warning(f"The magnetometer ellipsoid is too flat ({radii.max() / radii.min():.1f}), " +
+                               "rotate the device in all directions")
+            return False
+
+        # To the sphere with the mean radius, so the values stay in the sensor units
+        radius = np.prod(radii) ** (1 / 3)
+        soft_iron = eigenvectors @ np.diag(radius / radii) @ eigenvectors.T
+        hard_iron = centre * scale
+        self._magnetometer_transform = (hard_iron, soft_iron)
+        self._save("magnetometer", {
+            "hard_iron": hard_iron.tolist(),
+            "soft_iron": soft_iron.tolist(),
+            "samples": len(samples),
+            "timestamp": time.time(),
+        })
+        self._xlog.info(f"Magnetometer calibrated with {len(samples)} readings, hard iron {np.round(hard_iron, 1).tolist()}")
+        return True
+
+    def get_gyroscope_offset(self) -> list[int] | None:
+        """
+        The stored gyroscope offset, if it is recent enough
+        """
+        gyroscope = self._load().get("gyroscope", None)
+        if gyroscope is None or time.time() - gyroscope["timestamp"] > self.GYROSCOPE_OFFSET_MAX_AGE:
+            return None
+        return list(gyroscope["offset"])
+
+    def save_gyroscope_offset(self, offset: list[int]):
+        self._save("gyroscope", {
+            "offset": [int(value) for value in offset],
+            "timestamp": time.time(),
+        })
+
+    def forget(self):
+        self._magnetometer_transform = None
+        if os.path.exists(self.calibration_file):
+            os.remove(self.calibration_file)
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.calibration_file):
+            return {}
+        storage = Storage(filename=self.calibration_file)
+        return {key: storage.get(key, None) for key in ["magnetometer", "gyroscope"]}
+
+    def _save(self, key: str, values: dict):
+        os.makedirs(os.path.dirname(self.calibration_file), exist_ok=True)
+        storage = Storage(filename=self.calibration_file)
+        storage.set(key, values)
+        storage.write_file()
@@ -0,0 +1,154 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.objects.imu_sample import ImuSample
+
+from collections import deque
+import threading, time
+
+class ImuSampler(PyXavi):
+    """
+    Samples the IMU continuously through the FIFO of the QMI8658.
+
+    The chip fills its FIFO at a fixed output data rate (ODR) and a background thread
+    drains it every DRAIN_INTERVAL with burst block reads, so no sample is lost and
+    the I2C bus only sees a few transfers per drain instead of one read per request.
+    The magnetometer is read once per drain, when it has a new measurement.
+
+    The samples are kept in a ring buffer with their timestamp, and every drain is
+    passed to the on_samples callable so that the orientation can integrate all of them.
+
+    The driver is only touched from the sampling thread. Anyone else reading it
+    must hold bus_lock, which can be given to share it with the owner of the driver.
+    The on_samples callable runs holding it too.
+
+    The config lives under `accelerometer.sampling`.
+    """
+
+    # Output data rates of the QMI8658 in Hz, and their register value
+    ODR_CODES: dict = {1000: 0x03, 500: 0x04, 250: 0x05, 125: 0x06, 62.5: 0x07, 31.25: 0x08}
+    # Frames that the FIFO holds
+    FIFO_FRAMES: int = 128
+    # Fraction of the FIFO that may fill between drains
+    MAX_FIFO_USAGE: float = 0.5
+
+    ODR: float = 125
+    DRAIN_INTERVAL: float = 0.1
+    BUFFER_SECONDS: float = 10.0
+
+    driver = None
+    bus_lock: threading.Lock = None
+    samples: deque = None
+    # Counters, for the logs
+    drains: int = 0
+    overflows: int = 0
+
+    _on_samples: callable = None
+    _magnetometer: tuple = (0, 0, 0)
+    _last_drain_time: float = None
+    _buffer_lock: threading.Lock = None
+    _stop_event: threading.Event = None
+    _thread: threading.Thread = None
+
+    def __init__(self, driver, on_samples: callable = None, bus_lock: threading.Lock = None,
+                 config: Config = None, params: Dictionary = None):
+        super(ImuSampler, self).init_pyxavi(config=config, params=params)
+
+        self.driver = driver
+        self._on_samples = on_samples
+        self.ODR = self._xconfig.get("accelerometer.sampling.odr", self.ODR)
+        self.DRAIN_INTERVAL = self._xconfig.get("accelerometer.sampling.drain_interval", self.DRAIN_INTERVAL)
+        self.BUFFER_SECONDS = self._xconfig.get("accelerometer.sampling.buffer_seconds", self.BUFFER_SECONDS)
+
+        if self.ODR not in self.ODR_CODES:
+            self._xlog.warning(f"Unsupported IMU output data rate [{self.ODR}], using 125Hz")
+            self.ODR = 125
+        max_interval = self.FIFO_FRAMES * self.MAX_FIFO_USAGE / self.ODR
+        if self.DRAIN_INTERVAL > max_interval:
+            self._xlog.warning(f"IMU drain interval of {self.DRAIN_INTERVAL}s would overflow the FIFO at " +
+                               f"{self.ODR}Hz, using {max_interval}s")
+            self.DRAIN_INTERVAL = max_interval
+
+        self.bus_lock = threading.Lock() if bus_lock is None else bus_lock
+        self._buffer_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.samples = deque(maxlen=int(self.ODR * self.BUFFER_SECONDS))
+
+    def start(self):
+        """
+        Configures the FIFO and starts draining it. Raises if the chip does not take the configuration.
+        """
+        with self.bus_lock:
+            self.driver.QMI8658_FifoEnable(odr=self.ODR_CODES[self.ODR])
+        self._last_drain_time = time.time()
+        self._thread = threading.Thread(target=self._loop, name="imu-sampler", daemon=True)
+        self._thread.start()
+        self._xlog.info(f"Sampling the IMU at {self.ODR}Hz, draining every {self.DRAIN_INTERVAL}s")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self.bus_lock:
+            self.driver.QMI8658_FifoDisable()
+        self._xlog.debug(f"IMU sampler stopped after {self.drains} drains, {self.overflows} overflows")
+
+    def get_latest(self) -> ImuSample | None:
+        with self._buffer_lock:
+            return self.samples[-1] if len(self.samples) > 0 else None
+
+    def get_samples(self, since: float = None) -> list[ImuSample]:
+        """
+        The buffered samples, oldest first. Only the ones after the timestamp `since` if given.
+        """
+        with self._buffer_lock:
+            if since is None:
+                return list(self.samples)
+            # The newest ones are at the end, walk back only as far as needed
+            newer = []
+            for sample in reversed(self.samples):
+                if sample.timestamp <= since:
+                    break
+                newer.append(sample)
+        newer.reverse()
+        return newer
+
+    def _loop(self):
+        while not self._stop_event.wait(self.DRAIN_INTERVAL):
+            try:
+                self._drain()
+            except Exception as e:
+                self._xlog.error(f"Error draining the IMU FIFO: {e}")
+                self._xlog.debug(full_stack())
+
+    def _drain(self):
+        # Whoever holds the lock (e.g. a calibration) sees no drain half done
+        with self.bus_lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        frames, overflow = self.driver.QMI8658_FifoRead()
+        magnetometer = self.driver.AK09918_MagReadLatest()
+        now = time.time()
+        self.drains += 1
+        if magnetometer is not None:
+            self._magnetometer = magnetometer
+        if overflow:
+            self.overflows += 1
+        if len(frames) == 0:
+            return
+
+        # The frames came at the ODR of the chip, which is not exact. Spread them over the
+        # time since the last drain, unless some were lost: then the nominal period is all we know.
+        period = 1 / self.ODR if overflow else (now - self._last_drain_time) / len(frames)
+        self._last_drain_time = now
+        first = now - period * (len(frames) - 1)
+        samples = [
+            ImuSample(first + period * index, acceleration, gyroscope, self._magnetometer)
+            for index, (gyroscope, acceleration) in enumerate(frames)
+        ]
+
+        with self._buffer_lock:
+            self.samples.extend(samples)
+        if self._on_samples is not None:
+            self._on_samples(samples)
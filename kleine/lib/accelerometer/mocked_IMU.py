@@ -1,6 +1,8 @@
 from pyxavi import Config, Dictionary
 from kleine.lib.abstract.pyxavi import PyXavi
 
+import time
+
 class MockedIMU(PyXavi):
 
     Gyro  = [0,0,0]
@@ -19,6 +21,10 @@ class MockedIMU(PyXavi):
     q0 = 1.0
     q1=q2=q3=0.0
     angles=[0.0,0.0,0.0]
+
+    # Frames per second that the mocked FIFO fills with, None while disabled
+    _fifo_rate: float = None
+    _fifo_last_read: float = None
     
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(MockedIMU, self).init_pyxavi(config=config, params=params)
@@ -32,7 +38,29 @@ class MockedIMU(PyXavi):
     def icm20948CalAvgValue(self, MotionVal):
         return [0.0]*9
     
-    def imuAHRSupdate(self, gx, gy, gz, ax, ay, az, mx, my, mz):
+    def imuAHRSupdate(self, gx, gy, gz, ax, ay, az, mx, my, mz, halfT=0.024):
+        pass
+
+    def QMI8658_FifoEnable(self, odr=None, size=None):
+        self._fifo_rate = self._xconfig.get("accelerometer.sampling.odr", 125)
+        self._fifo_last_read = time.monotonic()
+
+    def QMI8658_FifoDisable(self):
+        self._fifo_rate = None
+
+    def QMI8658_FifoRead(self):
+        # As many still frames as the real one would have collected since the last read
+        if self._fifo_rate is None:
+            return [], False
+        now = time.monotonic()
+        frames = int((now - self._fifo_last_read) * self._fifo_rate)
+        self._fifo_last_read += frames / self._fifo_rate
+        return [((0, 0, 0), (0, 0, 0))] * frames, False
+
+    def AK09918_MagReadLatest(self):
+        return (0, 0, 0)
+
+    def QMI8658_GyroOffset(self):
         pass
 
     def QMI8658_readTemp(self):
@@ -4,14 +4,27 @@ import os
 
 from kleine.lib.abstract.pyxavi import PyXavi
 from kleine.lib.objects.point import Point
+from kleine.lib.canvas.text_cache import TextCache
 
 from definitions import ROOT_DIR
 
 
 class Canvas(PyXavi):
+    """
+    Drawing surface where the frames are prepared before sending them to a device.
+
+    Frames can be built in layers:
+    - static: backgrounds, labels, lines and the footer. Rendered once per key and cached.
+    - dynamic: the values, drawn every frame over a copy of the static layer.
+    - overlay: modal messages, drawn last so they stay on top.
+    """
 
     _working_image: Image.Image = None
     _screen_size: Point = None
+    # Static layers already rendered, by key
+    _static_layers: dict[str, Image.Image] = None
+    # Rendered texts that repeat frame after frame
+    text_cache: TextCache = None
 
     DEFAULT_FONT_PATH = os.path.join(ROOT_DIR, "kleine", "lib", "canvas", "fonts")
     FONT_FILE: str = os.path.join(DEFAULT_FONT_PATH, "Font_with_emojis.ttc")
@@ -103,6 +116,11 @@ class Canvas(PyXavi):
         # Initialise fonts
         self._initialise_fonts()
 
+        # Initialise the cache of rendered texts
+        self.text_cache = TextCache(
+            max_entries=self._xconfig.get(self.DEVICE_CONFIG_PREFIX + ".fonts.text_cache_size", TextCache.DEFAULT_MAX_ENTRIES)
+        )
+
     def get_canvas(self, reset_base_image = True):
         if reset_base_image:
             self._reset_image()
@@ -113,6 +131,45 @@ class Canvas(PyXavi):
     def create_canvas_over_new_image(self):
         return self.get_canvas(reset_base_image=True)
 
+    def get_layered_canvas(self, static_key: str, draw_static_layer: callable) -> ImageDraw.ImageDraw:
+        """
+        Start a new frame from the cached static layer and return where to draw the dynamic layer.
+
+        The static layer is rendered only the first time a key is seen, by calling
+        draw_static_layer(draw). Next frames just copy its pixels into the working
+        image, which is reused instead of allocated again.
+        """
+        static_layer = self.get_static_layer(static_key, draw_static_layer)
+        image = self.get_image()
+        image.paste(static_layer)
+        return ImageDraw.Draw(image)
+
+    def get_static_layer(self, key: str, draw_static_layer: callable) -> Image.Image:
+        """
+        Returns the static layer for the key, rendering it if it is not cached yet.
+        """
+        if self._static_layers is None:
+            self._static_layers = {}
+
+        if key not in self._static_layers:
+            self._xlog.debug(f"Rendering static layer [{key}]")
+            layer = self._new_image()
+            draw_static_layer(ImageDraw.Draw(layer))
+            self._static_layers[key] = layer
+
+        return self._static_layers[key]
+
+    def invalidate_static_layers(self, key: str = None):
+        """
+        Forget the cached static layers, so they're rendered again. All of them if no key is given.
+        """
+        if self._static_layers is None:
+            return
+        if key is None:
+            self._static_layers = {}
+        elif key in self._static_layers:
+            del self._static_layers[key]
+
 
     def get_screen_size(self) -> Point:
         return self._screen_size
@@ -124,18 +181,20 @@ class Canvas(PyXavi):
         If does not exists, creates it.
         """
         if self._working_image is None:
+            self._working_image = self._new_image(clear_background)
+            self._xlog.debug(f"Created new working image of size {self._working_image.size} and mode {self.COLOR_MODE}")
 
-            # Default background color in a tuple as the default color mode is RGB
-            background_color = self.COLOR_BLACK
+        return self._working_image
 
-            # In case the color mode is 1 we assume an eInk, and the background is either black or white
-            if self.COLOR_MODE == "1" and clear_background:
-                background_color = self.COLOR_WHITE
+    def _new_image(self, clear_background: bool = True) -> Image.Image:
+        # Default background color in a tuple as the default color mode is RGB
+        background_color = self.COLOR_BLACK
 
-            self._working_image = Image.new(self.COLOR_MODE, (self._screen_size.x, self._screen_size.y), background_color)
-            self._xlog.debug(f"Created new working image of size {self._working_image.size} and mode {self.COLOR_MODE}")
+        # In case the color mode is 1 we assume an eInk, and the background is either black or white
+        if self.COLOR_MODE == "1" and clear_background:
+            background_color = self.COLOR_WHITE
 
-        return self._working_image
+        return Image.new(self.COLOR_MODE, (self._screen_size.x, self._screen_size.y), background_color)
     
     def _reset_image(self):
         """
@@ -0,0 +1,104 @@
+from PIL import Image, ImageDraw, ImageFont
+from collections import OrderedDict
+from typing import NamedTuple
+
+class TextSprite(NamedTuple):
+    """
+    A rendered piece of text, ready to be blitted.
+    """
+
+    # Antialiased coverage of the text. The colour is applied when blitting.
+    mask: Image.Image
+    # Bounding box relative to the anchor point, as font.getbbox() returns it
+    bbox: tuple[int, int, int, int]
+
+class TextCache:
+    """
+    LRU cache of rendered single line texts: the status bar icons, labels and values
+    that repeat from frame to frame.
+
+    Entries are keyed by (font, text, anchor, font mode). The fill colour is not part of
+    the key: the sprite is a mask and the colour is applied when blitting it, so the
+    battery icon in green or red is the same entry. The result is the same as draw.text().
+    """
+
+    DEFAULT_MAX_ENTRIES: int = 256
+
+    _entries: OrderedDict = None
+    _max_entries: int = DEFAULT_MAX_ENTRIES
+
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+
+    def get_sprite(self, text: str, font: ImageFont.FreeTypeFont, anchor: str = None, mode: str = "L") -> TextSprite:
+        key = (font, text, anchor, mode)
+        sprite = self._entries.get(key)
+        if sprite is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        bbox = font.getbbox(text, mode=mode, anchor=anchor)
+        mask = Image.new("L", (max(bbox[2] - bbox[0], 0), max(bbox[3] - bbox[1], 0)), 0)
+        ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, font=font, fill=255, anchor=anchor)
+        sprite = TextSprite(mask=mask, bbox=bbox)
+
+        self._entries[key] = sprite
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return sprite
+
+    def textbbox(self, xy: tuple, text: str, font: ImageFont.FreeTypeFont, anchor: str = None, mode: str = "L") -> tuple:
+        bbox = self.get_sprite(text, font, anchor, mode).bbox
+        return (bbox[0] + xy[0], bbox[1] + xy[1], bbox[2] + xy[0], bbox[3] + xy[1])
+
+    def draw_text(self, draw: ImageDraw.ImageDraw, xy: tuple, text: str, font: ImageFont.FreeTypeFont, fill = None, anchor: str = None):
+        sprite = self.get_sprite(text, font, anchor, draw.fontmode)
+        if sprite.mask.width == 0 or sprite.mask.height == 0:
+            return
+        draw.bitmap((int(xy[0]) + sprite.bbox[0], int(xy[1]) + sprite.bbox[1]), sprite.mask, fill=fill)
+
+    def wrap(self, draw: ImageDraw.ImageDraw) -> "CachedTextDraw":
+        """
+        Returns a drop-in replacement of the draw whose text() and textbbox() go through the cache.
+        """
+        return CachedTextDraw(draw, self)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CachedTextDraw:
+    """
+    Wraps an ImageDraw: single line text() and textbbox() calls use the TextCache,
+    anything else (multiline text, lines, rectangles...) goes to the wrapped draw.
+    """
+
+    _draw: ImageDraw.ImageDraw = None
+    _cache: TextCache = None
+
+    def __init__(self, draw: ImageDraw.ImageDraw, cache: TextCache):
+        self._draw = draw
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._draw, name)
+
+    def text(self, xy, text, fill = None, font = None, anchor = None, *args, **kwargs):
+        # Sub-pixel positions render slightly different glyphs, so those are not cached
+        if "\n" in text or font is None or len(args) > 0 or any(kwargs.get(key) for key in ["stroke_width", "embedded_color", "direction", "features", "language"]) or \
+            xy[0] != int(xy[0]) or xy[1] != int(xy[1]):
+            return self._draw.text(xy, text, fill, font, anchor, *args, **kwargs)
+        self._cache.draw_text(self._draw, xy, text, font, fill, anchor)
+
+    def textbbox(self, xy, text, font = None, anchor = None, *args, **kwargs):
+        if "\n" in text or font is None or len(args) > 0 or any(kwargs.get(key) for key in ["stroke_width", "embedded_color", "direction", "features", "language"]):
+            return self._draw.textbbox(xy, text, font, anchor, *args, **kwargs)
+        return self._cache.textbbox(xy, text, font, anchor, self._draw.fontmode)
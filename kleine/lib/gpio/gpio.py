@@ -5,13 +5,21 @@ from .mocked_gpiozero import MockedButton, MockedButtons
 
 class Gpio(PyXavi):
 
+    BOUNCE_TIME: float = 0.05
+
     mocked_buttons_manager: MockedButtons = None
     buttons: dict[str, MockedButton] = {}
     button_pins_per_name: dict[str, int] = {}
+    # Latched button edges, set from the gpiozero callback thread and consumed on read
+    _pressed_latch: dict[str, bool] = {}
+    _event_listener: callable = None
 
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(Gpio, self).init_pyxavi(config=config, params=params)
 
+        self._pressed_latch = {}
+        self.BOUNCE_TIME = self._xconfig.get("gpio.bounce_time", self.BOUNCE_TIME)
+
         # Initialise GPIO buttons
         self._xlog.info("Initialising GPIO buttons...")
 
@@ -24,12 +32,13 @@ class Gpio(PyXavi):
         if self._xconfig.get("gpio.mock", False):
             self._xlog.warning("Using mocked GPIO buttons")
             self.mocked_buttons_manager = MockedButtons(config=self._xconfig, params=self._xparams)
+            self.mocked_buttons_manager.set_on_press(self._on_mocked_button_pressed)
 
         # Gather the definitions from the config and initialise them
         try:
             button_definitions = self._xconfig.get("gpio.buttons", [])
             for button in button_definitions:
-                self.buttons[button["name"]] = self._new_button(button["pin"], button["mocked_as"])
+                self.buttons[button["name"]] = self._new_button(button["name"], button["pin"], button["mocked_as"])
                 self.button_pins_per_name[button["name"]] = button["pin"]
         except (Exception, RuntimeError, SystemExit) as e:
             self._xlog.error(f"Error initializing GPIO buttons: {e}")
@@ -47,9 +56,30 @@ class Gpio(PyXavi):
         if self._xconfig.get("gpio.mock", False):
             return self.mocked_buttons_manager.is_button_pressed(pin=self.button_pins_per_name[button_name])
 
-        return self.buttons[button_name].is_pressed
+        # We consume the latched edge, so a press is reported exactly once
+        if self._pressed_latch.get(button_name, False):
+            self._pressed_latch[button_name] = False
+            return True
+        return False
+
+    def set_event_listener(self, listener: callable):
+        """
+        Register a callable to be invoked (with the button name) on every button press.
+        It runs in the thread that detected the edge, so it must be quick and thread safe.
+        """
+        self._event_listener = listener
+
+    def _on_button_pressed(self, button_name: str):
+        self._pressed_latch[button_name] = True
+        if self._event_listener is not None:
+            self._event_listener(button_name)
+
+    def _on_mocked_button_pressed(self, pin: int):
+        for name, button_pin in self.button_pins_per_name.items():
+            if str(button_pin) == str(pin) and self._event_listener is not None:
+                self._event_listener(name)
 
-    def _new_button(self, pin: int, mocked_as: str) -> MockedButton:
+    def _new_button(self, name: str, pin: int, mocked_as: str) -> MockedButton:
         if self._xconfig.get("gpio.mock", False):
             self._xlog.warning(f"Creating mocked button for pin {pin} with key binding '{mocked_as}'")
             self.mocked_buttons_manager.add_button(pin=pin, mocked_as=mocked_as)
@@ -57,7 +87,11 @@ class Gpio(PyXavi):
             self._xlog.debug(f"Creating real button for pin {pin}")
             from gpiozero import Button
 
-            return Button(pin)
+            # Edges are latched through the callback, so the main loop can sleep
+            # and still never miss a press.
+            button = Button(pin, bounce_time=self.BOUNCE_TIME)
+            button.when_pressed = lambda: self._on_button_pressed(name)
+            return button
     
     def close(self):
         if self.mocked_buttons_manager is not None:
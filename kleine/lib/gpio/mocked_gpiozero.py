@@ -13,6 +13,7 @@ class MockedButtons(PyXavi):
     buttons: dict = {}
     buttons_by_pin: dict = {}
     _listener = None
+    _on_press_callback: callable = None
 
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(MockedButtons, self).init_pyxavi(config=config, params=params)
@@ -51,11 +52,21 @@ class MockedButtons(PyXavi):
         if value:
             self.buttons[key] = False  # Reset after reading
         return value
+
+    def set_on_press(self, callback: callable):
+        """
+        Register a callable to be invoked (with the pin) every time a mocked button is pressed
+        """
+        self._on_press_callback = callback
     
     def _on_press(self, key):
         if key in self.buttons:
             self._xlog.debug(f"Mocking GPIO: {key} key was PRESSED")
             self.buttons[key] = True
+            if self._on_press_callback is not None:
+                for pin, mocked_key in self.buttons_by_pin.items():
+                    if mocked_key == key:
+                        self._on_press_callback(pin)
     
     def start_listening(self):
         from pynput.keyboard import Listener
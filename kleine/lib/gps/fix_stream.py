@@ -0,0 +1,128 @@
+from kleine.lib.objects.gps_fix import GpsFix
+
+from collections import deque
+import threading, time
+
+class FixSubscription:
+    """
+    Bounded queue of the fixes published after subscribing.
+
+    When the consumer is too slow the oldest fixes are dropped, the newest is always kept.
+    """
+
+    _stream: "FixStream" = None
+    _fixes: deque = None
+    dropped: int = 0
+
+    def __init__(self, stream: "FixStream", max_size: int):
+        self._stream = stream
+        self._fixes = deque(maxlen=max_size)
+
+    def get(self, timeout: float = None) -> GpsFix | None:
+        """
+        Oldest fix not yet consumed, waiting up to timeout for one. None on timeout.
+        """
+        with self._stream._condition:
+            if not self._stream._condition.wait_for(lambda: len(self._fixes) > 0, timeout):
+                return None
+            return self._fixes.popleft()
+
+    def drain(self) -> list[GpsFix]:
+        """
+        All the fixes not yet consumed, without waiting.
+        """
+        with self._stream._condition:
+            fixes = list(self._fixes)
+            self._fixes.clear()
+        return fixes
+
+    def close(self):
+        self._stream.unsubscribe(self)
+
+    def _push(self, fix: GpsFix):
+        if len(self._fixes) == self._fixes.maxlen:
+            self.dropped += 1
+        self._fixes.append(fix)
+
+class FixStream:
+    """
+    Publishes the GPS fixes from the reader thread to whoever consumes them.
+
+    The reader publishes the merged values after every sentence. Only the ones that
+    differ from the previous fix become a new GpsFix: a repeated sentence does not
+    wake anybody up. Consumers either:
+    - poll get_latest() and compare the sequence with the last one they applied,
+    - block in wait_for_fix(after_sequence) until a newer fix lands,
+    - subscribe() to get every fix through a bounded queue,
+    - add_listener() to be called in the reader thread on every new fix.
+    """
+
+    # Keys that change on every sentence without the fix changing
+    IGNORED_KEYS: tuple = ("interval",)
+    DEFAULT_SUBSCRIPTION_SIZE: int = 16
+
+    _condition: threading.Condition = None
+    _latest: GpsFix = None
+    _sequence: int = 0
+    _subscriptions: list[FixSubscription] = None
+    _listeners: list = None
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._subscriptions = []
+        self._listeners = []
+
+    def publish(self, values: dict) -> GpsFix | None:
+        """
+        Publish the values as a new fix, unless they are the same as the latest one.
+        Returns the new fix, or None when nothing changed.
+        """
+        with self._condition:
+            if self._latest is not None and self._same_fix(self._latest.values, values):
+                return None
+
+            self._sequence += 1
+            fix = GpsFix(values=values, timestamp=time.time(), sequence=self._sequence)
+            self._latest = fix
+            for subscription in self._subscriptions:
+                subscription._push(fix)
+            self._condition.notify_all()
+
+        for listener in self._listeners:
+            listener()
+        return fix
+
+    def get_latest(self) -> GpsFix | None:
+        return self._latest
+
+    def wait_for_fix(self, after_sequence: int = 0, timeout: float = None) -> GpsFix | None:
+        """
+        Block until there is a fix newer than after_sequence and return it. None on timeout.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._latest is not None and self._latest.sequence > after_sequence, timeout):
+                return None
+            return self._latest
+
+    def subscribe(self, max_size: int = DEFAULT_SUBSCRIPTION_SIZE) -> FixSubscription:
+        subscription = FixSubscription(self, max_size)
+        with self._condition:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FixSubscription):
+        with self._condition:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def add_listener(self, listener: callable):
+        """
+        Register a callable to be invoked on every new fix.
+        It runs inside the publishing thread, so it must be quick and thread safe.
+        """
+        self._listeners.append(listener)
+
+    def _same_fix(self, previous: dict, current: dict) -> bool:
+        keys = (previous.keys() | current.keys()).difference(self.IGNORED_KEYS)
+        return all(previous.get(key) == current.get(key) for key in keys)
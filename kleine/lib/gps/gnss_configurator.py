@@ -0,0 +1,348 @@
+from pyxavi import Config, Dictionary, Storage
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.gps.nmea_framer import NmeaFramer
+from kleine.lib.gps.nmea_parser import NmeaParser
+from kleine.lib.utils.geodesy import Geodesy
+
+import math, os, re, struct, time
+
+class GnssConfigurator(PyXavi):
+    """
+    Configures the GNSS receiver at startup: update rate, constellations and the NMEA
+    sentences that it outputs (only GGA and RMC, the ones the reader uses).
+
+    The constellations are reduced to a set that the receiver can track at once. If it
+    still refuses them, it keeps its own and the rest of the profile is applied anyway.
+
+    Every command waits for the receiver's acknowledge, and then the stream is watched
+    for a few seconds to verify that only the expected sentences arrive at the expected
+    rate. Once verified, the configuration is saved in the receiver and the profile is
+    cached in the storage, so the next boots skip all of it while the config is the same.
+
+    Dialects:
+    - ubx: u-blox binary protocol, as the u-blox M8 in the Beitian BN-880
+    - mtk: MediaTek PMTK commands, as the Quectel L76 family
+
+    The config lives under `gps.configuration`, and the wanted rate and constellations
+    under `gps.hardware`.
+    """
+
+    DIALECT_UBX: str = "ubx"
+    DIALECT_MTK: str = "mtk"
+
+    ENABLED: bool = True
+    DIALECT: str = DIALECT_UBX
+    MESSAGES: list = ["GGA", "RMC"]
+    # Seconds to wait for the acknowledge of a command
+    ACK_TIMEOUT: float = 1.0
+    # Seconds to watch the stream after configuring
+    VERIFY_SECONDS: float = 3.0
+    # Accepted difference between the wanted and the measured update interval
+    VERIFY_INTERVAL_TOLERANCE: float = 0.25
+    # Save the configuration into the receiver's non volatile memory
+    SAVE_IN_RECEIVER: bool = True
+    DEFAULT_STORAGE_PATH: str = "storage/"
+    DEFAULT_PROFILE_FILE: str = "gps/receiver_profile.yaml"
+
+    MIN_UPDATE_INTERVAL_MS: int = 100
+    # Longest GGA or RMC sentence that we expect, to know what the serial port can carry
+    BYTES_PER_SENTENCE: int = 75
+    # Share of the serial port bandwidth that the sentences may use
+    MAX_SERIAL_USAGE: float = 0.8
+
+    # u-blox NMEA message ids, in the NMEA class 0xF0
+    UBX_NMEA_IDS: dict = {
+        "GGA": 0x00, "GLL": 0x01, "GSA": 0x02, "GSV": 0x03, "RMC": 0x04, "VTG": 0x05, "GRS": 0x06,
+        "GST": 0x07, "ZDA": 0x08, "GBS": 0x09, "DTM": 0x0A, "GNS": 0x0D, "VLW": 0x0F,
+    }
+    # u-blox systems: (gnssId, reserved tracking channels, max tracking channels)
+    UBX_GNSS: dict = {
+        "gps": (0, 8, 16),
+        "galileo": (2, 4, 8),
+        "beidou": (3, 8, 16),
+        "glonass": (6, 8, 14),
+    }
+    # Order in which the systems are kept when the receiver can't track all the wanted ones
+    CONSTELLATION_PRIORITY: list = ["gps", "galileo", "glonass", "beidou"]
+    # Major systems that the receiver tracks at once
+    MAX_CONSTELLATIONS: dict = {DIALECT_UBX: 3, DIALECT_MTK: 3}
+    # Systems that the receiver can't track together
+    INCOMPATIBLE_CONSTELLATIONS: dict = {
+        DIALECT_UBX: [{"glonass", "beidou"}],
+        DIALECT_MTK: [{"glonass", "beidou"}, {"galileo", "beidou"}],
+    }
+    # Steps that the receiver may refuse without failing the whole configuration
+    OPTIONAL_STEPS: list = ["constellations"]
+
+    # Position of every sentence in the PMTK314 fields
+    MTK_MESSAGE_FIELDS: dict = {"GLL": 0, "RMC": 1, "VTG": 2, "GGA": 3, "GSA": 4, "GSV": 5, "ZDA": 17}
+
+    profile_file: str = None
+    baud_rate: int = 9600
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(GnssConfigurator, self).init_pyxavi(config=config, params=params)
+
+        self.ENABLED = self._xconfig.get("gps.configuration.enabled", self.ENABLED)
+        self.DIALECT = self._xconfig.get("gps.configuration.dialect", self.DIALECT)
+        self.VERIFY_SECONDS = self._xconfig.get("gps.configuration.verify_seconds", self.VERIFY_SECONDS)
+        self.SAVE_IN_RECEIVER = self._xconfig.get("gps.configuration.save_in_receiver", self.SAVE_IN_RECEIVER)
+        self.profile_file = os.path.join(
+            self._xconfig.get("storage.path", self.DEFAULT_STORAGE_PATH),
+            self._xconfig.get("gps.configuration.profile_file", self.DEFAULT_PROFILE_FILE)
+        )
+        self.baud_rate = self._xconfig.get("gps.hardware.baud_rate", self.baud_rate)
+
+    def get_profile(self) -> dict:
+        """
+        The configuration that we want in the receiver
+        """
+        return {
+            "dialect": self.DIALECT,
+            "baud_rate": self.baud_rate,
+            "update_interval_ms": self._get_update_interval_ms(),
+            "messages": list(self.MESSAGES),
+            "constellations": self._get_constellations(),
+        }
+
+    def configure(self, serial_port) -> bool:
+        """
+        Apply the profile to the receiver behind the serial port, unless it was already
+        applied in a previous boot. Returns True if the receiver has the profile.
+        """
+        if not self.ENABLED:
+            self._xlog.info("🛰️ GNSS receiver configuration is disabled")
+            return False
+        if self.DIALECT not in [self.DIALECT_UBX, self.DIALECT_MTK]:
+            self._xlog.error(f"🛰️ Unknown GNSS receiver dialect [{self.DIALECT}], not configuring it")
+            return False
+
+        profile = self.get_profile()
+        if self.get_cached_profile() == profile:
+            self._xlog.info("🛰️ GNSS receiver already has the profile, skipping its configuration")
+            return True
+
+        self._xlog.info(f"🛰️ Configuring the GNSS receiver: {profile}")
+        steps = self._ubx_steps(profile) if self.DIALECT == self.DIALECT_UBX else self._mtk_steps(profile)
+        for step_name, commands in steps:
+            acknowledged = True
+            for command, ack in commands:
+                serial_port.write(command)
+                if not self._wait_for_ack(serial_port, ack):
+                    self._xlog.warning(f"🛰️ The GNSS receiver did not acknowledge the {step_name}: {command!r}")
+                    acknowledged = False
+                    break
+            if acknowledged:
+                self._xlog.debug(f"🛰️ GNSS receiver acknowledged the {step_name}")
+            elif step_name in self.OPTIONAL_STEPS:
+                self._xlog.warning(f"🛰️ The GNSS receiver keeps its previous {step_name}, applying the rest")
+            else:
+                return False
+
+        if not self.verify(serial_port, profile):
+            return False
+
+        if self.SAVE_IN_RECEIVER:
+            for command, ack in self._save_commands():
+                serial_port.write(command)
+                if not self._wait_for_ack(serial_port, ack):
+                    self._xlog.warning("🛰️ The GNSS receiver did not acknowledge saving the configuration")
+                    return False
+
+        self.cache_profile(profile)
+        self._xlog.info("🛰️ GNSS receiver configured and verified")
+        return True
+
+    def verify(self, serial_port, profile: dict) -> bool:
+        """
+        Watch the stream: only the profile's sentences must arrive, at the profile's rate
+        """
+        sentence_types, measured_interval = self.watch_stream(serial_port, self.VERIFY_SECONDS)
+        expected = set(profile["messages"])
+        if sentence_types != expected:
+            self._xlog.warning(f"🛰️ GNSS receiver outputs {sorted(sentence_types)} instead of {sorted(expected)}")
+            return False
+
+        wanted_interval = profile["update_interval_ms"] / 1000
+        if measured_interval is None:
+            self._xlog.warning(f"🛰️ Not enough GNSS receiver updates in {self.VERIFY_SECONDS}s to verify the rate")
+            return False
+        if abs(measured_interval - wanted_interval) > wanted_interval * self.VERIFY_INTERVAL_TOLERANCE:
+            self._xlog.warning(f"🛰️ GNSS receiver updates every {measured_interval:.3f}s instead of {wanted_interval:.3f}s")
+            return False
+        return True
+
+    def watch_stream(self, serial_port, seconds: float) -> tuple[set, float | None]:
+        """
+        Read the stream for some seconds. Returns the standard NMEA sentence types seen
+        and the update interval: the median step between the GPS times of the epochs.
+        """
+        # What was waiting was sent before the changes
+        serial_port.reset_input_buffer()
+        framer = NmeaFramer()
+        sentence_types = set()
+        epoch_times = {"GGA": [], "RMC": []}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            framer.read_from(serial_port)
+            for line in framer.sentences():
+                sentence_type = self._sentence_type(line)
+                if sentence_type is None:
+                    continue
+                sentence_types.add(sentence_type)
+                if sentence_type in epoch_times:
+                    msg = NmeaParser.parse(line)
+                    if msg is not None and msg.timestamp is not None:
+                        epoch_times[sentence_type].append(msg.timestamp)
+
+        # One GGA per epoch or, without it, one RMC
+        times = epoch_times["GGA"] if len(epoch_times["GGA"]) > 0 else epoch_times["RMC"]
+        steps = sorted(
+            step for step in (Geodesy.seconds_between(previous, current) for previous, current in zip(times, times[1:]))
+            if step > 0
+        )
+        # The median ignores the step when the change of rate happened
+        return sentence_types, (steps[len(steps) // 2] if len(steps) > 0 else None)
+
+    def get_cached_profile(self) -> dict | None:
+        if not os.path.exists(self.profile_file):
+            return None
+        return Storage(filename=self.profile_file).get("profile", None)
+
+    def cache_profile(self, profile: dict):
+        os.makedirs(os.path.dirname(self.profile_file), exist_ok=True)
+        storage = Storage(filename=self.profile_file)
+        storage.set("profile", profile)
+        storage.write_file()
+
+    def forget_profile(self):
+        """
+        Make the next boot configure the receiver again, e.g. after replacing it
+        """
+        if os.path.exists(self.profile_file):
+            os.remove(self.profile_file)
+
+    def _get_constellations(self) -> dict:
+        """
+        The wanted systems, reduced to what the receiver of the dialect can track at once
+        """
+        wanted = {
+            "gps": bool(self._xconfig.get("gps.hardware.use_gps", True)),
+            "glonass": bool(self._xconfig.get("gps.hardware.use_glonass", True)),
+            "galileo": bool(self._xconfig.get("gps.hardware.use_galileo", True)),
+            "beidou": bool(self._xconfig.get("gps.hardware.use_beidou", False)),
+        }
+        max_constellations = self.MAX_CONSTELLATIONS.get(self.DIALECT, len(wanted))
+        incompatible = self.INCOMPATIBLE_CONSTELLATIONS.get(self.DIALECT, [])
+        kept = []
+        for name in self.CONSTELLATION_PRIORITY:
+            if not wanted[name] or len(kept) >= max_constellations:
+                continue
+            if any(pair <= set(kept + [name]) for pair in incompatible):
+                continue
+            kept.append(name)
+        if len(kept) == 0:
+            kept = ["gps"]
+
+        dropped = [name for name in self.CONSTELLATION_PRIORITY if wanted[name] and name not in kept]
+        if len(dropped) > 0:
+            self._xlog.warning(f"🛰️ The GNSS receiver can't track all the wanted systems at once, using {kept} without {dropped}")
+        return {name: name in kept for name in wanted}
+
+    def _get_update_interval_ms(self) -> int:
+        interval_ms = max(int(self._xconfig.get("gps.hardware.update_interval_ms", 1000)), self.MIN_UPDATE_INTERVAL_MS)
+        # The serial port transmits 10 bits per byte
+        bytes_per_second = self.baud_rate / 10 * self.MAX_SERIAL_USAGE
+        min_interval_ms = math.ceil(len(self.MESSAGES) * self.BYTES_PER_SENTENCE / bytes_per_second * 1000)
+        if interval_ms < min_interval_ms:
+            self._xlog.warning(f"🛰️ {self.baud_rate} bauds can't carry a fix every {interval_ms}ms, using {min_interval_ms}ms")
+            interval_ms = min_interval_ms
+        return interval_ms
+
+    def _sentence_type(self, line: memoryview) -> str | None:
+        # Standard sentences only, e.g. "$GNGGA". Proprietary ones ("$P...") and texts are not a data output.
+        if len(line) < 7 or line[0:1] != b"$" or line[1:2] == b"P":
+            return None
+        star = bytes(line).rfind(b"*")
+        if star < 0 or f"{NmeaParser.checksum(bytes(line[1:star])):02X}".encode() != bytes(line[star + 1:star + 3]).upper():
+            return None
+        sentence_type = bytes(line[3:6]).decode("ascii", errors="replace")
+        return None if sentence_type == "TXT" else sentence_type
+
+    def _wait_for_ack(self, serial_port, ack: re.Pattern | None) -> bool:
+        """
+        Read until the acknowledge arrives. Its first group tells if it is positive.
+        """
+        if ack is None:
+            return True
+        received = bytearray()
+        deadline = time.monotonic() + self.ACK_TIMEOUT
+        while time.monotonic() < deadline:
+            waiting = serial_port.in_waiting
+            received += serial_port.read(waiting if waiting > 0 else 1)
+            match = ack.search(received)
+            if match is not None:
+                return match.group(1) in [b"\x01", b"3"]
+        return False
+
+    # u-blox
+
+    def _ubx_steps(self, profile: dict) -> list:
+        constellations = profile["constellations"]
+        gnss_blocks = b"".join(
+            struct.pack("<BBBBI", gnss_id, reserved_channels, max_channels, 0,
+                        # Enable bit, and the L1 signal of each system
+                        (0x01 if constellations[name] else 0x00) | 0x010000)
+            for name, (gnss_id, reserved_channels, max_channels) in self.UBX_GNSS.items()
+        )
+        return [
+            ("constellations", [self._ubx_command(0x06, 0x3E, struct.pack("<BBBB", 0, 0, 0xFF, len(self.UBX_GNSS)) + gnss_blocks)]),
+            ("update rate", [self._ubx_command(0x06, 0x08, struct.pack("<HHH", profile["update_interval_ms"], 1, 1))]),
+            ("sentences", [
+                self._ubx_command(0x06, 0x01, struct.pack("<BBB", 0xF0, message_id, 1 if name in profile["messages"] else 0))
+                for name, message_id in self.UBX_NMEA_IDS.items()
+            ]),
+        ]
+
+    def _ubx_command(self, message_class: int, message_id: int, payload: bytes) -> tuple[bytes, re.Pattern]:
+        body = struct.pack("<BBH", message_class, message_id, len(payload)) + payload
+        command = b"\xb5\x62" + body + self._ubx_checksum(body)
+        # ACK-ACK (0x05 0x01) or ACK-NAK (0x05 0x00) with the class and id of the command
+        ack = re.compile(b"\xb5\x62\x05([\x00\x01])\x02\x00" + re.escape(bytes([message_class, message_id])), re.DOTALL)
+        return command, ack
+
+    def _ubx_checksum(self, body: bytes) -> bytes:
+        # 8 bit Fletcher over class, id, length and payload
+        ck_a = ck_b = 0
+        for byte in body:
+            ck_a = (ck_a + byte) & 0xFF
+            ck_b = (ck_b + ck_a) & 0xFF
+        return bytes([ck_a, ck_b])
+
+    # MediaTek
+
+    def _mtk_steps(self, profile: dict) -> list:
+        constellations = profile["constellations"]
+        rates = [0] * 19
+        for name in profile["messages"]:
+            rates[self.MTK_MESSAGE_FIELDS[name]] = 1
+        return [
+            ("constellations", [self._mtk_command("353", f"{int(constellations['gps'])},{int(constellations['glonass'])}," +
+                                                         f"{int(constellations['galileo'])},0,{int(constellations['beidou'])}")]),
+            ("update rate", [self._mtk_command("220", str(profile["update_interval_ms"]))]),
+            ("sentences", [self._mtk_command("314", ",".join(str(rate) for rate in rates))]),
+        ]
+
+    def _mtk_command(self, command: str, arguments: str) -> tuple[bytes, re.Pattern]:
+        body = f"PMTK{command},{arguments}".encode("ascii")
+        sentence = b"$" + body + f"*{NmeaParser.checksum(body):02X}\r\n".encode("ascii")
+        # PMTK001,<command>,<flag>: 3 is success
+        ack = re.compile(rb"\$PMTK001," + command.encode("ascii") + rb",(\d)")
+        return sentence, ack
+
+    def _save_commands(self) -> list:
+        if self.DIALECT == self.DIALECT_UBX:
+            # CFG-CFG: save everything into battery backed RAM, flash and EEPROM
+            return [self._ubx_command(0x06, 0x09, struct.pack("<IIIB", 0, 0xFFFF, 0, 0x17))]
+        # MTK receivers keep the settings while their backup battery lasts, no command needed
+        return []
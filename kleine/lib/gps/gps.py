@@ -2,6 +2,9 @@ from pyxavi import Config, Dictionary
 from kleine.lib.abstract.pyxavi import PyXavi
 
 from kleine.lib.gps.mocked_serial import MockedSerial
+from kleine.lib.gps.fix_stream import FixSubscription
+from kleine.lib.objects.gps_fix import GpsFix
+from kleine.lib.objects.gps_health import GpsHealth
 
 class GPS(PyXavi):
 
@@ -10,7 +13,11 @@ class GPS(PyXavi):
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(GPS, self).init_pyxavi(config=config, params=params)
 
-        if self._xconfig.get("gps.mock", True):
+        # A replay file wins over the mock and the hardware
+        if self._xconfig.get("gps.replay_file", None):
+            from kleine.lib.gps.nmea_replay import NmeaReplay
+            self.driver = NmeaReplay(config=config, params=params)
+        elif self._xconfig.get("gps.mock", True):
             self.driver = MockedSerial(config=config, params=params)
         else:
             from kleine.lib.gps.nmea_reader import NMEAReader
@@ -19,6 +26,39 @@ class GPS(PyXavi):
     def close(self):
         self.driver.close()
 
+    def add_listener(self, listener: callable):
+        """
+        Register a callable to be invoked when the driver publishes a new fix
+        """
+        self.driver.add_listener(listener)
+
+    def get_latest_fix(self) -> GpsFix | None:
+        """
+        Latest fix published by the driver. Compare its sequence with the last one
+        processed to know if it is new.
+        """
+        return self.driver.get_latest_fix()
+
+    def wait_for_fix(self, after_sequence: int = 0, timeout: float = None) -> GpsFix | None:
+        """
+        Block until a fix newer than after_sequence is published. None on timeout.
+        """
+        return self.driver.fix_stream.wait_for_fix(after_sequence, timeout)
+
+    def subscribe(self, max_size: int = None) -> FixSubscription:
+        """
+        Get every new fix through a bounded queue, for consumers that can't miss any (e.g. a track recorder).
+        """
+        if max_size is None:
+            return self.driver.fix_stream.subscribe()
+        return self.driver.fix_stream.subscribe(max_size)
+
+    def get_health(self) -> GpsHealth:
+        """
+        State of the link with the receiver and its error counters
+        """
+        return self.driver.get_health()
+
     def get_position(self) -> dict | None:
         data = self.driver.get_gps_data()
         # dd({
@@ -1,12 +1,22 @@
 from pyxavi import Config, Dictionary
 from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.objects.gps_fix import GpsFix
+from kleine.lib.objects.gps_health import GpsHealth
+from kleine.lib.objects.gps_link_state import GPSLinkState
+from kleine.lib.gps.fix_stream import FixStream
 
 from datetime import time
 
 class MockedSerial(PyXavi):
 
+    fix_stream: FixStream = None
+
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(MockedSerial, self).init_pyxavi(config=config, params=params)
+
+        # Mocked data never changes, so it is published only once
+        self.fix_stream = FixStream()
+        self.fix_stream.publish(self.read_serial_data())
     
     def read_serial_data(self) -> dict:
         # Return mocked GPS data
@@ -17,8 +27,17 @@ class MockedSerial(PyXavi):
             "status": "A"
         }
     
+    def add_listener(self, listener: callable):
+        self.fix_stream.add_listener(listener)
+
     def get_gps_data(self) -> dict:
         return self.read_serial_data()
+
+    def get_latest_fix(self) -> GpsFix | None:
+        return self.fix_stream.get_latest()
+
+    def get_health(self) -> GpsHealth:
+        return GpsHealth(state=GPSLinkState.CONNECTED, seconds_since_data=0, reconnects=0, parse_errors=0, retry_in=None)
     
     def close(self):
         pass
\ No newline at end of file
@@ -0,0 +1,171 @@
+from pyxavi import Config, Dictionary
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.utils.geodesy import Geodesy, GeoPoint
+
+from datetime import time
+
+class MotionEstimator(PyXavi):
+    """
+    Streaming estimate of the speed and the heading, fused from:
+    - the speed and course over ground that the receiver measures (RMC), by Doppler
+    - the distance and bearing between consecutive fixes
+    - optionally the IMU acceleration along the direction of travel, to predict the speed
+
+    The speed goes through an alpha-beta filter (speed and acceleration). The heading is
+    filtered as an angle, wrapping at 360, and held while stopped because the course is
+    only noise then. Every update costs the same, whatever the history.
+
+    The reader publishes a fix per sentence (GGA, then RMC with the speed...), so the fixes
+    of the same GPS epoch redo the update of that epoch with the newest measurements.
+
+    The outputs are rounded to the display resolution and update() tells if they changed,
+    so the screen is only redrawn when the shown numbers change.
+
+    The config lives under `gps.motion`.
+    """
+
+    # How much of the speed residual is corrected on every update [0, 1]
+    SPEED_ALPHA: float = 0.3
+    # How much of the speed residual goes into the acceleration [0, 1]
+    SPEED_BETA: float = 0.05
+    # Weight of the speed from the position delta when the receiver gives its own speed [0, 1]
+    POSITION_SPEED_WEIGHT: float = 0.2
+    # How much of the heading residual is corrected on every update [0, 1]
+    HEADING_ALPHA: float = 0.3
+    # Km/h under which the heading is held
+    MIN_SPEED_FOR_HEADING: float = 3.0
+    # Seconds between fixes after which the estimate starts again from the measurements
+    MAX_GAP: float = 5.0
+    # How fast the IMU bias (gravity from the mounting tilt, offsets) is learnt [0, 1]
+    IMU_BIAS_ALPHA: float = 0.05
+    # Display resolution of the outputs, in km/h and degrees
+    SPEED_RESOLUTION: float = 1.0
+    HEADING_RESOLUTION: float = 1.0
+    # Fraction of the resolution that the estimate must move away from the shown value to
+    # change it. Over 0.5 avoids flipping between two values when it sits on the boundary.
+    HYSTERESIS: float = 0.7
+
+    # Filter state: speed in km/h, acceleration in km/h per second, heading in degrees
+    # and IMU bias in km/h per second. None while unknown.
+    _speed: float = None
+    _acceleration: float = 0.0
+    _heading: float = None
+    _imu_bias: float = 0.0
+    # State before the update of the current epoch, to redo it
+    _state_before_epoch: tuple = None
+
+    _epoch_time: time = None
+    _epoch_point: GeoPoint = None
+    _previous_time: time = None
+    _previous_point: GeoPoint = None
+
+    # Rounded outputs
+    speed: float = None
+    heading: float = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(MotionEstimator, self).init_pyxavi(config=config, params=params)
+
+        self.SPEED_ALPHA = self._xconfig.get("gps.motion.speed_alpha", self.SPEED_ALPHA)
+        self.SPEED_BETA = self._xconfig.get("gps.motion.speed_beta", self.SPEED_BETA)
+        self.POSITION_SPEED_WEIGHT = self._xconfig.get("gps.motion.position_speed_weight", self.POSITION_SPEED_WEIGHT)
+        self.HEADING_ALPHA = self._xconfig.get("gps.motion.heading_alpha", self.HEADING_ALPHA)
+        self.MIN_SPEED_FOR_HEADING = self._xconfig.get("gps.motion.min_speed_for_heading", self.MIN_SPEED_FOR_HEADING)
+        self.MAX_GAP = self._xconfig.get("gps.motion.max_gap", self.MAX_GAP)
+        self.SPEED_RESOLUTION = self._xconfig.get("gps.motion.speed_resolution", self.SPEED_RESOLUTION)
+        self.HEADING_RESOLUTION = self._xconfig.get("gps.motion.heading_resolution", self.HEADING_RESOLUTION)
+        self.HYSTERESIS = self._xconfig.get("gps.motion.hysteresis", self.HYSTERESIS)
+
+    def update(self, gps_time: time, point: GeoPoint, speed: float = None, course: float = None, acceleration: float = None) -> bool:
+        """
+        Add a fix: its GPS time, its position, the receiver's speed in km/h and course in
+        degrees if it gave them, and the acceleration along the travel in m/s2 if known.
+        Returns True if the rounded speed or heading changed.
+        """
+        if gps_time is None or point is None:
+            return False
+
+        if gps_time == self._epoch_time:
+            # Another sentence of the same epoch: redo its update
+            self._speed, self._acceleration, self._heading, self._imu_bias = self._state_before_epoch
+        else:
+            self._state_before_epoch = (self._speed, self._acceleration, self._heading, self._imu_bias)
+            self._previous_time, self._previous_point = self._epoch_time, self._epoch_point
+        self._epoch_time, self._epoch_point = gps_time, point
+
+        seconds = None if self._previous_time is None else Geodesy.seconds_between(self._previous_time, gps_time)
+        if seconds is None or seconds <= 0 or seconds > self.MAX_GAP:
+            self._restart(speed, course)
+        else:
+            self._update_speed(seconds, point, speed, acceleration)
+            self._update_heading(point, course)
+
+        return self._round_outputs()
+
+    def reset(self):
+        self._speed, self._acceleration, self._heading, self._imu_bias = None, 0.0, None, 0.0
+        self._state_before_epoch = None
+        self._epoch_time = self._epoch_point = self._previous_time = self._previous_point = None
+        self.speed = self.heading = None
+
+    def _restart(self, speed: float | None, course: float | None):
+        # Nothing to compare with: take what the receiver says, if anything
+        self._speed = speed
+        self._acceleration = 0.0
+        self._heading = course if speed is not None and speed >= self.MIN_SPEED_FOR_HEADING else self._heading
+
+    def _update_speed(self, seconds: float, point: GeoPoint, speed: float | None, acceleration: float | None):
+        position_speed = Geodesy.speed_kmh(Geodesy.distance_between(self._previous_point, point), seconds)
+        if speed is None:
+            measured = position_speed
+        else:
+            measured = (1 - self.POSITION_SPEED_WEIGHT) * speed + self.POSITION_SPEED_WEIGHT * position_speed
+
+        if self._speed is None:
+            self._speed = measured
+            return
+
+        # Predict with the IMU when we have it, otherwise with the acceleration we estimated
+        imu_acceleration = None if acceleration is None else acceleration * 3.6
+        predicted_acceleration = self._acceleration if imu_acceleration is None else imu_acceleration - self._imu_bias
+        predicted = max(self._speed + predicted_acceleration * seconds, 0.0)
+
+        residual = measured - predicted
+        previous_speed = self._speed
+        self._speed = max(predicted + self.SPEED_ALPHA * residual, 0.0)
+        self._acceleration += self.SPEED_BETA * residual / seconds
+        if imu_acceleration is not None:
+            # Whatever the IMU reads on top of the real acceleration is bias
+            bias = imu_acceleration - (self._speed - previous_speed) / seconds
+            self._imu_bias += self.IMU_BIAS_ALPHA * (bias - self._imu_bias)
+
+    def _update_heading(self, point: GeoPoint, course: float | None):
+        if self._speed is None or self._speed < self.MIN_SPEED_FOR_HEADING:
+            return
+
+        measured = course if course is not None else Geodesy.bearing_between(self._previous_point, point)
+        if self._heading is None:
+            self._heading = measured % 360
+            return
+        # Shortest way around the circle, e.g. from 350 to 10 is +20
+        residual = (measured - self._heading + 180) % 360 - 180
+        self._heading = (self._heading + self.HEADING_ALPHA * residual) % 360
+
+    def _round_outputs(self) -> bool:
+        speed = self._shown_value(self._speed, self.speed, self.SPEED_RESOLUTION)
+        heading = self._shown_value(self._heading, self.heading, self.HEADING_RESOLUTION, circular=True)
+        changed = speed != self.speed or heading != self.heading
+        self.speed, self.heading = speed, heading
+        return changed
+
+    def _shown_value(self, value: float | None, shown: float | None, resolution: float, circular: bool = False) -> float | None:
+        if value is None:
+            return None
+        if shown is not None:
+            difference = value - shown
+            if circular:
+                difference = (difference + 180) % 360 - 180
+            if abs(difference) < self.HYSTERESIS * resolution:
+                return shown
+        rounded = round(round(value / resolution) * resolution, 3)
+        return rounded % 360 if circular else rounded
@@ -0,0 +1,87 @@
+from typing import Iterator
+
+class NmeaFramer:
+    """
+    Splits the byte stream from the GPS serial port into NMEA sentences.
+
+    Instead of a readline() call and a decoded string per sentence, it reads whatever
+    the port has waiting into a preallocated buffer and hands out the sentences as
+    memoryview slices of it, without the "\\r\\n". Nothing is decoded here: the parser
+    only decodes the fields of the sentences it uses.
+
+    The slices are only valid until the next read: consume them before reading again.
+    """
+
+    DEFAULT_CAPACITY: int = 4096
+
+    _buffer: bytearray = None
+    _view: memoryview = None
+    # Unconsumed bytes are in _buffer[_start:_end]
+    _start: int = 0
+    _end: int = 0
+
+    bytes_read: int = 0
+    sentences_framed: int = 0
+    # Times that the buffer filled up without a line end, and its content was dropped
+    overflows: int = 0
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+
+    def read_from(self, serial_port) -> int:
+        """
+        Read everything that the port has waiting. When nothing is waiting, block until
+        the next byte arrives or the port timeout passes, so the caller does not spin.
+        Returns the amount of bytes read.
+        """
+        waiting = serial_port.in_waiting
+        data = serial_port.read(waiting if waiting > 0 else 1)
+        self.feed(data)
+        return len(data)
+
+    def feed(self, data: bytes):
+        size = len(data)
+        if size == 0:
+            return
+        self.bytes_read += size
+
+        capacity = len(self._buffer)
+        if self._end + size > capacity:
+            self._compact()
+        if self._end + size > capacity:
+            # No line end in a whole buffer: this is not NMEA, start over
+            self.overflows += 1
+            self._start = self._end = 0
+            data = data[-capacity:]
+            size = len(data)
+
+        self._view[self._end:self._end + size] = data
+        self._end += size
+
+    def sentences(self) -> Iterator[memoryview]:
+        """
+        Yield the complete sentences buffered so far. An incomplete one stays for the next read.
+        """
+        while True:
+            line_end = self._buffer.find(b"\r\n", self._start, self._end)
+            if line_end == -1:
+                break
+            start = self._start
+            self._start = line_end + 2
+            if line_end > start:
+                self.sentences_framed += 1
+                yield self._view[start:line_end]
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def _compact(self):
+        """
+        Move the incomplete sentence to the beginning of the buffer
+        """
+        pending = self._end - self._start
+        if self._start > 0:
+            self._buffer[0:pending] = self._buffer[self._start:self._end]
+        self._start = 0
+        self._end = pending
@@ -0,0 +1,195 @@
+from kleine.lib.objects.nmea_sentence import NmeaSentence
+
+from datetime import date, time, timezone
+import pynmea2
+
+class NmeaParser:
+    """
+    Parses the only NMEA sentences we use (GGA, RMC and GLL) straight from the bytes
+    read from the serial port.
+
+    pynmea2 builds a generic object for every sentence and converts the fields lazily
+    on every attribute access, also for the GSV/GSA/VTG sentences that we then ignore.
+    Here the talker and the sentence type are checked first, on the raw bytes, and only
+    the fields that we use are converted. Anything else returns None without decoding.
+
+    If a sentence of a known type can't be decoded by the fast path (some receivers
+    use unusual field formats), it goes through pynmea2 as before.
+    """
+
+    TALKERS: frozenset = frozenset([b"GP", b"GN", b"GL", b"GA", b"GB", b"BD", b"GQ", b"GI"])
+    SENTENCE_TYPES: frozenset = frozenset([b"GGA", b"RMC", b"GLL"])
+
+    @staticmethod
+    def parse(line: bytes | memoryview) -> NmeaSentence | None:
+        """
+        Parse a sentence like b"$GNGGA,...*hh", with or without the trailing "\\r\\n".
+        It also takes the memoryview slices from the NmeaFramer.
+        Returns None for the sentences that we don't use.
+        Raises pynmea2.ChecksumError / pynmea2.ParseError on corrupted sentences.
+        """
+        if isinstance(line, bytes):
+            line = line.strip()
+        if len(line) < 7 or line[0] != 0x24:    # "$"
+            return None
+
+        # Reject what we don't use before touching the rest of the sentence
+        header = bytes(line[1:6])
+        talker = header[0:2]
+        sentence_type = header[2:5]
+        if sentence_type not in NmeaParser.SENTENCE_TYPES or talker not in NmeaParser.TALKERS:
+            return None
+        line = bytes(line)
+
+        star = line.rfind(b"*")
+        if star == -1:
+            body = line[1:]
+        else:
+            body = line[1:star]
+            try:
+                expected = int(line[star + 1:star + 3], 16)
+            except ValueError:
+                raise pynmea2.ParseError("Invalid checksum field", line)
+            if NmeaParser.checksum(body) != expected:
+                raise pynmea2.ChecksumError(f"Checksum does not match in {line!r}", line)
+
+        fields = body.split(b",")
+        try:
+            if sentence_type == b"GGA":
+                return NmeaParser._parse_gga(talker, fields)
+            elif sentence_type == b"RMC":
+                return NmeaParser._parse_rmc(talker, fields)
+            return NmeaParser._parse_gll(talker, fields)
+        except (ValueError, IndexError):
+            return NmeaParser._parse_with_pynmea2(line)
+
+    @staticmethod
+    def checksum(body: bytes) -> int:
+        """
+        XOR of all the bytes between "$" and "*".
+        Folds the bytes as a big integer, so it takes a few operations instead of one per byte.
+        """
+        value = int.from_bytes(body, "big")
+        width = 8
+        while width < len(body) * 8:
+            width *= 2
+        while width > 8:
+            width //= 2
+            value = (value >> width) ^ (value & ((1 << width) - 1))
+        return value
+
+    @staticmethod
+    def _parse_gga(talker: bytes, fields: list[bytes]) -> NmeaSentence:
+        # GGA,time,lat,N,lon,E,quality,sats,hdop,altitude,M,geoid,M,age,station
+        return NmeaSentence(
+            sentence_type="GGA",
+            talker=talker.decode(),
+            timestamp=NmeaParser._time(fields[1]),
+            latitude=NmeaParser._degrees(fields[2], fields[3], b"N", b"S"),
+            longitude=NmeaParser._degrees(fields[4], fields[5], b"E", b"W"),
+            lat_dir=fields[3].decode(),
+            lon_dir=fields[5].decode(),
+            gps_qual=int(fields[6]) if fields[6] else None,
+            num_sats=int(fields[7]) if fields[7] else None,
+            altitude=float(fields[9]) if fields[9] else None,
+            altitude_units=fields[10].decode(),
+        )
+
+    @staticmethod
+    def _parse_rmc(talker: bytes, fields: list[bytes]) -> NmeaSentence:
+        # RMC,time,status,lat,N,lon,E,speed,course,date,variation,E,mode
+        return NmeaSentence(
+            sentence_type="RMC",
+            talker=talker.decode(),
+            timestamp=NmeaParser._time(fields[1]),
+            status=fields[2].decode(),
+            latitude=NmeaParser._degrees(fields[3], fields[4], b"N", b"S"),
+            longitude=NmeaParser._degrees(fields[5], fields[6], b"E", b"W"),
+            lat_dir=fields[4].decode(),
+            lon_dir=fields[6].decode(),
+            spd_over_grnd=float(fields[7]) if fields[7] else None,
+            true_course=float(fields[8]) if fields[8] else None,
+            datestamp=NmeaParser._date(fields[9]),
+        )
+
+    @staticmethod
+    def _parse_gll(talker: bytes, fields: list[bytes]) -> NmeaSentence:
+        # GLL,lat,N,lon,E,time,status,mode
+        return NmeaSentence(
+            sentence_type="GLL",
+            talker=talker.decode(),
+            latitude=NmeaParser._degrees(fields[1], fields[2], b"N", b"S"),
+            longitude=NmeaParser._degrees(fields[3], fields[4], b"E", b"W"),
+            lat_dir=fields[2].decode(),
+            lon_dir=fields[4].decode(),
+            timestamp=NmeaParser._time(fields[5]),
+            status=fields[6].decode(),
+        )
+
+    @staticmethod
+    def _degrees(value: bytes, direction: bytes, positive: bytes, negative: bytes) -> float:
+        """
+        "ddmm.mmmm" into signed decimal degrees, as pynmea2 does
+        """
+        if not value or value == b"0":
+            return 0.0
+        minutes_start = value.index(b".") - 2
+        if minutes_start < 1:
+            raise ValueError(f"Invalid coordinate {value!r}")
+        degrees = float(value[:minutes_start]) + float(value[minutes_start:]) / 60
+        if direction == positive:
+            return degrees
+        if direction == negative:
+            return -degrees
+        return 0.0
+
+    @staticmethod
+    def _time(value: bytes) -> time | None:
+        """
+        "hhmmss.sss" into a UTC time, as pynmea2 does
+        """
+        if not value:
+            return None
+        microseconds = int(float(value[6:]) * 1000000) if len(value) > 6 else 0
+        return time(int(value[0:2]), int(value[2:4]), int(value[4:6]), microseconds, tzinfo=timezone.utc)
+
+    @staticmethod
+    def _date(value: bytes) -> date | None:
+        """
+        "ddmmyy" into a date
+        """
+        if not value:
+            return None
+        return date(2000 + int(value[4:6]), int(value[2:4]), int(value[0:2]))
+
+    @staticmethod
+    def _parse_with_pynmea2(line: bytes) -> NmeaSentence | None:
+        msg = pynmea2.parse(line.decode("ascii", errors="replace"))
+        sentence_type = msg.sentence_type
+        if sentence_type not in ["GGA", "RMC", "GLL"]:
+            return None
+        # pynmea2 converts the fields on access, a corrupted one raises here
+        try:
+            return NmeaParser._sentence_from_pynmea2(msg, sentence_type)
+        except (ValueError, TypeError, IndexError) as e:
+            raise pynmea2.ParseError(f"Invalid field in {line!r}: {e}", line)
+
+    @staticmethod
+    def _sentence_from_pynmea2(msg: pynmea2.NMEASentence, sentence_type: str) -> NmeaSentence:
+        return NmeaSentence(
+            sentence_type=sentence_type,
+            talker=msg.talker,
+            timestamp=msg.timestamp,
+            latitude=msg.latitude,
+            longitude=msg.longitude,
+            lat_dir=msg.lat_dir,
+            lon_dir=msg.lon_dir,
+            status=getattr(msg, "status", None),
+            gps_qual=int(msg.gps_qual) if getattr(msg, "gps_qual", None) is not None else None,
+            num_sats=int(msg.num_sats) if getattr(msg, "num_sats", None) else None,
+            altitude=getattr(msg, "altitude", None),
+            altitude_units=getattr(msg, "altitude_units", None),
+            spd_over_grnd=getattr(msg, "spd_over_grnd", None),
+            true_course=getattr(msg, "true_course", None),
+            datestamp=getattr(msg, "datestamp", None),
+        )
@@ -2,6 +2,14 @@ from pyxavi import Config, Dictionary, full_stack
 from kleine.lib.abstract.pyxavi import PyXavi
 from kleine.lib.utils.calculations import Calculations
 from kleine.lib.objects.gps_signal_quality import GPSSignalQuality
+from kleine.lib.objects.gps_fix import GpsFix
+from kleine.lib.objects.gps_health import GpsHealth
+from kleine.lib.objects.gps_link_state import GPSLinkState
+from kleine.lib.objects.nmea_sentence import NmeaSentence
+from kleine.lib.gps.fix_stream import FixStream
+from kleine.lib.gps.nmea_parser import NmeaParser
+from kleine.lib.gps.nmea_framer import NmeaFramer
+from kleine.lib.gps.gnss_configurator import GnssConfigurator
 
 import serial
 import time
@@ -22,16 +30,45 @@ class NMEAReader(PyXavi):
     USE_GPS = True
     USE_GLONASS = True
     USE_GALILEO = True
-    USE_BEIDOU = True
+    USE_BEIDOU = False
     # =================================
 
     ACTIVATE_LOGGING = False
     GOOD_SIGNAL_MIN_SATS = 6
     POOR_SIGNAL_MIN_SATS = 2
 
+    # Link supervision
+    # Seconds without data to consider the link stale
+    STALE_SECONDS: float = 5.0
+    # Seconds without data to open the port again. 0 to never do it
+    RECONNECT_WHEN_STALE_FOR: float = 30.0
+    # Seconds to wait before opening the port again, doubling on every failure
+    RECONNECT_MIN_DELAY: float = 1.0
+    RECONNECT_MAX_DELAY: float = 60.0
+    # Errors in a row in the read loop before opening the port again
+    MAX_CONSECUTIVE_ERRORS: int = 10
+    # Seconds between logged parse errors, the rest are only counted
+    PARSE_ERROR_LOG_INTERVAL: float = 10.0
+
     thread_lock: threading.Lock = None
     receiver_thread: threading.Thread = None
     loop_is_allowed = True
+    fix_stream: FixStream = None
+    _last_fix_time: float = None
+    # CPU seconds used by the receiver thread, known once it finished
+    thread_cpu_time: float = None
+    # Set on close, to interrupt the waits of the thread
+    _stop_event: threading.Event = None
+
+    link_state: str = GPSLinkState.CONNECTING
+    reconnects: int = 0
+    parse_errors: int = 0
+    # From time.monotonic()
+    _connected_at: float = None
+    _last_data_time: float = None
+    _retry_at: float = None
+    _last_parse_error_log: float = None
+    _parse_errors_logged: int = 0
 
     cumulative_data = {
         # Inferred
@@ -52,12 +89,15 @@ class NMEAReader(PyXavi):
         # Incoming from RMC
         "speed": None,
         "heading": None,
+        "datestamp": None,
     }
 
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(NMEAReader, self).init_pyxavi(config=config, params=params)
 
         self.thread_lock = threading.Lock()
+        self.fix_stream = FixStream()
+        self._stop_event = threading.Event()
         self.ACTIVATE_LOGGING = self._xconfig.get("gps.activate_logging", self.ACTIVATE_LOGGING)
 
         self.SERIAL_PORT = self._xconfig.get("gps.hardware.serial_port", self.SERIAL_PORT)
@@ -67,220 +107,271 @@ class NMEAReader(PyXavi):
         self.USE_GLONASS = self._xconfig.get("gps.hardware.use_glonass", self.USE_GLONASS)
         self.USE_GALILEO = self._xconfig.get("gps.hardware.use_galileo", self.USE_GALILEO)
         self.USE_BEIDOU = self._xconfig.get("gps.hardware.use_beidou", self.USE_BEIDOU)
+        self.STALE_SECONDS = self._xconfig.get("gps.supervisor.stale_seconds", self.STALE_SECONDS)
+        self.RECONNECT_WHEN_STALE_FOR = self._xconfig.get("gps.supervisor.reconnect_when_stale_for", self.RECONNECT_WHEN_STALE_FOR)
+        self.RECONNECT_MIN_DELAY = self._xconfig.get("gps.supervisor.reconnect_min_delay", self.RECONNECT_MIN_DELAY)
+        self.RECONNECT_MAX_DELAY = self._xconfig.get("gps.supervisor.reconnect_max_delay", self.RECONNECT_MAX_DELAY)
         self._xlog.info(f"Initializing NMEA Reader with: port [{self.SERIAL_PORT}], baud rate [{self.BAUD_RATE}], update interval [{self.UPDATE_INTERVAL_MS}], use GPS [{self.USE_GPS}], use GLONASS [{self.USE_GLONASS}], use Galileo [{self.USE_GALILEO}], use BeiDou [{self.USE_BEIDOU}]")
 
-        # Configure the device
+        # The receiver is configured from the thread, it takes a few seconds
         try:
-            # with serial.Serial(self.SERIAL_PORT, self.BAUD_RATE, timeout=1) as ser:
-            # self.serial_device = serial.Serial(NMEAReader.SERIAL_PORT, NMEAReader.BAUD_RATE, timeout=1)
-            # time.sleep(2)  # Wait for module to initialize
-
-            # self._xlog.debug(">>> Configuring GNSS systems...")
-            # self.configure_gnss_systems(self.serial_device)
-
-            # self._xlog.debug(">>> Setting output interval...")
-            # self.configure_update_rate(self.serial_device, NMEAReader.UPDATE_INTERVAL_MS)
-
-            # self._xlog.debug(">>> Enabling NMEA messages...")
-            # self.configure_nmea_output(self.serial_device)
-
-            # self._xlog.debug(">>> Saving configuration...")
-            # self.save_configuration(self.serial_device)
-
-            self._xlog.debug(">>> Configuration done. Starting data read...\n")
+            self._xlog.debug(">>> Starting data read...\n")
             self.receiver_thread = threading.Thread(target=self.read_nmea_loop)
             self.receiver_thread.start()
         except serial.SerialException as e:
             self._xlog.error(f"Serial error: {e}")
             self._xlog.debug(full_stack())
 
-    def calculate_checksum(self, nmea_str):
-        checksum = 0
-        for char in nmea_str:
-            checksum ^= ord(char)
-        return f"{checksum:02X}"
-
-    def send_command(self, serial_port, base_command):
-        nmea_body = base_command.strip().lstrip('$')
-        checksum = self.calculate_checksum(nmea_body)
-        full_command = f"${nmea_body}*{checksum}\r\n"
-        serial_port.write(full_command.encode('ascii'))
-        self._xlog.debug(f">> {full_command.strip()}")
-
-    def configure_gnss_systems(self, ser):
-        mode = 1  # enable/disable each individually
-        gps = int(self.USE_GPS)
-        glonass = int(self.USE_GLONASS)
-        galileo = int(self.USE_GALILEO)
-        beidou = int(self.USE_BEIDOU)
-        # Format: $PQGNSS,<mode>,<gps>,<glonass>,<galileo>,<beidou>,<reserved>
-        base_cmd = f"PQGNSS,{mode},{gps},{glonass},{galileo},{beidou},0"
-        self.send_command(ser, base_cmd)
-
-
-    def configure_update_rate(self, ser, interval_ms):
-        interval_ms = max(200, interval_ms)  # minimum allowed by many modules
-        rate_hz = int(1000 / interval_ms)
-        base_cmd = f"PQTMCFGPMODE,{interval_ms}"
-        self.send_command(ser, base_cmd)
-
-        # Also try standard MTK-style command if your module supports it
-        gga_rate = 1
-        gsv_rate = 0
-        gsa_rate = 0
-        rmc_rate = 1
-        vtg_rate = 0
-        zda_rate = 0
-
-        # Example: Set all sentence rates to 1 (1 Hz)
-        self.send_command(ser, "PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0")
-        self.send_command(ser, f"PMTK220,{interval_ms}")  # Output interval in ms
-
-    def configure_nmea_output(self, ser):
-        self.send_command(ser, "PQTMCFGMSG,RMC,1")  # Enable RMC every fix
-        self.send_command(ser, "PQTMCFGMSG,GGA,1")  # Enable GGA every fix
-
-    def save_configuration(self, ser):
-        self.send_command(ser, "PQTMSAVEPAR")
-
+    def configure_receiver(self, serial_port):
+        """
+        Apply the update rate, constellations and sentences from the config to the receiver
+        """
+        try:
+            GnssConfigurator(config=self._xconfig, params=self._xparams).configure(serial_port)
+        except Exception as e:
+            self._xlog.error(f"🛰️ Error configuring the GNSS receiver: {e}")
+            self._xlog.debug(full_stack())
 
     def read_nmea_loop(self):
-
-        last_fix_time = None
-
-        with serial.Serial(self.SERIAL_PORT, self.BAUD_RATE, timeout=1) as ser:
-            while True:
-                # Control if we want to quit the loop
-                if not self.loop_is_allowed:
-                    if self.ACTIVATE_LOGGING:
-                        self._xlog.debug("Loop not allowed, exiting it.")
-                    break
-                
-                try:
-                    # Now, pick the next sentence
-                    line = ser.readline().decode('ascii', errors='replace').strip()
-                    if self.ACTIVATE_LOGGING:
-                        self._xlog.debug(line)
-
-                    # Ignore what does not contain data
-                    if not line.startswith("$"):
-                        if self.ACTIVATE_LOGGING:
-                            self._xlog.debug(f"🔵 Line does not start with $,  ignoring.")
-                        continue
-
-                    # Parse the sentence
-                    msg = pynmea2.parse(line)
-                    if self.ACTIVATE_LOGGING:
-                        self._xlog.debug(msg)
-
-                    if isinstance(msg, pynmea2.types.talker.GGA):
-                        if msg.gps_qual is not None and msg.num_sats is not None:
-                            self.cumulative_data["signal_quality"] = self.get_signal_quality(int(msg.gps_qual), int(msg.num_sats))
-                            self.cumulative_data["num_sats"] = int(msg.num_sats)
-                            if self.ACTIVATE_LOGGING:
-                                self._xlog.debug(f"📶 Updating signal quality based on GGA data: {self.cumulative_data['signal_quality']}, {self.cumulative_data['num_sats']} sats")
-                        # GPS Fix status codes, 0 is invalid, bigger is more accuracy
-                        # 0: Fix not valid
-                        # 1: GPS fix
-                        # 2: Differential GPS fix (DGNSS), SBAS, OmniSTAR VBS, Beacon, RTX in GVBS mode
-                        # 3: Not applicable
-                        # 4: RTK Fixed, xFill
-                        # 5: RTK Float, OmniSTAR XP/HP, Location RTK, RTX
-                        # 6: INS Dead reckoning
-                        fix_status = int(msg.gps_qual)
-                        if self.ACTIVATE_LOGGING:
-                            icon = "🟢" if fix_status > 0 else "🔴"
-                            self._xlog.debug(f"{icon} GGA with fix: {fix_status} ( > 0 is valid )")
-                        if fix_status > 0:  # Only show if there's a fix
-                            current_time = time.time()
-                            interval = (current_time - last_fix_time) if last_fix_time else 0
-                            last_fix_time = current_time
-                            if self.ACTIVATE_LOGGING:
-                                self._xlog.info(f"🟢 [GGA] Fix: {fix_status} | Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} {msg.lat_dir} | Lon: {msg.longitude} {msg.lon_dir} | Alt: {msg.altitude} {msg.altitude_units}")
-                            # Send data to output queue
-                            nmea_data = {
-                                "latitude": round(msg.latitude, 6),
-                                "longitude": round(msg.longitude, 6),
-                                "direction_latitude": msg.lat_dir if hasattr(msg, "lat_dir") else None,
-                                "direction_longitude": msg.lon_dir if hasattr(msg, "lon_dir") else None,
-                                "interval": interval,
-                                "altitude": msg.altitude if hasattr(msg, "altitude") else None,
-                                "altitude_units": msg.altitude_units.lower() if hasattr(msg, "altitude_units") else None,
-                                "timestamp": msg.timestamp if hasattr(msg, "timestamp") else None,
-                                "status": "A" if fix_status > 0 else "V",
-                            }
-                            with self.thread_lock:
-                                self.cumulative_data = {
-                                    **self.cumulative_data,
-                                    **nmea_data
-                                }
-
-                    elif isinstance(msg, pynmea2.types.talker.RMC):
-                        if self.ACTIVATE_LOGGING:
-                            icon = "🟢" if msg.status == 'A' else "🔴"
-                            self._xlog.debug(f"{icon} RMC with status: {msg.status} ( A=valid, V=invalid )")
-                        if msg.status == 'A':  # A = Valid fix
-                            current_time = time.time()
-                            interval = (current_time - last_fix_time) if last_fix_time else 0
-                            last_fix_time = current_time
-                            if self.ACTIVATE_LOGGING:
-                                self._xlog.info(f"🟢 [RMC] Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} | Lon: {msg.longitude} | Speed: {msg.spd_over_grnd} knots | Heading: {msg.true_course}°")
-                            # Send data to output queue
-                            nmea_data = {
-                                "latitude": round(msg.latitude, 6),
-                                "longitude": round(msg.longitude, 6),
-                                "speed": round(Calculations.knots_to_kmh(msg.spd_over_grnd), 3)  if hasattr(msg, "spd_over_grnd") and msg.spd_over_grnd is not None else None,
-                                "heading": msg.true_course if hasattr(msg, "true_course") and msg.true_course is not None else None,
-                                "interval": interval,
-                                "timestamp": msg.timestamp if hasattr(msg, "timestamp") else None,
-                                "status": msg.status if hasattr(msg, "status") else None,
-                            }
-                            with self.thread_lock:
-                                self.cumulative_data = {
-                                    **self.cumulative_data,
-                                    **nmea_data
-                                }
-                    
-                    elif isinstance(msg, pynmea2.types.talker.GLL):
-                        if self.ACTIVATE_LOGGING:
-                            icon = "🟢" if msg.status == 'A' else "🔴"
-                            self._xlog.debug(f"{icon} GLL with status: {msg.status} ( A=valid, V=invalid )")
-                        if msg.status == 'A':  # A = Valid fix
-                            current_time = time.time()
-                            interval = (current_time - last_fix_time) if last_fix_time else 0
-                            last_fix_time = current_time
-                            if self.ACTIVATE_LOGGING:
-                                self._xlog.info(f"🟢 [GLL] Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} {msg.lat_dir} | Lon: {msg.longitude} {msg.lon_dir}")
-                            # Send data to output queue
-                            nmea_data = {
-                                "latitude": round(msg.latitude, 6),
-                                "longitude": round(msg.longitude, 6),
-                                "direction_latitude": msg.lat_dir if hasattr(msg, "lat_dir") else None,
-                                "direction_longitude": msg.lon_dir if hasattr(msg, "lon_dir") else None,
-                                "interval": interval,
-                                "timestamp": msg.timestamp if hasattr(msg, "timestamp") else None,
-                                "status": msg.status if hasattr(msg, "status") else None,
-                            }
-                            with self.thread_lock:
-                                self.cumulative_data = {
-                                    **self.cumulative_data,
-                                    **nmea_data
-                                }
-
-                    else:
-                        if self.ACTIVATE_LOGGING:
-                            self._xlog.debug("🟠 Not GGA, GLL or RMC, ignoring.")
-
-                except pynmea2.ParseError as e:
-                    self._xlog.error(f"Failed to parse NMEA sentence: {e}")
-
-                except KeyboardInterrupt:
-                    self._xlog.warning("Detected a Control + C inside the Thread")
-                    break
-
-                except Exception as e:
-                    self._xlog.error(f"Error in the GPS thread loop: {e}")
-                    self._xlog.debug(full_stack())
+        """
+        Supervises the serial port: opens it, reads from it, and when it fails or goes
+        silent for too long, opens it again after a delay that doubles on every failure.
+        """
+
+        self._last_fix_time = None
+        framer = NmeaFramer()
+        thread_start_time = time.time()
+        delay = self.RECONNECT_MIN_DELAY
+
+        while self.loop_is_allowed:
+            try:
+                with serial.Serial(self.SERIAL_PORT, self.BAUD_RATE, timeout=1) as ser:
+                    if self.link_state == GPSLinkState.RECONNECTING:
+                        self.reconnects += 1
+                        self._xlog.info(f"🛰️ GPS serial port {self.SERIAL_PORT} open again")
+                    self._connected_at = time.monotonic()
+                    self._set_link_state(GPSLinkState.CONNECTED)
+                    self.configure_receiver(ser)
+                    self._read_until_lost(ser, framer)
+
+            except (serial.SerialException, OSError) as e:
+                self._xlog.warning(f"🛰️ GPS serial port {self.SERIAL_PORT} failed: {e}")
+
+            except KeyboardInterrupt:
+                self._xlog.warning("Detected a Control + C inside the Thread")
+                break
+
+            if not self.loop_is_allowed:
+                break
+
+            # A link that worked starts the backoff again
+            if self._last_data_time is not None and self._last_data_time >= self._connected_at:
+                delay = self.RECONNECT_MIN_DELAY
+            self._set_link_state(GPSLinkState.RECONNECTING)
+            self._retry_at = time.monotonic() + delay
+            self._xlog.info(f"🛰️ Opening the GPS serial port again in {delay:.0f}s")
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+
+        self._set_link_state(GPSLinkState.STOPPED)
+
+        # What this thread costs, to keep an eye on it
+        self.thread_cpu_time = time.thread_time()
+        elapsed = time.time() - thread_start_time
+        self._xlog.info(f"🛰️ GPS thread used {self.thread_cpu_time:.2f}s of CPU in {elapsed:.0f}s " +
+                        f"({self.thread_cpu_time / elapsed * 100 if elapsed > 0 else 0:.2f}%), " +
+                        f"{framer.sentences_framed} sentences, {framer.bytes_read} bytes, " +
+                        f"{self.parse_errors} parse errors, {self.reconnects} reconnects")
+
+    def _read_until_lost(self, ser, framer: NmeaFramer):
+        """
+        Read and process the sentences until we stop, the port fails (raises), too many
+        errors happen in a row or nothing arrives for too long.
+        """
+        consecutive_errors = 0
+
+        while self.loop_is_allowed:
+            try:
+                # Read whatever arrived and handle the complete sentences in it.
+                # Blocks up to the port timeout when nothing arrives.
+                if framer.read_from(ser) > 0:
+                    self._last_data_time = time.monotonic()
+                for line in framer.sentences():
+                    self.process_sentence(line)
+                consecutive_errors = 0
+
+            except (serial.SerialException, OSError):
+                raise
+
+            except Exception as e:
+                self._xlog.error(f"Error in the GPS thread loop: {e}")
+                self._xlog.debug(full_stack())
+                consecutive_errors += 1
+                if consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                    self._xlog.warning(f"🛰️ {consecutive_errors} errors in a row reading the GPS")
+                    return
+
+            silent_for = time.monotonic() - max(self._last_data_time or 0, self._connected_at)
+            if self.RECONNECT_WHEN_STALE_FOR > 0 and silent_for >= self.RECONNECT_WHEN_STALE_FOR:
+                self._xlog.warning(f"🛰️ Nothing arrived from the GPS in {silent_for:.0f}s")
+                return
+
+        if self.ACTIVATE_LOGGING:
+            self._xlog.debug("Loop not allowed, exiting it.")
+
+    def get_health(self) -> GpsHealth:
+        now = time.monotonic()
+        seconds_since_data = None if self._last_data_time is None else now - self._last_data_time
+        state = self.link_state
+        if state == GPSLinkState.CONNECTED and \
+            now - max(self._last_data_time or 0, self._connected_at or now) > self.STALE_SECONDS:
+            state = GPSLinkState.STALE
+        return GpsHealth(
+            state=state,
+            seconds_since_data=seconds_since_data,
+            reconnects=self.reconnects,
+            parse_errors=self.parse_errors,
+            retry_in=max(self._retry_at - now, 0) if state == GPSLinkState.RECONNECTING else None,
+        )
+
+    def _set_link_state(self, state: str):
+        if state != self.link_state:
+            self._xlog.debug(f"🛰️ GPS link is {state}")
+        self.link_state = state
+
+    def _count_parse_error(self, error: Exception):
+        """
+        Count the error, but log at most one every PARSE_ERROR_LOG_INTERVAL seconds:
+        a noisy line must not flood the log.
+        """
+        self.parse_errors += 1
+        now = time.monotonic()
+        if self._last_parse_error_log is not None and now - self._last_parse_error_log < self.PARSE_ERROR_LOG_INTERVAL:
+            return
+        not_logged = self.parse_errors - self._parse_errors_logged - 1
+        self._xlog.error(f"Failed to parse NMEA sentence: {error}" +
+                         (f" ({not_logged} more since the last one logged)" if not_logged > 0 else ""))
+        self._last_parse_error_log = now
+        self._parse_errors_logged = self.parse_errors
+
+    def process_sentence(self, line: bytes | memoryview):
+        """
+        Parse a sentence and merge the data of the GGA, RMC and GLL ones.
+        """
+        try:
+            if self.ACTIVATE_LOGGING:
+                self._xlog.debug(bytes(line).decode('ascii', errors='replace'))
+
+            # Parse the sentence. Only GGA, RMC and GLL are decoded, the rest come as None
+            msg = NmeaParser.parse(line)
+            if msg is None:
+                if self.ACTIVATE_LOGGING:
+                    self._xlog.debug("🟠 Not GGA, GLL or RMC, ignoring.")
+                return
+            self.process_message(msg)
+
+        except pynmea2.ParseError as e:
+            self._count_parse_error(e)
+
+    def process_message(self, msg: NmeaSentence):
+        """
+        Merge the data of a parsed GGA, RMC or GLL sentence and publish the fix.
+        """
+        if self.ACTIVATE_LOGGING:
+            self._xlog.debug(msg)
+
+        if msg.sentence_type == "GGA":
+            signal_data = {}
+            if msg.gps_qual is not None and msg.num_sats is not None:
+                # Never change the cumulative data in place: it is the values of the latest published fix
+                signal_data = {
+                    "signal_quality": self.get_signal_quality(int(msg.gps_qual), int(msg.num_sats)),
+                    "num_sats": int(msg.num_sats),
+                }
+                if self.ACTIVATE_LOGGING:
+                    self._xlog.debug(f"📶 Updating signal quality based on GGA data: {signal_data['signal_quality']}, {signal_data['num_sats']} sats")
+            # GPS Fix status codes, 0 is invalid, bigger is more accuracy
+            # 0: Fix not valid
+            # 1: GPS fix
+            # 2: Differential GPS fix (DGNSS), SBAS, OmniSTAR VBS, Beacon, RTX in GVBS mode
+            # 3: Not applicable
+            # 4: RTK Fixed, xFill
+            # 5: RTK Float, OmniSTAR XP/HP, Location RTK, RTX
+            # 6: INS Dead reckoning
+            # An empty quality field is no fix
+            fix_status = msg.gps_qual or 0
+            if self.ACTIVATE_LOGGING:
+                icon = "🟢" if fix_status > 0 else "🔴"
+                self._xlog.debug(f"{icon} GGA with fix: {fix_status} ( > 0 is valid )")
+            if fix_status > 0:  # Only show if there's a fix
+                current_time = time.time()
+                interval = (current_time - self._last_fix_time) if self._last_fix_time else 0
+                self._last_fix_time = current_time
+                if self.ACTIVATE_LOGGING:
+                    self._xlog.info(f"🟢 [GGA] Fix: {fix_status} | Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} {msg.lat_dir} | Lon: {msg.longitude} {msg.lon_dir} | Alt: {msg.altitude} {msg.altitude_units}")
+                # Send data to output queue
+                nmea_data = {
+                    "latitude": round(msg.latitude, 6),
+                    "longitude": round(msg.longitude, 6),
+                    "direction_latitude": msg.lat_dir,
+                    "direction_longitude": msg.lon_dir,
+                    "interval": interval,
+                    "altitude": msg.altitude,
+                    "altitude_units": msg.altitude_units.lower() if msg.altitude_units is not None else None,
+                    "timestamp": msg.timestamp,
+                    "status": "A" if fix_status > 0 else "V",
+                    **signal_data
+                }
+                self._merge_and_publish(nmea_data)
+            elif len(signal_data) > 0:
+                # No position, but the signal quality changed and the screen has to know it
+                self._merge_and_publish(signal_data)
+
+        elif msg.sentence_type == "RMC":
+            if self.ACTIVATE_LOGGING:
+                icon = "🟢" if msg.status == 'A' else "🔴"
+                self._xlog.debug(f"{icon} RMC with status: {msg.status} ( A=valid, V=invalid )")
+            if msg.status == 'A':  # A = Valid fix
+                current_time = time.time()
+                interval = (current_time - self._last_fix_time) if self._last_fix_time else 0
+                self._last_fix_time = current_time
+                if self.ACTIVATE_LOGGING:
+                    self._xlog.info(f"🟢 [RMC] Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} | Lon: {msg.longitude} | Speed: {msg.spd_over_grnd} knots | Heading: {msg.true_course}°")
+                # Send data to output queue
+                nmea_data = {
+                    "latitude": round(msg.latitude, 6),
+                    "longitude": round(msg.longitude, 6),
+                    "speed": round(Calculations.knots_to_kmh(msg.spd_over_grnd), 3) if msg.spd_over_grnd is not None else None,
+                    "heading": msg.true_course,
+                    "interval": interval,
+                    "timestamp": msg.timestamp,
+                    "datestamp": msg.datestamp,
+                    "status": msg.status,
+                }
+                self._merge_and_publish(nmea_data)
+
+        elif msg.sentence_type == "GLL":
+            if self.ACTIVATE_LOGGING:
+                icon = "🟢" if msg.status == 'A' else "🔴"
+                self._xlog.debug(f"{icon} GLL with status: {msg.status} ( A=valid, V=invalid )")
+            if msg.status == 'A':  # A = Valid fix
+                current_time = time.time()
+                interval = (current_time - self._last_fix_time) if self._last_fix_time else 0
+                self._last_fix_time = current_time
+                if self.ACTIVATE_LOGGING:
+                    self._xlog.info(f"🟢 [GLL] Interval: {interval:.2f}s | Time: {msg.timestamp} | Lat: {msg.latitude} {msg.lat_dir} | Lon: {msg.longitude} {msg.lon_dir}")
+                # Send data to output queue
+                nmea_data = {
+                    "latitude": round(msg.latitude, 6),
+                    "longitude": round(msg.longitude, 6),
+                    "direction_latitude": msg.lat_dir,
+                    "direction_longitude": msg.lon_dir,
+                    "interval": interval,
+                    "timestamp": msg.timestamp,
+                    "status": msg.status,
+                }
+                self._merge_and_publish(nmea_data)
 
     def get_signal_quality(self, fix: int = None, number_of_satellites: int = None) -> int | None:
         if fix is None or number_of_satellites is None:
@@ -293,11 +384,35 @@ class NMEAReader(PyXavi):
                 return GPSSignalQuality.SIGNAL_WEAK
         return GPSSignalQuality.SIGNAL_POOR
 
+    def add_listener(self, listener: callable):
+        """
+        Register a callable to be invoked every time a new fix is published.
+        It runs inside the receiver thread, so it must be quick and thread safe.
+        """
+        self.fix_stream.add_listener(listener)
+
+    def _merge_and_publish(self, nmea_data: dict):
+        """
+        Merge the data of a sentence into the cumulative data and publish it.
+        The stream ignores it if the fix did not change.
+        """
+        with self.thread_lock:
+            self.cumulative_data = {
+                **self.cumulative_data,
+                **nmea_data
+            }
+            data = self.cumulative_data
+        self.fix_stream.publish(data)
+
     def close(self):
         self.loop_is_allowed = False
+        self._stop_event.set()
         self.receiver_thread.join()
 
     def get_gps_data(self) -> dict:
         with self.thread_lock:
             data = self.cumulative_data
-        return data
\ No newline at end of file
+        return data
+
+    def get_latest_fix(self) -> GpsFix | None:
+        return self.fix_stream.get_latest()
\ No newline at end of file
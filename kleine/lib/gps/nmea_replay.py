@@ -0,0 +1,111 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.gps.nmea_reader import NMEAReader
+from kleine.lib.gps.nmea_parser import NmeaParser
+from kleine.lib.utils.geodesy import Geodesy
+from kleine.lib.objects.gps_link_state import GPSLinkState
+
+import time
+
+class NmeaReplay(NMEAReader):
+    """
+    Replays a recorded NMEA file as if it came from the GPS receiver.
+
+    The sentences go through the same parsing, merging and publishing as the ones from
+    the serial port, so the cockpit, the track recorder and the rest can be tested
+    without hardware. Modes:
+    - realtime: keeps the pace of the GPS times in the file, multiplied by the speed
+    - fast: as fast as possible, for throughput tests
+
+    The config lives under `gps.replay_file` and `gps.replay`.
+    """
+
+    MODE_REALTIME: str = "realtime"
+    MODE_FAST: str = "fast"
+
+    REPLAY_FILE: str = None
+    MODE: str = MODE_REALTIME
+    SPEED: float = 1.0
+    LOOP: bool = True
+
+    sentences_replayed: int = 0
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(NmeaReplay, self).init_pyxavi(config=config, params=params)
+
+        # Must be ready before the parent starts the thread
+        self.REPLAY_FILE = self._xconfig.get("gps.replay_file", self.REPLAY_FILE)
+        self.MODE = self._xconfig.get("gps.replay.mode", self.MODE)
+        self.SPEED = self._xconfig.get("gps.replay.speed", self.SPEED)
+        self.LOOP = self._xconfig.get("gps.replay.loop", self.LOOP)
+        if self.MODE not in [self.MODE_REALTIME, self.MODE_FAST]:
+            self._xlog.warning(f"🛰️ Unknown replay mode [{self.MODE}], using {self.MODE_REALTIME}")
+            self.MODE = self.MODE_REALTIME
+        if self.SPEED is None or self.SPEED <= 0:
+            self._xlog.warning(f"🛰️ Invalid replay speed [{self.SPEED}], using 1")
+            self.SPEED = 1.0
+
+        super(NmeaReplay, self).__init__(config=config, params=params)
+
+    def read_nmea_loop(self):
+
+        self._last_fix_time = None
+        thread_start_time = time.time()
+        self._xlog.info(f"🛰️ Replaying {self.REPLAY_FILE} in {self.MODE} mode" +
+                        (f" at x{self.SPEED}" if self.MODE == self.MODE_REALTIME else ""))
+
+        self._connected_at = time.monotonic()
+        self._set_link_state(GPSLinkState.CONNECTED)
+        while self.loop_is_allowed:
+            try:
+                with open(self.REPLAY_FILE, "rb") as file:
+                    self._replay(file)
+            except OSError as e:
+                self._xlog.error(f"🛰️ Error replaying {self.REPLAY_FILE}: {e}")
+                self._xlog.debug(full_stack())
+                break
+
+            if not self.LOOP:
+                break
+
+        self._set_link_state(GPSLinkState.STOPPED)
+        self.thread_cpu_time = time.thread_time()
+        elapsed = time.time() - thread_start_time
+        self._xlog.info(f"🛰️ GPS replay used {self.thread_cpu_time:.2f}s of CPU in {elapsed:.0f}s, " +
+                        f"{self.sentences_replayed} sentences")
+
+    def _replay(self, file):
+        replay_start = time.monotonic()
+        # Seconds of GPS time since the first sentence with a time, and the time of the last one
+        gps_elapsed = 0.0
+        previous_time = None
+
+        for line in file:
+            if not self.loop_is_allowed:
+                return
+
+            try:
+                msg = NmeaParser.parse(line)
+            except Exception as e:
+                # A bad sentence is skipped, as from the serial port. Only the file errors end the replay.
+                self._count_parse_error(e)
+                continue
+            self.sentences_replayed += 1
+            self._last_data_time = time.monotonic()
+            if msg is None:
+                continue
+
+            if self.MODE == self.MODE_REALTIME and msg.timestamp is not None:
+                if previous_time is not None:
+                    # Sentences of the same epoch, or going back in the file, don't wait
+                    gps_elapsed += max(Geodesy.seconds_between(previous_time, msg.timestamp), 0)
+                previous_time = msg.timestamp
+
+                delay = replay_start + gps_elapsed / self.SPEED - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+
+            try:
+                self.process_message(msg)
+            except Exception as e:
+                self._count_parse_error(e)
+
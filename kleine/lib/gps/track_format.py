@@ -0,0 +1,56 @@
+import numpy as np
+import struct
+
+class TrackFormat:
+    """
+    Layout of the recorded track segment files.
+
+    A segment is a 16 bytes header followed by fixed size records, all little endian:
+
+    header: magic "KTRK", version (uint16), record size (uint16), creation time (float64)
+    record: timestamp (float64, unix time of the fix, see below), latitude and longitude (int32,
+            degrees * 1e7, ~1cm), altitude in metres, speed in km/h and heading in degrees
+            (float32, NaN when unknown), satellites and signal quality (uint8), 2 bytes padding
+
+    32 bytes per record: an hour at 1Hz is ~113KB, at 10Hz ~1.1MB.
+
+    The timestamp is the GPS time of the fix: the RMC date with the UTC time of the sentence.
+    Only without a date yet it is the host clock, which can jump when NTP syncs. The
+    records of a segment never go back in time, and the creation time is the timestamp
+    of its first record.
+    """
+
+    MAGIC: bytes = b"KTRK"
+    VERSION: int = 1
+    FILE_EXTENSION: str = ".ktrk"
+    COORDINATE_SCALE: float = 1e7
+
+    HEADER: struct.Struct = struct.Struct("<4sHHd")
+    RECORD: struct.Struct = struct.Struct("<diifffBB2x")
+
+    # The same record, for numpy.frombuffer()
+    RECORD_DTYPE: np.dtype = np.dtype([
+        ("timestamp", "<f8"),
+        ("latitude", "<i4"),
+        ("longitude", "<i4"),
+        ("altitude", "<f4"),
+        ("speed", "<f4"),
+        ("heading", "<f4"),
+        ("num_sats", "u1"),
+        ("signal_quality", "u1"),
+        ("padding", "V2"),
+    ])
+
+    @staticmethod
+    def pack_header(created_at: float) -> bytes:
+        return TrackFormat.HEADER.pack(TrackFormat.MAGIC, TrackFormat.VERSION, TrackFormat.RECORD.size, created_at)
+
+    @staticmethod
+    def unpack_header(data: bytes) -> float:
+        """
+        Validates the header and returns the creation time of the segment
+        """
+        magic, version, record_size, created_at = TrackFormat.HEADER.unpack_from(data)
+        if magic != TrackFormat.MAGIC or version != TrackFormat.VERSION or record_size != TrackFormat.RECORD.size:
+            raise ValueError(f"Not a track segment of version {TrackFormat.VERSION}: {magic!r} v{version}, {record_size} bytes per record")
+        return created_at
@@ -0,0 +1,183 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.gps.track_format import TrackFormat
+from kleine.lib.utils.geodesy import Geodesy
+
+import glob, mmap, os
+import numpy as np
+
+class TrackSegment:
+    """
+    A recorded segment file, memory mapped.
+
+    The records are a numpy structured array (TrackFormat.RECORD_DTYPE) over the mapping:
+    nothing is loaded into RAM until it is touched, and the slices are views, not copies.
+    A sparse index keeps the timestamp of one every INDEX_STEP records, so finding a time
+    only reads a few pages of the file.
+
+    The views are valid until close().
+    """
+
+    INDEX_STEP: int = 256
+
+    path: str = None
+    created_at: float = None
+    records: np.ndarray = None
+
+    _file = None
+    _mmap: mmap.mmap = None
+    # Timestamps of the records 0, INDEX_STEP, 2*INDEX_STEP...
+    _index: np.ndarray = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < TrackFormat.HEADER.size:
+            self._file.close()
+            raise ValueError(f"Track segment {path} is too short")
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.created_at = TrackFormat.unpack_header(self._mmap)
+        # A record being written when the file was mapped may be incomplete: leave it out
+        count = (size - TrackFormat.HEADER.size) // TrackFormat.RECORD.size
+        self.records = np.frombuffer(self._mmap, dtype=TrackFormat.RECORD_DTYPE, count=count, offset=TrackFormat.HEADER.size)
+        self._index = np.array(self.records["timestamp"][::self.INDEX_STEP])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def time_range(self) -> tuple[float, float] | None:
+        if len(self.records) == 0:
+            return None
+        return (float(self.records["timestamp"][0]), float(self.records["timestamp"][-1]))
+
+    def find(self, timestamp: float) -> int:
+        """
+        Position of the first record at or after the timestamp
+        """
+        block = max(int(np.searchsorted(self._index, timestamp, side="left")) - 1, 0)
+        start = block * self.INDEX_STEP
+        end = min(start + 2 * self.INDEX_STEP, len(self.records))
+        return start + int(np.searchsorted(self.records["timestamp"][start:end], timestamp, side="left"))
+
+    def between(self, start: float = None, end: float = None) -> np.ndarray:
+        """
+        View of the records with start <= timestamp < end
+        """
+        first = 0 if start is None else self.find(start)
+        last = len(self.records) if end is None else self.find(end)
+        return self.records[first:last]
+
+    def close(self):
+        self.records = None
+        self._index = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Somebody still holds a view: the mapping goes away with it
+            pass
+        self._file.close()
+
+class TrackReader(PyXavi):
+    """
+    Reads the track segments recorded by the TrackRecorder, to scrub through them
+    without loading them into RAM.
+
+    Windows of time come as a list of views, one per segment that they touch, and
+    window_stats() computes the totals vectorized over them.
+    """
+
+    DEFAULT_STORAGE_PATH: str = "storage/"
+    DEFAULT_TRACKS_PATH: str = "tracks/"
+
+    tracks_path: str = None
+    segments: list[TrackSegment] = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(TrackReader, self).init_pyxavi(config=config, params=params)
+
+        self.tracks_path = self._xparams.get("tracks_path", os.path.join(
+            self._xconfig.get("storage.path", self.DEFAULT_STORAGE_PATH),
+            self._xconfig.get("gps.track.path", self.DEFAULT_TRACKS_PATH)
+        ))
+        self.segments = []
+        self.reload()
+
+    def reload(self):
+        """
+        Map the segments again, e.g. to see what was recorded since the last time
+        """
+        self.close()
+        for path in glob.glob(os.path.join(self.tracks_path, "*" + TrackFormat.FILE_EXTENSION)):
+            try:
+                self.segments.append(TrackSegment(path))
+            except Exception as e:
+                self._xlog.warning(f"🛰️ Skipping track segment {path}: {e}")
+                self._xlog.debug(full_stack())
+        # Segment names may not sort in time, their headers do
+        self.segments.sort(key=lambda segment: segment.created_at)
+        self._xlog.debug(f"🛰️ {len(self.segments)} track segments, {sum(len(segment) for segment in self.segments)} records")
+
+    def time_range(self) -> tuple[float, float] | None:
+        ranges = [segment.time_range() for segment in self.segments if len(segment) > 0]
+        if len(ranges) == 0:
+            return None
+        return (min(start for start, _ in ranges), max(end for _, end in ranges))
+
+    def window(self, start: float = None, end: float = None) -> list[np.ndarray]:
+        """
+        Records with start <= timestamp < end, as views, one per segment
+        """
+        views = []
+        for segment in self.segments:
+            time_range = segment.time_range()
+            if time_range is None or (end is not None and time_range[0] >= end) or \
+                (start is not None and time_range[1] < start):
+                continue
+            view = segment.between(start, end)
+            if len(view) > 0:
+                views.append(view)
+        return views
+
+    def window_stats(self, start: float = None, end: float = None) -> dict:
+        """
+        Totals of a window of time: distance in metres, max speed in km/h, elevation gain
+        in metres, duration in seconds and amount of records.
+        """
+        stats = {"records": 0, "distance": 0.0, "max_speed": None, "elevation_gain": 0.0, "duration": 0.0}
+        for records in self.window(start, end):
+            stats["records"] += len(records)
+            stats["duration"] += float(records["timestamp"][-1] - records["timestamp"][0])
+            stats["distance"] += self.distance(records)
+            stats["elevation_gain"] += self.elevation_gain(records)
+            speed = records["speed"]
+            if not np.all(np.isnan(speed)):
+                max_speed = float(np.nanmax(speed))
+                stats["max_speed"] = max_speed if stats["max_speed"] is None else max(stats["max_speed"], max_speed)
+        return stats
+
+    def distance(self, records: np.ndarray) -> float:
+        """
+        Metres along the records, adding the great circle distance between consecutive ones
+        """
+        return float(np.sum(Geodesy.distances(
+            records["latitude"] / TrackFormat.COORDINATE_SCALE,
+            records["longitude"] / TrackFormat.COORDINATE_SCALE
+        )))
+
+    def elevation_gain(self, records: np.ndarray) -> float:
+        """
+        Metres climbed: the sum of the rises between consecutive known altitudes
+        """
+        altitudes = records["altitude"]
+        altitudes = altitudes[~np.isnan(altitudes)]
+        if len(altitudes) < 2:
+            return 0.0
+        rises = np.diff(altitudes.astype(np.float64))
+        return float(np.sum(rises[rises > 0]))
+
+    def close(self):
+        for segment in self.segments or []:
+            segment.close()
+        self.segments = []
@@ -0,0 +1,245 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.gps.fix_stream import FixSubscription
+from kleine.lib.gps.track_format import TrackFormat
+from kleine.lib.objects.gps_fix import GpsFix
+from kleine.lib.utils.geodesy import Geodesy
+
+from datetime import datetime, timezone
+import math, os, threading, time
+
+class TrackRecorder(PyXavi):
+    """
+    Records every GPS fix into append-only segment files (see TrackFormat).
+
+    It subscribes to the fix stream of the GPS, so the GPS thread only appends the fix to
+    a queue. A writer thread packs the fixes and writes them in batches, and only forces
+    them to the SD card (fsync) every few seconds, to spare it.
+
+    The reader publishes a fix per sentence that changes it (GGA, then RMC adding the
+    speed...), so the fixes with the same GPS time are merged into a single record.
+
+    Records are stamped with the GPS date and time of the fix, the host clock is only the
+    fallback until the receiver sends a date. If a timestamp still goes back in time, it
+    starts a new segment, so every segment stays sorted for the TrackReader.
+
+    The config lives under `gps.track`.
+    """
+
+    ENABLED: bool = True
+    DEFAULT_STORAGE_PATH: str = "storage/"
+    DEFAULT_TRACKS_PATH: str = "tracks/"
+    # Records per write() call
+    BATCH_SIZE: int = 10
+    # Seconds that a record may wait in memory before being written, even if the batch is not full
+    WRITE_INTERVAL: float = 5.0
+    # Seconds between fsync() calls
+    FSYNC_INTERVAL: float = 60.0
+    # Records per segment file before starting a new one. 36000 is 10h at 1Hz, ~1.1MB
+    SEGMENT_MAX_RECORDS: int = 36000
+    # Fixes that can wait in the queue before the oldest are dropped
+    QUEUE_SIZE: int = 256
+
+    tracks_path: str = None
+
+    _subscription: FixSubscription = None
+    _thread: threading.Thread = None
+    _stop: threading.Event = None
+
+    # Fix of the current GPS epoch, waiting for the rest of the sentences of the same epoch
+    _pending_fix: GpsFix = None
+    _batch: bytearray = None
+    _batch_started_at: float = None
+    _file = None
+    _segment_records: int = 0
+    # Timestamp of the last packed record
+    _last_record_time: float = None
+    _last_fsync: float = None
+    # Written since the last fsync
+    _unsynced: bool = False
+
+    records_written: int = 0
+    bytes_written: int = 0
+    fsyncs: int = 0
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(TrackRecorder, self).init_pyxavi(config=config, params=params)
+
+        self.ENABLED = self._xconfig.get("gps.track.enabled", self.ENABLED)
+        self.BATCH_SIZE = self._xconfig.get("gps.track.batch_size", self.BATCH_SIZE)
+        self.WRITE_INTERVAL = self._xconfig.get("gps.track.write_interval", self.WRITE_INTERVAL)
+        self.FSYNC_INTERVAL = self._xconfig.get("gps.track.fsync_interval", self.FSYNC_INTERVAL)
+        self.SEGMENT_MAX_RECORDS = self._xconfig.get("gps.track.segment_max_records", self.SEGMENT_MAX_RECORDS)
+        self.QUEUE_SIZE = self._xconfig.get("gps.track.queue_size", self.QUEUE_SIZE)
+        self.tracks_path = os.path.join(
+            self._xconfig.get("storage.path", self.DEFAULT_STORAGE_PATH),
+            self._xconfig.get("gps.track.path", self.DEFAULT_TRACKS_PATH)
+        )
+
+        self._batch = bytearray()
+        self._stop = threading.Event()
+
+        if not self.ENABLED:
+            self._xlog.info("🛰️ Track recording is disabled")
+            return
+
+        if not params.key_exists("gps"):
+            self._xlog.warning("🛰️ No GPS provided to the track recorder, nothing to record")
+            return
+
+        os.makedirs(self.tracks_path, exist_ok=True)
+        self._subscription = params.get("gps").subscribe(self.QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._write_loop, name="gps-track", daemon=True)
+        self._thread.start()
+        self._xlog.info(f"🛰️ Recording the GPS track into {self.tracks_path}")
+
+    def close(self):
+        """
+        Write everything still in memory, sync and close the segment
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._subscription.close()
+        self._xlog.info(f"🛰️ Track recorder stopped: {self.records_written} records, {self.bytes_written} bytes, " +
+                        f"{self.fsyncs} fsyncs, {self._subscription.dropped} fixes dropped")
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            try:
+                fix = self._subscription.get(timeout=self.WRITE_INTERVAL)
+                if fix is not None:
+                    self._add_fix(fix)
+                elif self._pending_fix is not None:
+                    # Nothing arrived for a while, that epoch is complete
+                    self._pack(self._pending_fix)
+                    self._pending_fix = None
+                self._write_if_due()
+            except Exception as e:
+                self._xlog.error(f"🛰️ Error recording the GPS track: {e}")
+                self._xlog.debug(full_stack())
+
+        # Whatever arrived until the stop
+        try:
+            for fix in self._subscription.drain():
+                self._add_fix(fix)
+            if self._pending_fix is not None:
+                self._pack(self._pending_fix)
+                self._pending_fix = None
+            self._write_batch()
+            self._close_segment()
+        except Exception as e:
+            self._xlog.error(f"🛰️ Error closing the GPS track: {e}")
+            self._xlog.debug(full_stack())
+
+    def _add_fix(self, fix: GpsFix):
+        values = fix.values
+        if values.get("latitude") is None or values.get("longitude") is None or values.get("status") != "A":
+            return
+
+        # Sentences of the same epoch complete the same record
+        if self._pending_fix is not None and self._pending_fix.values.get("timestamp") != values.get("timestamp"):
+            self._pack(self._pending_fix)
+        self._pending_fix = fix
+
+    def _pack(self, fix: GpsFix):
+        values = fix.values
+        record_time = self._record_time(fix)
+        if self._last_record_time is not None and record_time < self._last_record_time:
+            self._xlog.warning(f"🛰️ The GPS track went back {self._last_record_time - record_time:.1f}s in time, starting a new segment")
+            self._write_batch()
+            self._close_segment()
+        self._last_record_time = record_time
+
+        if len(self._batch) == 0:
+            self._batch_started_at = time.monotonic()
+        self._batch += TrackFormat.RECORD.pack(
+            record_time,
+            round(values["latitude"] * TrackFormat.COORDINATE_SCALE),
+            round(values["longitude"] * TrackFormat.COORDINATE_SCALE),
+            self._float_or_nan(values.get("altitude")),
+            self._float_or_nan(values.get("speed")),
+            self._float_or_nan(values.get("heading")),
+            min(int(values.get("num_sats") or 0), 255),
+            min(int(values.get("signal_quality") or 0), 255),
+        )
+
+    def _record_time(self, fix: GpsFix) -> float:
+        """
+        Unix time of the fix from its GPS date and time, or the host time when it has no date
+        """
+        gps_time = fix.values.get("timestamp")
+        gps_date = fix.values.get("datestamp")
+        if gps_time is None or gps_date is None:
+            return fix.timestamp
+
+        record_time = datetime.combine(gps_date, gps_time.replace(tzinfo=timezone.utc)).timestamp()
+        # After midnight, a GGA can come with the date of the last RMC, from the previous day
+        if self._last_record_time is not None and \
+            Geodesy.SECONDS_PER_DAY / 2 < self._last_record_time - record_time <= Geodesy.SECONDS_PER_DAY:
+            record_time += Geodesy.SECONDS_PER_DAY
+        return record_time
+
+    def _write_if_due(self):
+        records_in_batch = len(self._batch) // TrackFormat.RECORD.size
+        if records_in_batch >= self.BATCH_SIZE or \
+            (records_in_batch > 0 and time.monotonic() - self._batch_started_at >= self.WRITE_INTERVAL):
+            self._write_batch()
+
+        if self._unsynced and time.monotonic() - self._last_fsync >= self.FSYNC_INTERVAL:
+            self._fsync()
+
+    def _write_batch(self):
+        record_size = TrackFormat.RECORD.size
+        offset = 0
+        while offset < len(self._batch):
+            if self._file is None or self._segment_records >= self.SEGMENT_MAX_RECORDS:
+                self._open_segment(TrackFormat.RECORD.unpack_from(self._batch, offset)[0])
+            # Never let a segment go over its limit
+            records = min((len(self._batch) - offset) // record_size, self.SEGMENT_MAX_RECORDS - self._segment_records)
+            chunk = self._batch[offset:offset + records * record_size]
+            self._file.write(chunk)
+            offset += len(chunk)
+            self._segment_records += records
+            self.records_written += records
+            self.bytes_written += len(chunk)
+            self._unsynced = True
+        self._batch.clear()
+
+    def _open_segment(self, created_at: float):
+        """
+        New segment, named and stamped with the timestamp of its first record
+        """
+        self._close_segment()
+        file_name = "track-" + datetime.fromtimestamp(created_at).strftime("%Y%m%d-%H%M%S") + TrackFormat.FILE_EXTENSION
+        file_path = os.path.join(self.tracks_path, file_name)
+        # Two segments in the same second: don't append to the previous one
+        suffix = 1
+        while os.path.exists(file_path):
+            file_path = os.path.join(self.tracks_path, file_name.replace(TrackFormat.FILE_EXTENSION, f"-{suffix}{TrackFormat.FILE_EXTENSION}"))
+            suffix += 1
+
+        self._file = open(file_path, "wb")
+        self._file.write(TrackFormat.pack_header(created_at))
+        self.bytes_written += TrackFormat.HEADER.size
+        self._segment_records = 0
+        self._last_fsync = time.monotonic()
+        self._xlog.info(f"🛰️ New track segment {file_path}")
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._fsync()
+        self._file.close()
+        self._file = None
+
+    def _fsync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self.fsyncs += 1
+
+    def _float_or_nan(self, value) -> float:
+        return math.nan if value is None else float(value)
@@ -1,6 +1,7 @@
 
 import time
 from . import lcdconfig
+from .rgb565 import Rgb565Converter
 
 class ST7789(lcdconfig.RaspberryPi):
 
@@ -8,6 +9,7 @@ class ST7789(lcdconfig.RaspberryPi):
     # TODO: If so, remove the ability to change the size from outside: remove set_size().
     width = 240
     height = 320
+    _converter = None
     def command(self, cmd):
         self.digital_write(self.DC_PIN, False)
         self.spi_writebyte([cmd])
@@ -124,14 +126,14 @@ class ST7789(lcdconfig.RaspberryPi):
         self.command(0x2A)
         self.data(Xstart>>8)        #Set the horizontal starting point to the high octet
         self.data(Xstart & 0xff)    #Set the horizontal starting point to the low octet
-        self.data(Xend>>8)          #Set the horizontal end to the high octet
+        self.data((Xend - 1)>>8)    #Set the horizontal end to the high octet
         self.data((Xend - 1) & 0xff)#Set the horizontal end to the low octet 
 
         #set the Y coordinates
         self.command(0x2B)
         self.data(Ystart>>8)
         self.data((Ystart & 0xff))
-        self.data(Yend>>8)
+        self.data((Yend - 1)>>8)
         self.data((Yend - 1) & 0xff )
 
         self.command(0x2C)    
@@ -140,42 +142,48 @@ class ST7789(lcdconfig.RaspberryPi):
         """Set buffer to value of Python Imaging Library image."""
         """Write display buffer to physical display"""
         imwidth, imheight = Image.size
+        pix = self.get_converter().convert(self.np.asarray(Image))
         if imwidth == self.height and imheight ==  self.width:
-            img = self.np.asarray(Image)
-            pix = self.np.zeros((self.width, self.height,2), dtype = self.np.uint8)
-            #RGB888 >> RGB565
-            pix[...,[0]] = self.np.add(self.np.bitwise_and(img[...,[0]],0xF8),self.np.right_shift(img[...,[1]],5))
-            pix[...,[1]] = self.np.add(self.np.bitwise_and(self.np.left_shift(img[...,[1]],3),0xE0), self.np.right_shift(img[...,[2]],3))
-            pix = pix.flatten().tolist()
-            
             self.command(0x36)
             self.data(0x70) 
             self.SetWindows ( 0, 0, self.height,self.width)
-            self.digital_write(self.DC_PIN,True)
-            for i in range(0,len(pix),4096):
-                self.spi_writebyte(pix[i:i+4096])
-            
         else :
-            img = self.np.asarray(Image)
-            pix = self.np.zeros((imheight,imwidth , 2), dtype = self.np.uint8)
-            
-            pix[...,[0]] = self.np.add(self.np.bitwise_and(img[...,[0]],0xF8),self.np.right_shift(img[...,[1]],5))
-            pix[...,[1]] = self.np.add(self.np.bitwise_and(self.np.left_shift(img[...,[1]],3),0xE0), self.np.right_shift(img[...,[2]],3))
-
-            pix = pix.flatten().tolist()
-
             self.command(0x36)
             self.data(0x00) 
             self.SetWindows ( 0, 0, self.width, self.height)
+        self.digital_write(self.DC_PIN,True)
+        self.spi_writebuffer(pix)
+
+    def ShowImageRegions(self, Image, regions):
+        """
+        Write only some rectangles of a landscape image, each one through its own window.
+        Regions are tuples (Xstart, Ystart, Xend, Yend) with the end excluded.
+        """
+        imwidth, imheight = Image.size
+        if imwidth != self.height or imheight != self.width:
+            # Only the landscape orientation is handled here
+            self.ShowImage(Image)
+            return
+
+        img = self.np.asarray(Image)
+        self.command(0x36)
+        self.data(0x70)
+        for Xstart, Ystart, Xend, Yend in regions:
+            pix = self.get_converter().convert(img[Ystart:Yend, Xstart:Xend])
+            self.SetWindows(Xstart, Ystart, Xend, Yend)
             self.digital_write(self.DC_PIN,True)
-            for i in range(0,len(pix),4096):
-                self.spi_writebyte(pix[i:i+4096])		
-                
+            self.spi_writebuffer(pix)
+
+    def get_converter(self) -> Rgb565Converter:
+        """The RGB565 buffer is allocated once and reused for every frame"""
+        if self._converter is None:
+            self._converter = Rgb565Converter(self.height, self.width)
+        return self._converter
+
     def clear(self):
         """Clear contents of image buffer"""
-        _buffer = [0xff]*(self.width * self.height * 2)
+        _buffer = b"\xff" * (self.width * self.height * 2)
         self.SetWindows ( 0, 0, self.height, self.width)
         self.digital_write(self.DC_PIN,True)
-        for i in range(0,len(_buffer),4096):
-            self.spi_writebyte(_buffer[i:i+4096])	
+        self.spi_writebuffer(_buffer)
         
@@ -0,0 +1,44 @@
+import numpy as np
+
+class DirtyRegions:
+    """
+    Finds which parts of a frame changed compared to the previous one.
+
+    Rectangles are tuples (x_start, y_start, x_end, y_end), with the end excluded,
+    in the coordinates of the frame as it is sent to the device.
+    """
+
+    @staticmethod
+    def find(previous: np.ndarray, current: np.ndarray, row_gap: int = 8, column_gap: int = 32) -> list[tuple]:
+        """
+        Compare two frames of the same shape (height, width, channels) and return the dirty rectangles.
+
+        First the changed rows are grouped in horizontal bands, then every band is split
+        by its changed columns. Unchanged gaps smaller than row_gap / column_gap are merged
+        into the rectangle, as a new window costs more than a few extra pixels.
+        """
+        changed = np.any(previous != current, axis=2)
+        rectangles = []
+        for y_start, y_end in DirtyRegions._runs(np.any(changed, axis=1), row_gap):
+            for x_start, x_end in DirtyRegions._runs(np.any(changed[y_start:y_end], axis=0), column_gap):
+                rectangles.append((x_start, y_start, x_end, y_end))
+        return rectangles
+
+    @staticmethod
+    def area(rectangles: list[tuple]) -> int:
+        return sum((x_end - x_start) * (y_end - y_start) for x_start, y_start, x_end, y_end in rectangles)
+
+    @staticmethod
+    def _runs(mask: np.ndarray, gap: int) -> list[tuple]:
+        """
+        Returns the (start, end) of the runs of True in a 1D mask, merging runs closer than gap.
+        """
+        indexes = np.flatnonzero(mask)
+        if len(indexes) == 0:
+            return []
+
+        # Where the distance to the previous True is bigger than the allowed gap, a new run starts
+        breaks = np.flatnonzero(np.diff(indexes) > gap + 1)
+        starts = np.concatenate(([indexes[0]], indexes[breaks + 1]))
+        ends = np.concatenate((indexes[breaks], [indexes[-1]])) + 1
+        return [(int(start), int(end)) for start, end in zip(starts, ends)]
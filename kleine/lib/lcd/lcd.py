@@ -2,10 +2,13 @@ import os
 import time
 import logging
 import platform
+import threading
+import numpy as np
 from .mocked_ST7789 import MockedST7789
+from .dirty_regions import DirtyRegions
 from PIL import Image,ImageDraw,ImageFont
 
-from pyxavi import Config, Dictionary
+from pyxavi import Config, Dictionary, full_stack
 from kleine.lib.abstract.pyxavi import PyXavi
 from kleine.lib.objects.point import Point
 
@@ -32,13 +35,48 @@ class Lcd(PyXavi):
     # This is to avoid import issues on non-Linux platforms
     driver: MockedST7789 = None
 
+    # Send only the rectangles that changed since the last frame
+    PARTIAL_UPDATES: bool = True
+    # Above this ratio of dirty pixels a full frame is cheaper than many windows
+    PARTIAL_UPDATES_MAX_RATIO: float = 0.5
+
+    # Last frame sent to the device, as it was sent (after rotation)
+    _last_frame: np.ndarray = None
+
+    # Send the frames from a worker thread, so the caller does not wait for the SPI transfer
+    ASYNC_FLUSH: bool = True
+
+    # The two frame buffers: one can be in flight while the other waits as pending.
+    # A new frame arriving while one is pending replaces it, the stale one is dropped.
+    _buffers: list[Image.Image] = None
+    _pending_frame: Image.Image = None
+    _in_flight_frame: Image.Image = None
+    _flush_condition: threading.Condition = None
+    _flush_thread: threading.Thread = None
+    _flush_loop_is_allowed: bool = True
+
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    # Frames rendered for nothing: identical to the one already on the screen
+    frames_unchanged: int = 0
+
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(Lcd, self).init_pyxavi(config=config, params=params)
 
+        self.PARTIAL_UPDATES = self._xconfig.get("lcd.partial_updates", self.PARTIAL_UPDATES)
+        self.PARTIAL_UPDATES_MAX_RATIO = self._xconfig.get("lcd.partial_updates_max_ratio", self.PARTIAL_UPDATES_MAX_RATIO)
+        self.ASYNC_FLUSH = self._xconfig.get("lcd.async_flush", self.ASYNC_FLUSH)
+
         # Initialise the LCD display
         self._xlog.info("Initialising LCD display...")
         self.driver = self.get_driver()
 
+        if self.ASYNC_FLUSH:
+            self._buffers = []
+            self._flush_condition = threading.Condition()
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="lcd-flush", daemon=True)
+            self._flush_thread.start()
+
     def get_driver(self) -> MockedST7789:
         """
         Get the LCD driver instance as a singleton
@@ -88,21 +126,123 @@ class Lcd(PyXavi):
         return Point(self.driver.width, self.driver.height)
 
     def flush_to_device(self, image: Image.Image):
+        """
+        Show the image. With the async flush it only copies the image into a back buffer
+        and returns, so the caller can keep drawing into its own image right away.
+        """
+        if not self.ASYNC_FLUSH:
+            self._send_to_device(image)
+            return
+
+        with self._flush_condition:
+            if self._pending_frame is not None:
+                # The worker did not take the previous frame yet: it is stale now
+                buffer = self._pending_frame
+                self.frames_dropped += 1
+                self._xlog.debug(f"Dropping a stale frame, {self.frames_dropped} dropped so far")
+            else:
+                buffer = self._get_free_buffer()
+
+            if buffer is None or buffer.size != image.size or buffer.mode != image.mode:
+                buffer = image.copy()
+                self._buffers = [b for b in self._buffers if b is self._in_flight_frame] + [buffer]
+            else:
+                buffer.paste(image)
+
+            self._pending_frame = buffer
+            self._flush_condition.notify_all()
+
+    def wait_until_flushed(self, timeout: float = None) -> bool:
+        """
+        Block until every frame handed over was sent. Returns False on timeout.
+        """
+        if not self.ASYNC_FLUSH:
+            return True
+        with self._flush_condition:
+            return self._flush_condition.wait_for(
+                lambda: self._pending_frame is None and self._in_flight_frame is None, timeout)
+
+    def _get_free_buffer(self) -> Image.Image | None:
+        """
+        A back buffer that the worker is not sending, or None if there is none yet.
+        """
+        for buffer in self._buffers:
+            if buffer is not self._in_flight_frame:
+                return buffer
+        return None
+
+    def _flush_loop(self):
+        while True:
+            with self._flush_condition:
+                self._flush_condition.wait_for(lambda: self._pending_frame is not None or not self._flush_loop_is_allowed)
+                if self._pending_frame is None:
+                    # Only leave once everything was sent
+                    break
+                self._in_flight_frame = self._pending_frame
+                self._pending_frame = None
+
+            try:
+                self._send_to_device(self._in_flight_frame)
+                self.frames_sent += 1
+            except Exception as e:
+                self._xlog.error(f"Error sending a frame to the LCD: {e}")
+                self._xlog.debug(full_stack())
+
+            with self._flush_condition:
+                self._in_flight_frame = None
+                self._flush_condition.notify_all()
+
+    def _send_to_device(self, image: Image.Image):
         if self._xconfig.get("lcd.rotate", False):
                 # In the test example it is rotated 180 degrees before ShowImage
                 image = image.rotate(180)
-        self.driver.ShowImage(image)
+
+        if not self.PARTIAL_UPDATES:
+            self.driver.ShowImage(image)
+            return
+
+        frame = np.asarray(image.convert("RGB"))
+        if self._last_frame is None or self._last_frame.shape != frame.shape:
+            self.driver.ShowImage(image)
+            self._last_frame = frame
+            return
+
+        regions = DirtyRegions.find(self._last_frame, frame)
+        self._last_frame = frame
+        if len(regions) == 0:
+            self.frames_unchanged += 1
+            self._xlog.debug("Frame did not change, nothing to send")
+            return
+
+        dirty_pixels = DirtyRegions.area(regions)
+        if dirty_pixels > frame.shape[0] * frame.shape[1] * self.PARTIAL_UPDATES_MAX_RATIO:
+            self.driver.ShowImage(image)
+            return
+
+        self._xlog.debug(f"Partial update of {len(regions)} regions, {dirty_pixels * 2} bytes")
+        self.driver.ShowImageRegions(image, regions)
     
     def clear(self):
         """
         Clear the LCD display
         """
+        # Don't let the worker send a frame in the middle of the clearing
+        self.wait_until_flushed()
         self.driver.clear()
+        # Whatever we sent before is not on the screen anymore
+        self._last_frame = None
     
     def close(self):
         """
         Close the LCD display
         """
+        if self.ASYNC_FLUSH and self._flush_thread is not None:
+            # Send what is still pending, like the last blank screen, and stop the worker
+            with self._flush_condition:
+                self._flush_loop_is_allowed = False
+                self._flush_condition.notify_all()
+            self._flush_thread.join()
+            self._xlog.debug(f"LCD worker stopped: {self.frames_sent} frames sent, {self.frames_dropped} dropped, {self.frames_unchanged} unchanged")
         self.driver.module_exit()
 
     def test(self):
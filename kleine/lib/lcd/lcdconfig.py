@@ -80,6 +80,11 @@ class RaspberryPi:
         if self.SPI!=None :
             self.SPI.writebytes(data)
 
+    def spi_writebuffer(self, data):
+        # Takes any buffer (bytes, bytearray, memoryview) and chunks it by itself
+        if self.SPI!=None :
+            self.SPI.writebytes2(data)
+
     def bl_DutyCycle(self, duty):
         self.BL_PIN.value = duty / 100
         
@@ -44,5 +44,10 @@ class MockedST7789(PyXavi):
         file_path = self.path_for_mocked_images + "_latest.png"
         image.save(file_path)
 
+    def ShowImageRegions(self, image: Image.Image, regions: list[tuple]):
+        # A PNG can't be partially updated, so we save the whole frame
+        self._xlog.debug(f"Mocked partial update of {len(regions)} regions: {regions}")
+        self.ShowImage(image)
+
     def module_exit(self):
         pass
\ No newline at end of file
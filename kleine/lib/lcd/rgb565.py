@@ -0,0 +1,42 @@
+import numpy as np
+
+class Rgb565Converter:
+    """
+    Converts RGB888 pixels into the big endian RGB565 bytes that the ST7789 expects.
+
+    The output buffer is allocated once for the biggest frame and reused on every call,
+    so a conversion builds no Python objects per pixel. Smaller images (partial updates)
+    use the beginning of the same buffer.
+
+    The returned memoryview is only valid until the next call to convert().
+    """
+
+    _max_pixels: int = 0
+    # Bytes that go to the device
+    _buffer: bytearray = None
+    # The same memory, seen as big endian 16 bit pixels
+    _pixels: np.ndarray = None
+    # Working copy of the channels widened to 16 bits, so the shifts don't overflow
+    _rgb16: np.ndarray = None
+
+    def __init__(self, width: int, height: int):
+        self._max_pixels = width * height
+        self._buffer = bytearray(self._max_pixels * 2)
+        self._pixels = np.frombuffer(self._buffer, dtype=">u2")
+        self._rgb16 = np.empty(self._max_pixels * 3, dtype=np.uint16)
+
+    def convert(self, rgb: np.ndarray) -> memoryview:
+        """
+        Takes an array of shape (height, width, 3) of uint8 and returns its RGB565 bytes.
+        """
+        height, width = rgb.shape[0], rgb.shape[1]
+        size = height * width
+        if size > self._max_pixels:
+            raise ValueError(f"Image of {width}x{height} does not fit in the RGB565 buffer")
+
+        rgb16 = self._rgb16[:size * 3].reshape(height, width, 3)
+        np.copyto(rgb16, rgb[..., :3])
+        pixels = self._pixels[:size].reshape(height, width)
+        pixels[...] = ((rgb16[..., 0] & 0xF8) << 8) | ((rgb16[..., 1] & 0xFC) << 3) | (rgb16[..., 2] >> 3)
+
+        return memoryview(self._buffer)[:size * 2]
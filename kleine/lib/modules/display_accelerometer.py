@@ -2,19 +2,23 @@ from pyxavi import Dictionary
 from kleine.lib.abstract.display_module import DisplayModule
 from kleine.lib.objects.point import Point
 from kleine.lib.objects.rectangle import Rectangle
+from kleine.lib.objects.module_definitions import AccelerometerActions
 
 class DisplayAccelerometer(DisplayModule):
 
+    options = {
+        AccelerometerActions.CALIBRATE_MAGNETOMETER: "🧭 Calibrate compass",
+        AccelerometerActions.CALIBRATE_GYROSCOPE: "🌀 Calibrate gyro",
+    }
+    OPTIONS_TOP: int = 168
+    OPTION_HEIGHT: int = 22
+
     def module(self, parameters: Dictionary = None):
         """
         Show the accelerometer module on the display
         """
         self._xlog.debug("Showing accelerometer module")
-        draw = self.canvas.get_canvas()
-
-        # Draw a rectangle over the entire screen
-        draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
-                       fill=self.canvas.COLOR_BLACK)
+        draw = self._get_layered_canvas(parameters, "🛩️")
         
         # Prepare the data:
         acc_x, acc_y, acc_z = parameters.get("acceleration", (0, 0, 0))
@@ -37,12 +41,20 @@ class DisplayAccelerometer(DisplayModule):
                    fill=self.canvas.COLOR_WHITE,
                    align="left")
 
-        # All modules should share a similar status header
-        if parameters.get("statusbar_active", True):
-            self._shared_status_header(draw, parameters, "🛩️")
-            self._shared_status_footer(draw, parameters)
+        for index, (key, description) in enumerate(self.options.items()):
+            top = self.OPTIONS_TOP + index * self.OPTION_HEIGHT
+            color = self.canvas.COLOR_WHITE
+            if key == parameters.get("selected_option"):
+                draw.rectangle(Rectangle(Point(10, top), Point(self.screen_size.x - 10, top + self.OPTION_HEIGHT)).to_image_rectangle(),
+                       fill=self.canvas.COLOR_WHITE)
+                color = self.canvas.COLOR_BLACK
+            draw.text(Point(10, top).to_image_point(),
+                    text=description,
+                    font=self.canvas.FONT_TINY,
+                    fill=color,
+                    align="left")
 
-        # Show modal message if any
+        # Show modal message if any, always on top
         self._shared_modal_message(draw, parameters)
 
         self._flush_canvas_to_device()
@@ -1,7 +1,6 @@
 from pyxavi import Dictionary
 from kleine.lib.abstract.display_module import DisplayModule
 from kleine.lib.objects.point import Point
-from kleine.lib.objects.rectangle import Rectangle
 
 class DisplayCockpit(DisplayModule):
 
@@ -10,11 +9,7 @@ class DisplayCockpit(DisplayModule):
         Show the Cockpit module on the display
         """
         self._xlog.debug("Showing Cockpit module")
-        draw = self.canvas.get_canvas()
-
-        # Draw a rectangle over the entire screen
-        draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
-                       fill=self.canvas.COLOR_BLACK)
+        draw = self._get_layered_canvas(parameters, "🚗")
 
         # Prepare the GPS text
         gps_data: dict = parameters.get("gps_info", {})
@@ -33,11 +28,7 @@ class DisplayCockpit(DisplayModule):
                    anchor="mm",
                    align="center")
 
-        # All modules should share a similar status header
-        if parameters.get("statusbar_active", True):
-            self._shared_status_header(draw, parameters, "🚗")
-            self._shared_status_footer(draw, parameters)
-        
+        # The modal message is the overlay, always on top
         self._shared_modal_message(draw, parameters)
 
         self._flush_canvas_to_device()
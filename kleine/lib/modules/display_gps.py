@@ -1,9 +1,9 @@
 from pyxavi import Dictionary
 from kleine.lib.abstract.display_module import DisplayModule
 from kleine.lib.objects.point import Point
-from kleine.lib.objects.rectangle import Rectangle
 
 from kleine.lib.objects.gps_signal_quality import GPSSignalQuality
+from kleine.lib.objects.gps_link_state import GPSLinkState
 
 class DisplayGPS(DisplayModule):
 
@@ -14,44 +14,57 @@ class DisplayGPS(DisplayModule):
     ]
     SIGNAL_UNKNOWN = "Unknown"
 
+    LABELS = [
+        "Latitude:",
+        "Longitude:",
+        "Altitude:",
+        "Speed:",
+        "Status:",
+        "Signal Quality:",
+        "Num. Satellites:",
+    ]
+
     def module(self, parameters: Dictionary = None):
         """
         Show the GPS module on the display
         """
         self._xlog.debug("Showing GPS module")
-        draw = self.canvas.get_canvas()
+        # The labels are static, only the values are drawn every time
+        draw = self._get_layered_canvas(parameters, "📡", lambda static_draw: self._draw_labels(
+            static_draw, Point(10, 40), self.LABELS, self.canvas.FONT_SMALL))
 
-        # Draw a rectangle over the entire screen
-        draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
-                       fill=self.canvas.COLOR_BLACK)
-
-        # Prepare the GPS text
+        # Prepare the GPS values
         gps_data: dict = parameters.get("gps_info", {})
         signal_quality: int = gps_data.get("signal_quality", 0)
         signal_quality = signal_quality if signal_quality < len(self.SIGNAL_STRINGS) else GPSSignalQuality.SIGNAL_GOOD
-        gps_text = [
-            f"Latitude: {gps_data.get('latitude', 'N/A')} {gps_data.get('direction_latitude', '')}",
-            f"Longitude: {gps_data.get('longitude', 'N/A')} {gps_data.get('direction_longitude', '')}",
-            f"Altitude: {gps_data.get('altitude', 'N/A')} {gps_data.get('altitude_units', '')}",
-            f"Speed: {gps_data.get('speed', 'N/A')} km/h",
-            f"Status: {gps_data.get('status', 'N/A')}",
-            # f"Timestamp: {gps_data.get('timestamp').isoformat() if gps_data.get('timestamp') else 'N/A'}",
-            f"Signal Quality: {self.SIGNAL_STRINGS[signal_quality] if signal_quality >= 0 else self.SIGNAL_UNKNOWN}",
-            f"Num. Satellites: {gps_data.get('num_sats', 'N/A')}",
+        gps_values = [
+            f"{gps_data.get('latitude', 'N/A')} {gps_data.get('direction_latitude', '')}",
+            f"{gps_data.get('longitude', 'N/A')} {gps_data.get('direction_longitude', '')}",
+            f"{gps_data.get('altitude', 'N/A')} {gps_data.get('altitude_units', '')}",
+            f"{gps_data.get('speed', 'N/A')} km/h",
+            self._status_text(gps_data),
+            # f"{gps_data.get('timestamp').isoformat() if gps_data.get('timestamp') else 'N/A'}",
+            f"{self.SIGNAL_STRINGS[signal_quality] if signal_quality >= 0 else self.SIGNAL_UNKNOWN}",
+            f"{gps_data.get('num_sats', 'N/A')}",
         ]
-        gps_text_str = "\n".join(gps_text)
-
-        draw.text(Point(10, 40).to_image_point(),
-                   text=gps_text_str,
-                   font=self.canvas.FONT_SMALL,
-                   fill=self.canvas.COLOR_WHITE,
-                   align="left")
-
-        # All modules should share a similar status header
-        if parameters.get("statusbar_active", True):
-            self._shared_status_header(draw, parameters, "📡")
-            self._shared_status_footer(draw, parameters)
-        
+
+        self._draw_values_after_labels(draw, Point(10, 40), self.LABELS, gps_values, self.canvas.FONT_SMALL)
+
+        # The modal message is the overlay, always on top
         self._shared_modal_message(draw, parameters)
 
         self._flush_canvas_to_device()
+
+    def _status_text(self, gps_data: dict) -> str:
+        """
+        The fix status, unless the link with the receiver is not working
+        """
+        link_state = gps_data.get("link_state", None)
+        link_detail = gps_data.get("link_detail", None)
+        if link_state == GPSLinkState.STALE:
+            return f"No data {link_detail}s" if link_detail is not None else "No data"
+        if link_state == GPSLinkState.RECONNECTING:
+            return f"Reconnecting {link_detail}s" if link_detail is not None else "Reconnecting"
+        if link_state == GPSLinkState.STOPPED:
+            return "Stopped"
+        return f"{gps_data.get('status', 'N/A')}"
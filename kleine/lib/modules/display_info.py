@@ -1,44 +1,40 @@
 from pyxavi import Dictionary
 from kleine.lib.abstract.display_module import DisplayModule
 from kleine.lib.objects.point import Point
-from kleine.lib.objects.rectangle import Rectangle
 
 class DisplayInfo(DisplayModule):
 
+    LABELS = [
+        "OS & arch:",
+        "IP address:",
+        "MAC address:",
+        "Wifi SSID:",
+        "Wifi Sec:",
+        "Wifi Signal:",
+    ]
+
     def module(self, parameters: Dictionary = None):
         """
         Show the information module on the display
         """
         self._xlog.debug("Showing information module...")
-        draw = self.canvas.get_canvas()
-
-        # Draw a rectangle over the entire screen
-        draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
-                       fill=self.canvas.COLOR_BLACK)
+        # The labels are static, only the values are drawn every time
+        draw = self._get_layered_canvas(parameters, "ℹ️", lambda static_draw: self._draw_labels(
+            static_draw, Point(10, 50), self.LABELS, self.canvas.FONT_SMALL))
         
-        # Prepare the info text
+        # Prepare the info values
         os_data: dict = parameters.get("os_info", {})
         network_interface: dict = parameters.get("network_interface", {})
         wifi_network: dict = parameters.get("wifi_network", {})
-        info_text = [
-            f"OS & arch: {os_data.get('system', 'N/A')} / {os_data.get('machine', 'N/A')}",
-            f"IP address: {network_interface.get('ip', 'N/A')}",
-            f"MAC address: {network_interface.get('mac', 'N/A')}",
-            f"Wifi SSID: {wifi_network.get('ssid', 'N/A')}",
-            f"Wifi Sec: {wifi_network.get('security', 'N/A')}",
-            f"Wifi Signal: {wifi_network.get('signal_strength', 'N/A')}",
+        info_values = [
+            f"{os_data.get('system', 'N/A')} / {os_data.get('machine', 'N/A')}",
+            f"{network_interface.get('ip', 'N/A')}",
+            f"{network_interface.get('mac', 'N/A')}",
+            f"{wifi_network.get('ssid', 'N/A')}",
+            f"{wifi_network.get('security', 'N/A')}",
+            f"{wifi_network.get('signal_strength', 'N/A')}",
         ]
-        info_text_str = "\n".join(info_text)
-
-        draw.text(Point(10, 50).to_image_point(),
-                   text=info_text_str,
-                   font=self.canvas.FONT_SMALL,
-                   fill=self.canvas.COLOR_WHITE,
-                   align="left")
 
-        # All modules should share a similar status header
-        if parameters.get("statusbar_active", True):
-            self._shared_status_header(draw, parameters, "ℹ️")
-            self._shared_status_footer(draw, parameters)
+        self._draw_values_after_labels(draw, Point(10, 50), self.LABELS, info_values, self.canvas.FONT_SMALL)
 
         self._flush_canvas_to_device()
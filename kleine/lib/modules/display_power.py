@@ -18,11 +18,7 @@ class DisplayPower(DisplayModule):
         Show the power module on the display
         """
         self._xlog.debug("Showing power module, selected option: " + parameters.get("selected_option", "none"))
-        draw = self.canvas.get_canvas()
-
-        # Draw a rectangle over the entire screen
-        draw.rectangle(Rectangle(Point(0, 0), self.screen_size).to_image_rectangle(),
-                       fill=self.canvas.COLOR_BLACK)
+        draw = self._get_layered_canvas(parameters, "⛔️")
         
         for key, description in self.options.items():
             option_text = description
@@ -42,12 +38,7 @@ class DisplayPower(DisplayModule):
                         align="left")
         
 
-        # All modules should share a similar status header
-        if parameters.get("statusbar_active", True):
-            self._shared_status_header(draw, parameters, "⛔️")
-
-        # Show modal message if any
+        # Show modal message if any, always on top
         self._shared_modal_message(draw, parameters)
-        self._shared_status_footer(draw, parameters)
 
         self._flush_canvas_to_device()
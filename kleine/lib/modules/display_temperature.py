@@ -9,11 +9,7 @@ class DisplayTemperature(DisplayModule):
         Show the current temperature on the display
         """
         self._xlog.debug("Showing current temperature...")
-        draw = self.canvas.get_canvas()
-
-        # All modules should share a similar status header
-        self._shared_status_header(draw, parameters, "🌡")
-        self._shared_status_footer(draw, parameters)
+        draw = self._get_layered_canvas(parameters, "🌡")
 
         # Print the temperature in the middle of the screen
         draw.text(Point((self.screen_size.x / 2), (self.screen_size.y / 2) - 15).to_image_point(),
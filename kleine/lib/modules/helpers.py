@@ -13,12 +13,44 @@ import logging
 class ScreenSections:
 
     STATUS_BAR_PICES_SPACING = 5 
+    # Rows taken by the status header, the separator line included
+    STATUS_HEADER_HEIGHT = 27
 
     @staticmethod
     def shared_status_header(draw: ImageDraw.ImageDraw, parameters: Dictionary):
         """
         Draw a shared status header for all modules
         """
+        ScreenSections.shared_status_header_dynamic(draw, parameters)
+        ScreenSections.shared_status_header_static(draw, parameters)
+
+    @staticmethod
+    def shared_status_header_static(draw: ImageDraw.ImageDraw, parameters: Dictionary):
+        """
+        The parts of the status header that never change within a module: the navigation icon and the line
+        """
+        draw = ScreenSections._with_text_cache(draw, parameters)
+        screen_size: Point = parameters.get("screen_size")
+
+        # The left side is reserved for navigation icons: we show current module displayed.
+        draw.text((5, 5),
+                    text=f"{parameters.get('statusbar_nav_icon', '')}",
+                    font=parameters.get("statusbar_font_emoji"),
+                    fill=parameters.get("statusbar_font_color"),
+                    anchor="lt",
+                    align="left")
+        
+        # Draw a line between the title and the subtitle
+        draw.line(Rectangle(Point(5, 26), Point(screen_size.x - 5, 26)).to_image_rectangle(),
+                  fill=parameters.get("statusbar_font_color"),
+                  width=1)
+
+    @staticmethod
+    def shared_status_header_dynamic(draw: ImageDraw.ImageDraw, parameters: Dictionary):
+        """
+        The parts of the status header that change with the data: time, battery, temperature and signals
+        """
+        draw = ScreenSections._with_text_cache(draw, parameters)
 
         # Take in account that aligning right makes the text box to start from max_with downwards.
         # This means that we define the start drawing position from the corner up-right.
@@ -172,25 +204,13 @@ class ScreenSections:
             #     align="right"
             # )
             # next_right_slot_x -= (bounding_emoji_signal[2] - bounding_emoji_signal[0]) + ScreenSections.STATUS_BAR_PICES_SPACING
-
-        # The left side is reserved for navigation icons: we show current module displayed.
-        draw.text((5, 5),
-                    text=f"{parameters.get('statusbar_nav_icon', '')}",
-                    font=parameters.get("statusbar_font_emoji"),
-                    fill=parameters.get("statusbar_font_color"),
-                    anchor="lt",
-                    align="left")
-        
-        # Draw a line between the title and the subtitle
-        draw.line(Rectangle(Point(5, 26), Point(screen_size.x - 5, 26)).to_image_rectangle(),
-                  fill=parameters.get("statusbar_font_color"),
-                  width=1)
     
     @staticmethod
     def shared_status_footer(draw: ImageDraw.ImageDraw, parameters: Dictionary):
         """
         Draw a shared status footer for all modules
         """
+        draw = ScreenSections._with_text_cache(draw, parameters)
 
         screen_size: Point = parameters.get("screen_size")
         line_y = screen_size.y - 26
@@ -286,6 +306,17 @@ class ScreenSections:
                 anchor="rb",
                 align="right")
 
+    @staticmethod
+    def _with_text_cache(draw: ImageDraw.ImageDraw, parameters: Dictionary) -> ImageDraw.ImageDraw:
+        """
+        The status bar repeats the same icons and labels on every frame.
+        When we get a text cache, they're blitted from it instead of rendered again.
+        """
+        text_cache = parameters.get("text_cache", None)
+        if text_cache is None:
+            return draw
+        return text_cache.wrap(draw)
+
 class Helpers:
     """
     Common module to provide shared functionality across different modules.
@@ -0,0 +1,17 @@
+from typing import NamedTuple
+
+class GpsFix(NamedTuple):
+    """
+    A GPS fix as published by the GPS reader.
+
+    Every fix that differs from the previous one is a new object with a bigger sequence,
+    so consumers know without comparing the values if they already processed it.
+    It is shared between threads: never mutate the values.
+    """
+
+    # Merged values from the NMEA sentences, e.g. {"latitude": 41.38, "longitude": 2.17, ...}
+    values: dict
+    # When the fix was published, from time.time()
+    timestamp: float
+    # Increases on every new fix, starting at 1
+    sequence: int
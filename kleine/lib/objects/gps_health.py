@@ -0,0 +1,17 @@
+from typing import NamedTuple
+
+class GpsHealth(NamedTuple):
+    """
+    Health of the link with the GPS receiver, as seen by the reader thread.
+    """
+
+    # One of GPSLinkState
+    state: str
+    # Seconds since the last sentence arrived. None if nothing arrived yet
+    seconds_since_data: float | None
+    # Times that the serial port was opened again after losing it
+    reconnects: int
+    # Sentences that could not be parsed, e.g. wrong checksum
+    parse_errors: int
+    # Seconds until the next attempt to open the port, while reconnecting
+    retry_in: float | None
@@ -0,0 +1,6 @@
+class GPSLinkState:
+    CONNECTING: str = "connecting"
+    CONNECTED: str = "connected"
+    STALE: str = "stale"
+    RECONNECTING: str = "reconnecting"
+    STOPPED: str = "stopped"
\ No newline at end of file
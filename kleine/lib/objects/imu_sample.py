@@ -0,0 +1,18 @@
+from typing import NamedTuple
+
+class ImuSample(NamedTuple):
+    """
+    One sample of the IMU, as it came out of the QMI8658 FIFO.
+
+    The values are raw sensor units. Never mutate them, the same sample is shared
+    by everyone reading the buffer.
+    """
+
+    # When the sample was taken, from time.time()
+    timestamp: float
+    # Accelerometer X, Y, Z
+    acceleration: tuple[int, int, int]
+    # Gyroscope X, Y, Z, without the offset measured at start
+    gyroscope: tuple[int, int, int]
+    # Latest magnetometer X, Y, Z. It samples slower, so consecutive samples repeat it.
+    magnetometer: tuple[int, int, int]
@@ -0,0 +1,19 @@
+from typing import NamedTuple
+
+class ImuSnapshot(NamedTuple):
+    """
+    Everything the IMU knows at one moment, read together.
+
+    The sensor values are raw units. Never mutate them.
+    """
+
+    # When the values were read, from time.time()
+    timestamp: float
+    # Accelerometer X, Y, Z
+    acceleration: tuple[int, int, int]
+    # Gyroscope X, Y, Z, without the offset measured at start
+    gyroscope: tuple[int, int, int]
+    # Latest magnetometer X, Y, Z
+    magnetometer: tuple[int, int, int]
+    # Orientation in degrees, after integrating these values
+    pitch_roll_yaw: tuple[float, float, float]
@@ -7,6 +7,10 @@ class ModuleDefinitions:
     SETTINGS = "settings"
     POWER = "power"
 
+class AccelerometerActions:
+    CALIBRATE_MAGNETOMETER = "calibrate_magnetometer"
+    CALIBRATE_GYROSCOPE = "calibrate_gyroscope"
+
 class PowerActions:
     POWER_SLEEP = "sleep"
     POWER_SHUTDOWN = "shutdown"
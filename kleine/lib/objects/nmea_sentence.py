@@ -0,0 +1,33 @@
+from datetime import date, time
+from typing import NamedTuple
+
+class NmeaSentence(NamedTuple):
+    """
+    The fields we use from a GGA, RMC or GLL sentence.
+
+    Values have the same types and meaning as the pynmea2 attributes with the same name,
+    e.g. latitude and longitude are signed decimal degrees. Fields that the sentence
+    type does not carry, or that came empty, are None.
+    """
+
+    # "GGA", "RMC" or "GLL"
+    sentence_type: str
+    # "GP", "GN", "GL"...
+    talker: str
+    timestamp: time = None
+    latitude: float = None
+    longitude: float = None
+    lat_dir: str = None
+    lon_dir: str = None
+    # RMC, GLL: "A" valid, "V" invalid
+    status: str = None
+    # GGA only
+    gps_qual: int = None
+    num_sats: int = None
+    altitude: float = None
+    altitude_units: str = None
+    # RMC only. Speed in knots and course in degrees
+    spd_over_grnd: float = None
+    true_course: float = None
+    # RMC only. UTC date of the timestamp
+    datestamp: date = None
@@ -0,0 +1,16 @@
+from typing import NamedTuple
+
+class SensorReading(NamedTuple):
+    """
+    Latest values read from a sensor.
+
+    It is published by the sensor worker thread as a whole new object, so readers
+    always get a consistent set of values without locking. Never mutate the values.
+    """
+
+    # Values by name, e.g. {"temperature": 21.5, "humidity": 40.2}
+    values: dict
+    # When the values were read, from time.time()
+    timestamp: float
+    # Increases on every new reading, so readers know if they already applied it
+    sequence: int
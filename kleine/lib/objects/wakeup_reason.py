@@ -0,0 +1,5 @@
+class WakeupReason:
+    BUTTON = "button"
+    GPS = "gps"
+    SENSOR = "sensor"
+    TIMER = "timer"
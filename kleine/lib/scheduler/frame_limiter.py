@@ -0,0 +1,112 @@
+from pyxavi import Config, Dictionary
+from kleine.lib.abstract.pyxavi import PyXavi
+
+import time
+
+class FrameLimiter(PyXavi):
+    """
+    Decides when the screen is actually rendered.
+
+    Along a loop iteration many things may ask for a refresh: the clock, the scheduled
+    tasks, new sensor readings, the GPS, a button... Every request only marks a frame
+    as pending. The main loop renders it once the frame budget of the current module
+    allows it, so all the requests inside one budget end up in a single render and
+    a single flush to the device.
+
+    Button presses are urgent: the user is waiting for them, so they skip the budget.
+
+    The budget comes from the config under `scheduler.frames`: a default `max_fps` and
+    an optional `max_fps` per module in `modules.<name>.max_fps`.
+    """
+
+    DEFAULT_MAX_FPS: float = 4
+
+    _max_fps: float = DEFAULT_MAX_FPS
+    _current_module: str = None
+    _frame_interval: float = None
+
+    _pending: bool = False
+    _urgent: bool = False
+    _last_render: float = None
+
+    # Counters to measure how much work the coalescing saves
+    requests: int = 0
+    coalesced: int = 0
+    renders: int = 0
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(FrameLimiter, self).init_pyxavi(config=config, params=params)
+
+        self._max_fps = self._xconfig.get("scheduler.frames.max_fps", self.DEFAULT_MAX_FPS)
+        self._frame_interval = self._interval_for(None)
+
+    def set_current_module(self, module_name: str):
+        """
+        Apply the budget of the module that is on screen.
+        """
+        if module_name == self._current_module:
+            return
+        self._current_module = module_name
+        self._frame_interval = self._interval_for(module_name)
+        self._xlog.debug(f"🖼️ Frame budget for [{module_name}] is {self._frame_interval:.3f}s")
+
+    def request(self, urgent: bool = False):
+        """
+        Ask for a frame. Requests arriving while one is pending are merged into it.
+        """
+        self.requests += 1
+        if self._pending:
+            self.coalesced += 1
+        self._pending = True
+        self._urgent = self._urgent or urgent
+
+    def is_pending(self) -> bool:
+        return self._pending
+
+    def should_render(self, now: float = None) -> bool:
+        """
+        True if there is a pending frame and the budget allows to render it now.
+        """
+        if not self._pending:
+            return False
+        if self._urgent or self._last_render is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self._last_render >= self._frame_interval
+
+    def seconds_until_next_frame(self, now: float = None) -> float | None:
+        """
+        Seconds until the pending frame can be rendered. None if there is nothing pending.
+        """
+        if not self._pending:
+            return None
+        if self._urgent or self._last_render is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        return max(0, self._last_render + self._frame_interval - now)
+
+    def rendered(self, now: float = None):
+        """
+        Tell the limiter that a frame was just rendered and flushed.
+        """
+        self._last_render = time.monotonic() if now is None else now
+        self._pending = False
+        self._urgent = False
+        self.renders += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "renders": self.renders,
+        }
+
+    def _interval_for(self, module_name: str | None) -> float:
+        max_fps = self._max_fps
+        if module_name is not None:
+            max_fps = self._xconfig.get(f"scheduler.frames.modules.{module_name}.max_fps", max_fps)
+
+        if max_fps is None or max_fps <= 0:
+            self._xlog.warning(f"🖼️ Invalid max_fps [{max_fps}] for [{module_name}], using {self.DEFAULT_MAX_FPS}")
+            max_fps = self.DEFAULT_MAX_FPS
+        return 1 / max_fps
@@ -0,0 +1,189 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.abstract.pyxavi import PyXavi
+
+import heapq, itertools, math, time
+
+class ScheduledTask:
+    """
+    A periodic task known by the Scheduler.
+
+    - period: seconds between runs.
+    - jitter: seconds the task may run earlier than due, so it shares a wake up with another task.
+    - only_in_modules: list of module names where the task makes sense. None means always.
+    - align: run on wall clock multiples of the period (e.g. the clock at every minute change).
+    """
+
+    name: str = None
+    callback: callable = None
+    period: float = None
+    jitter: float = 0.0
+    only_in_modules: list[str] = None
+    align: bool = False
+    enabled: bool = True
+
+    next_run: float = None
+    # Bumped on every reschedule, so older heap entries of this task are ignored
+    generation: int = 0
+
+    def __init__(self, name: str, callback: callable, period: float, jitter: float = 0.0,
+                 only_in_modules: list[str] = None, align: bool = False, enabled: bool = True):
+        self.name = name
+        self.callback = callback
+        self.period = period
+        self.jitter = jitter
+        self.only_in_modules = only_in_modules
+        self.align = align
+        self.enabled = enabled
+
+    def is_visible(self, current_module: str) -> bool:
+        if not self.enabled:
+            return False
+        return self.only_in_modules is None or current_module in self.only_in_modules
+
+    def calculate_next_run(self, now: float) -> float:
+        if self.align:
+            return (math.floor(now / self.period) + 1) * self.period
+
+        # Keep the cadence without drifting, unless we are so late that we'd burst to catch up
+        if self.next_run is not None and self.next_run + self.period > now:
+            return self.next_run + self.period
+        return now + self.period
+
+class Scheduler(PyXavi):
+    """
+    Runs periodic tasks out of a timer heap.
+
+    Tasks register with their own period, jitter budget and the modules where they are
+    visible. The main loop asks for the time until the next deadline to know how long it
+    can sleep, and then runs whatever is due. Each task returns True if the screen needs
+    to be refreshed.
+
+    Any task can be tuned from the config under `scheduler.tasks.<name>`, with the keys
+    `period`, `jitter`, `only_in_modules`, `align` and `enabled`.
+    """
+
+    DEFAULT_PERIOD: float = 2
+    DEFAULT_JITTER: float = 0.0
+
+    _tasks: dict[str, ScheduledTask] = None
+    _heap: list[tuple] = None
+    _counter: itertools.count = None
+    _current_module: str = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(Scheduler, self).init_pyxavi(config=config, params=params)
+
+        self._tasks = {}
+        self._heap = []
+        self._counter = itertools.count()
+
+        self.DEFAULT_PERIOD = self._xparams.get("default_period", self.DEFAULT_PERIOD)
+
+    def register(self, name: str, callback: callable, period: float = None, jitter: float = None,
+                 only_in_modules: list[str] = None, align: bool = False):
+        """
+        Register a task. The values given here are the defaults, the config can override them.
+        """
+        config_prefix = f"scheduler.tasks.{name}"
+        task = ScheduledTask(
+            name=name,
+            callback=callback,
+            period=self._xconfig.get(config_prefix + ".period", period if period is not None else self.DEFAULT_PERIOD),
+            jitter=self._xconfig.get(config_prefix + ".jitter", jitter if jitter is not None else self.DEFAULT_JITTER),
+            only_in_modules=self._xconfig.get(config_prefix + ".only_in_modules", only_in_modules),
+            align=self._xconfig.get(config_prefix + ".align", align),
+            enabled=self._xconfig.get(config_prefix + ".enabled", True),
+        )
+
+        if task.period is None or task.period <= 0:
+            self._xlog.warning(f"🕐 Task [{name}] has an invalid period [{task.period}], disabling it")
+            task.enabled = False
+
+        self._xlog.debug(f"🕐 Registering task [{name}] every {task.period}s, jitter {task.jitter}s, " +
+                         f"visible in {task.only_in_modules if task.only_in_modules is not None else 'all modules'}")
+        self._tasks[name] = task
+
+        # New tasks run as soon as they're visible
+        if task.is_visible(self._current_module):
+            self._schedule(task, time.time())
+
+    def set_current_module(self, module_name: str):
+        """
+        Tell the scheduler which module is on screen.
+        Tasks that just became visible are due right away, the ones that are hidden stop running.
+        """
+        if module_name == self._current_module:
+            return
+
+        previous_module = self._current_module
+        self._current_module = module_name
+        now = time.time()
+        for task in self._tasks.values():
+            if task.is_visible(module_name) and not task.is_visible(previous_module):
+                self._schedule(task, now)
+
+    def seconds_until_next_task(self, now: float = None) -> float | None:
+        """
+        Seconds left until the next visible task is due. None if there is nothing scheduled.
+        """
+        now = time.time() if now is None else now
+        entry = self._peek()
+        if entry is None:
+            return None
+        return max(0, entry[0] - now)
+
+    def run_due_tasks(self, now: float = None) -> bool:
+        """
+        Run every task that is due. Returns True if any of them asks for a screen refresh.
+        """
+        now = time.time() if now is None else now
+        should_refresh = False
+        ran_any = False
+
+        while True:
+            entry = self._peek()
+            if entry is None or entry[0] > now:
+                break
+            heapq.heappop(self._heap)
+            should_refresh = self._run(self._tasks[entry[2]], now) or should_refresh
+            ran_any = True
+
+        # We're awake anyway: run now the tasks that accept to be that early
+        if ran_any:
+            for task in self._tasks.values():
+                if task.jitter > 0 and task.is_visible(self._current_module) and \
+                    task.next_run is not None and task.next_run - task.jitter <= now:
+                    should_refresh = self._run(task, now) or should_refresh
+
+        return should_refresh
+
+    def _run(self, task: ScheduledTask, now: float) -> bool:
+        result = False
+        try:
+            result = bool(task.callback())
+        except Exception as e:
+            self._xlog.error(f"🕐 Error running task [{task.name}]: {e}")
+            self._xlog.debug(full_stack())
+
+        self._schedule(task, task.calculate_next_run(now))
+        return result
+
+    def _schedule(self, task: ScheduledTask, when: float):
+        task.next_run = when
+        task.generation += 1
+        heapq.heappush(self._heap, (when, next(self._counter), task.name, task.generation))
+
+    def _peek(self) -> tuple | None:
+        """
+        Returns the earliest live heap entry, discarding the stale and hidden ones on the way.
+        Hidden tasks are parked: set_current_module() schedules them again when they become visible.
+        """
+        while len(self._heap) > 0:
+            when, _, name, generation = self._heap[0]
+            task = self._tasks[name]
+            if generation == task.generation and task.is_visible(self._current_module):
+                return self._heap[0]
+            heapq.heappop(self._heap)
+            if generation == task.generation:
+                task.next_run = None
+        return None
@@ -0,0 +1,43 @@
+from kleine.lib.objects.wakeup_reason import WakeupReason
+
+import threading
+
+class WakeupSignal:
+    """
+    Single wait primitive for the main loop.
+
+    Producers (button edges, sensor threads, the GPS reader...) call notify() from
+    whatever thread they live in. The main loop calls wait() with the time left until
+    its next deadline, so it sleeps without burning CPU and wakes up as soon as
+    something happens or the deadline is reached.
+    """
+
+    _condition: threading.Condition = None
+    _reasons: set = None
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._reasons = set()
+
+    def notify(self, reason: str = WakeupReason.SENSOR):
+        """
+        Wake up the waiting loop. Safe to call from any thread.
+        """
+        with self._condition:
+            self._reasons.add(reason)
+            self._condition.notify_all()
+
+    def wait(self, timeout: float = None) -> set:
+        """
+        Block until notified or until the timeout (in seconds) expires.
+
+        Returns the set of reasons that woke us up. A timeout returns {TIMER}.
+        A timeout of 0 or less returns immediately (polling behaviour).
+        """
+        with self._condition:
+            if len(self._reasons) == 0 and (timeout is None or timeout > 0):
+                self._condition.wait(timeout)
+            reasons = self._reasons
+            self._reasons = set()
+
+        return reasons if len(reasons) > 0 else {WakeupReason.TIMER}
@@ -0,0 +1,211 @@
+from pyxavi import Config, Dictionary, full_stack
+from kleine.lib.abstract.pyxavi import PyXavi
+from kleine.lib.objects.sensor_reading import SensorReading
+
+from collections import deque
+import threading, time
+
+class SensorWorker:
+    """
+    Owns one sensor and reads it in its own thread, only when asked to.
+
+    The reader callable does the (slow, sleeping) I2C work and returns a dict of values.
+    The result is published as a new SensorReading by swapping the reference, which is
+    atomic in Python, so get_latest() never blocks.
+
+    Other work on the same driver (e.g. a calibration) is given with submit() and runs
+    in the same thread, between reads.
+    """
+
+    name: str = None
+    reader: callable = None
+
+    _latest: SensorReading = None
+    _sequence: int = 0
+    _requested: threading.Event = None
+    # Pending (job, on_done) submitted to run in the worker thread
+    _jobs: deque = None
+    _stop: threading.Event = None
+    _thread: threading.Thread = None
+    _on_reading: callable = None
+    _on_error: callable = None
+
+    def __init__(self, name: str, reader: callable, on_reading: callable = None, on_error: callable = None):
+        self.name = name
+        self.reader = reader
+        self._on_reading = on_reading
+        self._on_error = on_error
+        self._requested = threading.Event()
+        self._stop = threading.Event()
+        self._jobs = deque()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name=f"sensor-{self.name}", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """
+        Ask for a new reading. Returns immediately. Several requests before
+        the worker gets to them end up in a single read.
+        """
+        self._requested.set()
+
+    def read_now(self):
+        """
+        Read in the caller's thread. Used when the background threads are disabled.
+        """
+        self._read()
+
+    def submit(self, job: callable, on_done: callable = None):
+        """
+        Run the job in the worker thread before the next read. Returns immediately.
+        on_done gets what the job returned, or None if it raised.
+        """
+        self._jobs.append((job, on_done))
+        self._requested.set()
+
+    def run_now(self, job: callable, on_done: callable = None):
+        """
+        Run the job in the caller's thread. Used when the background threads are disabled.
+        """
+        self._jobs.append((job, on_done))
+        self._run_jobs()
+
+    def get_latest(self) -> SensorReading | None:
+        return self._latest
+
+    def stop(self):
+        self._stop.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._requested.wait()
+            self._requested.clear()
+            if self._stop.is_set():
+                break
+            self._run_jobs()
+            self._read()
+
+    def _run_jobs(self):
+        while len(self._jobs) > 0:
+            job, on_done = self._jobs.popleft()
+            try:
+                result = job()
+            except Exception as e:
+                result = None
+                if self._on_error is not None:
+                    self._on_error(self.name, e)
+            if on_done is not None:
+                on_done(result)
+
+    def _read(self):
+        try:
+            values = self.reader()
+        except Exception as e:
+            if self._on_error is not None:
+                self._on_error(self.name, e)
+            return
+
+        self._sequence += 1
+        self._latest = SensorReading(values=values, timestamp=time.time(), sequence=self._sequence)
+        if self._on_reading is not None:
+            self._on_reading(self.name)
+
+class SensorHub(PyXavi):
+    """
+    Keeps the sensor reads out of the main loop.
+
+    Every sensor gets a SensorWorker with its own thread, so a slow I2C transaction
+    in one of them does not delay the others or the UI. The main loop calls request()
+    from its scheduled tasks and later picks up the values with get_latest() once
+    the listeners tell it that a new reading is there.
+
+    Each driver is only ever touched by its own worker thread.
+    """
+
+    THREADED: bool = True
+
+    _workers: dict[str, SensorWorker] = None
+    _listeners: list = None
+
+    def __init__(self, config: Config = None, params: Dictionary = None):
+        super(SensorHub, self).init_pyxavi(config=config, params=params)
+
+        self._workers = {}
+        self._listeners = []
+        self.THREADED = self._xconfig.get("sensors.threaded", self.THREADED)
+        if not self.THREADED:
+            self._xlog.warning("Sensor threads are disabled, sensors will be read inline")
+
+    def add_sensor(self, name: str, reader: callable):
+        """
+        Register a sensor. The reader is a callable returning a dict with the values.
+        """
+        worker = SensorWorker(
+            name=name,
+            reader=reader,
+            on_reading=self._notify_listeners,
+            on_error=self._on_worker_error
+        )
+        self._workers[name] = worker
+        if self.THREADED:
+            worker.start()
+        self._xlog.debug(f"🌡️ Sensor [{name}] registered in the hub")
+
+    def request(self, name: str):
+        """
+        Ask the sensor for a new reading without blocking (unless the threads are disabled).
+        """
+        if name not in self._workers:
+            self._xlog.warning(f"🌡️ Requested an unknown sensor [{name}]")
+            return
+
+        if self.THREADED:
+            self._workers[name].request()
+        else:
+            self._workers[name].read_now()
+
+    def submit(self, name: str, job: callable, on_done: callable = None):
+        """
+        Run the job in the thread of the sensor, so it does not race with its reads and
+        does not block the main loop (unless the threads are disabled).
+        on_done gets what the job returned, or None if it raised, from that thread.
+        """
+        if name not in self._workers:
+            self._xlog.warning(f"🌡️ Submitted a job to an unknown sensor [{name}]")
+            return
+
+        if self.THREADED:
+            self._workers[name].submit(job, on_done)
+        else:
+            self._workers[name].run_now(job, on_done)
+
+    def get_latest(self, name: str) -> SensorReading | None:
+        """
+        Latest reading of the sensor, or None if it was never read.
+        """
+        if name not in self._workers:
+            return None
+        return self._workers[name].get_latest()
+
+    def add_listener(self, listener: callable):
+        """
+        Register a callable to be invoked with the sensor name every time a new reading is published.
+        It runs inside the worker thread, so it must be quick and thread safe.
+        """
+        self._listeners.append(listener)
+
+    def close(self):
+        for worker in self._workers.values():
+            worker.stop()
+
+    def _notify_listeners(self, name: str):
+        for listener in self._listeners:
+            listener(name)
+
+    def _on_worker_error(self, name: str, error: Exception):
+        self._xlog.error(f"🌡️ Error reading sensor [{name}]: {error}")
+        self._xlog.debug(full_stack())
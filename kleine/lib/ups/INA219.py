@@ -1,5 +1,6 @@
 import smbus2 as smbus
 import time
+from kleine.lib.utils.registers import Registers
 
 # Config Register (R/W)
 _REG_CONFIG                 = 0x00
@@ -72,7 +73,11 @@ class INA219:
 
     def read(self,address):
         data = self.bus.read_i2c_block_data(self.addr, address, 2)
-        return ((data[0] * 256 ) + data[1])
+        return Registers.uint16_be(data)
+
+    def read_signed(self,address):
+        data = self.bus.read_i2c_block_data(self.addr, address, 2)
+        return Registers.int16_be(data)[0]
 
     def write(self,address,data):
         temp = [0,0]
@@ -168,9 +173,7 @@ class INA219:
 
     def getShuntVoltage_mV(self):
         self.write(_REG_CALIBRATION,self._cal_value)
-        value = self.read(_REG_SHUNTVOLTAGE)
-        if value > 32767:
-            value -= 65535
+        value = self.read_signed(_REG_SHUNTVOLTAGE)
         return value * 0.01
 
     def getBusVoltage_V(self):
@@ -179,14 +182,10 @@ class INA219:
         return (self.read(_REG_BUSVOLTAGE) >> 3) * 0.004
 
     def getCurrent_mA(self):
-        value = self.read(_REG_CURRENT)
-        if value > 32767:
-            value -= 65535
+        value = self.read_signed(_REG_CURRENT)
         return value * self._current_lsb
 
     def getPower_W(self):
         self.write(_REG_CALIBRATION,self._cal_value)
-        value = self.read(_REG_POWER)
-        if value > 32767:
-            value -= 65535
+        value = self.read_signed(_REG_POWER)
         return value * self._power_lsb
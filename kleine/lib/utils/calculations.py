@@ -1,4 +1,6 @@
-from datetime import datetime, time, date
+from kleine.lib.utils.geodesy import Geodesy
+
+from datetime import time
 
 class Calculations:
 
@@ -13,41 +15,11 @@ class Calculations:
     @staticmethod
     def calculate_speed_between_points(previous_point: dict, current_point: dict, previous_time: time, current_time: time) -> float:
         """
-        Calculate speed between two GPS points given the time difference in seconds.
-        Haversine formula is used to calculate the distance between two latitude/longitude points.
+        Calculate speed in km/h between two GPS points given their GPS times of the day.
+        See Geodesy for the distance and for the midnight crossing.
         """
-        from math import radians, sin, cos, sqrt, atan2
-
-        R = 6371.0  # Radius of the Earth in kilometers
-
-        lat1 = radians(previous_point["latitude"])
-        lon1 = radians(previous_point["longitude"])
-        lat2 = radians(current_point["latitude"])
-        lon2 = radians(current_point["longitude"])
-
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-
-        a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-
-        a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-
-        distance_km = R * c
-        distance_nm = distance_km * 0.539957  # Convert km to nautical miles
-
-        current_date = date.today()
-        previous_time = datetime.combine(current_date, previous_time).timestamp()
-        current_time = datetime.combine(current_date, current_time).timestamp()
-
-        time_diff_secs = current_time - previous_time
-
-        if time_diff_secs > 0:
-            speed_knots = distance_nm / (time_diff_secs / 3600)  # Convert seconds to hours
-        else:
-            speed_knots = 0.0
-
-        return Calculations.knots_to_kmh(speed_knots)
+        distance = Geodesy.distance(
+            previous_point["latitude"], previous_point["longitude"],
+            current_point["latitude"], current_point["longitude"]
+        )
+        return Geodesy.speed_kmh(distance, Geodesy.seconds_between(previous_time, current_time))
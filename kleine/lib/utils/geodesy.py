@@ -0,0 +1,130 @@
+from datetime import time
+from typing import NamedTuple
+import math
+import numpy as np
+
+class GeoPoint(NamedTuple):
+    """
+    A position with its trigonometry already done, to reuse it with the next point.
+    """
+
+    latitude: float
+    longitude: float
+    # The same in radians
+    latitude_rad: float
+    longitude_rad: float
+    cos_latitude: float
+
+class Geodesy:
+    """
+    Distances, bearings and speeds over the Earth, as a sphere.
+
+    - Scalar functions for a single pair of positions in decimal degrees.
+    - GeoPoint versions for a stream of fixes: every fix is converted once with point()
+      and its cos(latitude) is reused when it becomes the previous point.
+    - Batch functions over numpy arrays of fixes, e.g. a recorded track.
+    """
+
+    EARTH_RADIUS_M: float = 6371000.0
+    SECONDS_PER_DAY: int = 86400
+
+    @staticmethod
+    def point(latitude: float, longitude: float) -> GeoPoint:
+        latitude_rad = math.radians(latitude)
+        return GeoPoint(latitude, longitude, latitude_rad, math.radians(longitude), math.cos(latitude_rad))
+
+    @staticmethod
+    def distance(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+        """
+        Great circle distance in metres (haversine)
+        """
+        return Geodesy.distance_between(Geodesy.point(latitude_1, longitude_1), Geodesy.point(latitude_2, longitude_2))
+
+    @staticmethod
+    def distance_between(previous: GeoPoint, current: GeoPoint) -> float:
+        sin_half_latitude = math.sin((current.latitude_rad - previous.latitude_rad) / 2)
+        sin_half_longitude = math.sin((current.longitude_rad - previous.longitude_rad) / 2)
+        a = sin_half_latitude * sin_half_latitude + \
+            previous.cos_latitude * current.cos_latitude * sin_half_longitude * sin_half_longitude
+        return 2 * Geodesy.EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+    @staticmethod
+    def bearing(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+        """
+        Initial bearing from the first position to the second, in degrees from the north [0, 360)
+        """
+        return Geodesy.bearing_between(Geodesy.point(latitude_1, longitude_1), Geodesy.point(latitude_2, longitude_2))
+
+    @staticmethod
+    def bearing_between(previous: GeoPoint, current: GeoPoint) -> float:
+        delta_longitude = current.longitude_rad - previous.longitude_rad
+        y = math.sin(delta_longitude) * current.cos_latitude
+        x = previous.cos_latitude * math.sin(current.latitude_rad) - \
+            math.sin(previous.latitude_rad) * current.cos_latitude * math.cos(delta_longitude)
+        return math.degrees(math.atan2(y, x)) % 360
+
+    @staticmethod
+    def speed_kmh(distance_m: float, seconds: float) -> float:
+        if seconds <= 0:
+            return 0.0
+        return distance_m / seconds * 3.6
+
+    @staticmethod
+    def seconds_between(previous_time: time, current_time: time) -> float:
+        """
+        Seconds from one GPS time of the day to the next one, also across midnight.
+        Fixes are expected less than 12 hours apart.
+        """
+        seconds = Geodesy.seconds_of_day(current_time) - Geodesy.seconds_of_day(previous_time)
+        if seconds < -Geodesy.SECONDS_PER_DAY / 2:
+            seconds += Geodesy.SECONDS_PER_DAY
+        elif seconds > Geodesy.SECONDS_PER_DAY / 2:
+            seconds -= Geodesy.SECONDS_PER_DAY
+        return seconds
+
+    @staticmethod
+    def seconds_of_day(value: time) -> float:
+        return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1000000
+
+    @staticmethod
+    def distances(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Metres between every pair of consecutive positions: n positions give n - 1 distances
+        """
+        latitudes_rad = np.radians(np.asarray(latitudes, dtype=np.float64))
+        longitudes_rad = np.radians(np.asarray(longitudes, dtype=np.float64))
+        if len(latitudes_rad) < 2:
+            return np.zeros(0)
+        cos_latitudes = np.cos(latitudes_rad)
+        a = np.sin(np.diff(latitudes_rad) / 2) ** 2 + \
+            cos_latitudes[:-1] * cos_latitudes[1:] * np.sin(np.diff(longitudes_rad) / 2) ** 2
+        return 2 * Geodesy.EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    @staticmethod
+    def bearings(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Bearing in degrees from every position to the next one: n positions give n - 1 bearings
+        """
+        latitudes_rad = np.radians(np.asarray(latitudes, dtype=np.float64))
+        longitudes_rad = np.radians(np.asarray(longitudes, dtype=np.float64))
+        if len(latitudes_rad) < 2:
+            return np.zeros(0)
+        cos_latitudes = np.cos(latitudes_rad)
+        sin_latitudes = np.sin(latitudes_rad)
+        delta_longitudes = np.diff(longitudes_rad)
+        y = np.sin(delta_longitudes) * cos_latitudes[1:]
+        x = cos_latitudes[:-1] * sin_latitudes[1:] - sin_latitudes[:-1] * cos_latitudes[1:] * np.cos(delta_longitudes)
+        return np.degrees(np.arctan2(y, x)) % 360
+
+    @staticmethod
+    def speeds(latitudes: np.ndarray, longitudes: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Speed in km/h between every pair of consecutive fixes, timestamps in seconds.
+        0 where the time does not advance.
+        """
+        distances = Geodesy.distances(latitudes, longitudes)
+        seconds = np.diff(np.asarray(timestamps, dtype=np.float64))
+        speeds = np.zeros(len(distances))
+        moving = seconds > 0
+        speeds[moving] = distances[moving] / seconds[moving] * 3.6
+        return speeds
@@ -0,0 +1,44 @@
+from functools import lru_cache
+import struct
+import numpy as np
+
+@lru_cache(maxsize=None)
+def _compiled(format: str) -> struct.Struct:
+    return struct.Struct(format)
+
+class Registers:
+    """
+    Decoding of the registers read from the I2C sensors.
+
+    The block reads of smbus2 come as lists of bytes. These turn them into 16 bit
+    integers in one go, with the two's complement done by struct or numpy:
+    - int16_le / int16_be: a few values, as a tuple of Python ints
+    - int16_array: a long block, e.g. a FIFO drain, as a numpy array
+    - uint16_be: a single unsigned register, most significant byte first
+    """
+
+    @staticmethod
+    def int16_le(data: list[int], count: int = 1, offset: int = 0) -> tuple[int, ...]:
+        """
+        `count` signed 16 bit values, least significant byte first, from the byte `offset`
+        """
+        return _compiled(f"<{count}h").unpack_from(bytes(data), offset)
+
+    @staticmethod
+    def int16_be(data: list[int], count: int = 1, offset: int = 0) -> tuple[int, ...]:
+        """
+        `count` signed 16 bit values, most significant byte first, from the byte `offset`
+        """
+        return _compiled(f">{count}h").unpack_from(bytes(data), offset)
+
+    @staticmethod
+    def uint16_be(data: list[int], offset: int = 0) -> int:
+        return _compiled(">H").unpack_from(bytes(data), offset)[0]
+
+    @staticmethod
+    def int16_array(data: bytes | list[int], little_endian: bool = True) -> np.ndarray:
+        """
+        All the signed 16 bit values of the block. An odd last byte is ignored.
+        """
+        data = bytes(data)
+        return np.frombuffer(data, dtype="<i2" if little_endian else ">i2", count=len(data) // 2)
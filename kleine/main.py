@@ -1,8 +1,10 @@
 from pyxavi import Config, Dictionary, full_stack, dd
 from kleine.lib.abstract.pyxavi import PyXavi
 
-from kleine.lib.objects.module_definitions import ModuleDefinitions, PowerActions
+from kleine.lib.objects.module_definitions import ModuleDefinitions, PowerActions, AccelerometerActions
 from kleine.lib.objects.gps_signal_quality import GPSSignalQuality
+from kleine.lib.objects.gps_link_state import GPSLinkState
+from kleine.lib.objects.wakeup_reason import WakeupReason
 
 from kleine.lib.accelerometer.accelerometer import Accelerometer
 from kleine.lib.air_pressure.air_pressure import AirPressure
@@ -10,6 +12,12 @@ from kleine.lib.temperature.temperature import Temperature
 from kleine.lib.ups.ups import Ups
 from kleine.lib.gpio.gpio import Gpio
 from kleine.lib.gps.gps import GPS
+from kleine.lib.gps.track_recorder import TrackRecorder
+from kleine.lib.gps.motion_estimator import MotionEstimator
+from kleine.lib.scheduler.wakeup import WakeupSignal
+from kleine.lib.scheduler.scheduler import Scheduler
+from kleine.lib.scheduler.frame_limiter import FrameLimiter
+from kleine.lib.sensors.sensor_hub import SensorHub
 
 from kleine.lib.lcd.lcd import Lcd
 from kleine.lib.canvas.canvas import Canvas
@@ -23,7 +31,7 @@ from kleine.lib.modules.display_cockpit import DisplayCockpit
 
 from kleine.lib.utils.maintenance import Maintenance
 from kleine.lib.utils.system import System
-from kleine.lib.utils.calculations import Calculations
+from kleine.lib.utils.geodesy import Geodesy
 
 import time, math
 
@@ -35,18 +43,50 @@ class Main(PyXavi):
     STATUSBAR_SHOW_GPS_SIGNAL_QUALITY: bool = True
     STATUSBAR_SHOW_WIFI_SIGNAL_STRENGTH: bool = True
 
+    # Default periods for the scheduled tasks. Each task can be tuned under scheduler.tasks in the config
     SECONDS_TO_REACT_FOR_TASKS: int = 2
     SECONDS_TO_REACT_FOR_REALTIME_TASKS: float = 0.25
+    SECONDS_TO_REACT_FOR_UPS: int = 10
+    SECONDS_TO_REACT_FOR_WIFI: int = 10
+    SECONDS_TO_REACT_FOR_ENVIRONMENT: int = 60
+    # Sleep on the wakeup signal between iterations instead of spinning
+    EVENT_DRIVEN: bool = True
+    # IMU axis pointing to the direction of travel, to help the speed estimation. None to not use the IMU
+    MOTION_IMU_AXIS: int = None
+    # Seconds after which an IMU reading is too old for the speed estimation
+    MOTION_IMU_MAX_AGE: float = 1.0
+
+    # GPS values drawn by each module. The status bar shows the signal quality in all of them.
+    GPS_VALUES_SHOWN_IN_MODULE = {
+        ModuleDefinitions.COCKPIT: ["speed", "altitude", "altitude_units"],
+        ModuleDefinitions.GPS: ["latitude", "direction_latitude", "longitude", "direction_longitude",
+                                "altitude", "altitude_units", "speed", "status", "num_sats", "link_state", "link_detail"],
+    }
 
-    # accelerometer: Accelerometer = None
+    accelerometer: Accelerometer = None
     air_pressure: AirPressure = None
     temperature: Temperature = None
     ups: Ups = None
     gpio: Gpio = None
     gps: GPS = None
+    track_recorder: TrackRecorder = None
+    motion_estimator: MotionEstimator = None
     lcd: Lcd = None
     canvas: Canvas = None
     maintenance: Maintenance = None
+    wakeup: WakeupSignal = None
+    scheduler: Scheduler = None
+    frame_limiter: FrameLimiter = None
+    sensor_hub: SensorHub = None
+    # Sequence of the last reading applied from each sensor of the hub
+    _applied_sensor_sequences: dict = None
+    # Sequence of the last GPS fix applied
+    _applied_gps_sequence: int = 0
+    # Module on screen
+    _current_module: str = None
+    # Wait message of the option action running in a sensor thread, and its result once done
+    _running_action_message: str = None
+    _finished_action_result: str = None
 
     # All DisplayModules classes should have its own instance here
     display: Display = None
@@ -57,9 +97,6 @@ class Main(PyXavi):
     display_gps: DisplayGPS = None
     display_cockpit: DisplayCockpit = None
 
-    _last_processed_minute: int = -1
-    _last_processed_second: int = -1
-    _last_processed_millisecond: int = -1
     gathered_values: Dictionary = Dictionary({
         "temperature": 0,
         "humidity": 0,
@@ -80,7 +117,9 @@ class Main(PyXavi):
             "speed": None,
             "heading": None,
             "signal_quality": 0,
-            "num_sats": 0
+            "num_sats": 0,
+            "link_state": None,
+            "link_detail": None,
         },
         "wifi": {
             "ssid": None,
@@ -103,6 +142,10 @@ class Main(PyXavi):
     # Options tree for each module.
     # Important!! The index is the order of the options in the module.
     options_tree = {
+        ModuleDefinitions.ACCELEROMETER: [
+            AccelerometerActions.CALIBRATE_MAGNETOMETER,
+            AccelerometerActions.CALIBRATE_GYROSCOPE,
+        ],
         ModuleDefinitions.POWER: [
             PowerActions.POWER_SLEEP,
             PowerActions.POWER_SHUTDOWN,
@@ -110,6 +153,11 @@ class Main(PyXavi):
             PowerActions.POWER_UPDATE_RESTART,
         ],
     }
+    # Message shown while an option runs, when it needs something from the user
+    options_wait_messages = {
+        AccelerometerActions.CALIBRATE_MAGNETOMETER: "Rotate it\nin all directions",
+        AccelerometerActions.CALIBRATE_GYROSCOPE: "Keep it still...",
+    }
 
     def __init__(self, config: Config = None, params: Dictionary = None):
         super(Main, self).init_pyxavi(config=config, params=params)
@@ -124,6 +172,11 @@ class Main(PyXavi):
         seconds = self._xconfig.get("scheduler.update_interval", self.SECONDS_TO_REACT_FOR_TASKS)
         if seconds >= 1 and seconds <= 60:
             self.SECONDS_TO_REACT_FOR_TASKS = seconds
+        self.EVENT_DRIVEN = self._xconfig.get("scheduler.event_driven", self.EVENT_DRIVEN)
+        self.MOTION_IMU_AXIS = self._xconfig.get("gps.motion.imu_axis", self.MOTION_IMU_AXIS)
+
+        # The main loop sleeps on this signal. Buttons and sensors wake it up.
+        self.wakeup = WakeupSignal()
 
         # Initialise the LCD display
         self._xlog.info("Initialising LCD device")
@@ -171,10 +224,22 @@ class Main(PyXavi):
         # Initialise the GPIO
         self._xlog.info("Initialising GPIO")
         self.gpio = Gpio(config=self._xconfig, params=self._xparams)
+        self.gpio.set_event_listener(lambda button_name: self.wakeup.notify(WakeupReason.BUTTON))
 
         # Initialise the GPS
         self._xlog.info("Initialising GPS")
         self.gps = GPS(config=self._xconfig, params=self._xparams)
+        self.gps.add_listener(lambda: self.wakeup.notify(WakeupReason.GPS))
+
+        # Initialise the Track Recorder, it keeps every fix in the storage
+        self._xlog.info("Initialising Track Recorder")
+        self.track_recorder = TrackRecorder(config=self._xconfig, params=Dictionary({
+            "gps": self.gps
+        }))
+
+        # Initialise the Motion Estimator, for a stable speed and heading
+        self._xlog.info("Initialising Motion Estimator")
+        self.motion_estimator = MotionEstimator(config=self._xconfig, params=self._xparams)
 
         # # Initialise the accelerometer
         self._xlog.info("Initialising accelerometer.")
@@ -192,6 +257,13 @@ class Main(PyXavi):
         self._xlog.info("Initialising UPS")
         self.ups = Ups(config=self._xconfig, params=self._xparams)
 
+        # Initialise the Sensor Hub, so the sensors are read outside the main loop
+        self._xlog.info("Initialising Sensor Hub")
+        self.sensor_hub = SensorHub(config=self._xconfig, params=self._xparams)
+        self._applied_sensor_sequences = {}
+        self.register_sensors()
+        self.sensor_hub.add_listener(lambda sensor_name: self.wakeup.notify(WakeupReason.SENSOR))
+
         # Initialise the Maintenance utility
         self._xlog.info("Initialising Maintenance utility")
         self.maintenance = Maintenance(config=self._xconfig, params=Dictionary({
@@ -199,6 +271,17 @@ class Main(PyXavi):
             "mocked_paths": [self._xconfig.get("storage.mocked_files.lcd")]
         }))
 
+        # Initialise the Scheduler and register the periodic tasks
+        self._xlog.info("Initialising Scheduler")
+        self.scheduler = Scheduler(config=self._xconfig, params=Dictionary({
+            "default_period": self.SECONDS_TO_REACT_FOR_TASKS
+        }))
+        self.register_scheduled_tasks()
+
+        # Initialise the Frame Limiter, so all the refresh requests of a frame end up in one render
+        self._xlog.info("Initialising Frame Limiter")
+        self.frame_limiter = FrameLimiter(config=self._xconfig, params=self._xparams)
+
     def run(self):
 
         self._xlog.info("🚀 Starting Kleine main run")
@@ -227,6 +310,14 @@ class Main(PyXavi):
         try:
             while True:
 
+                # Sleep until something happens: a button press, new GPS data, the next task deadline
+                # or the moment the pending frame fits in the frame budget.
+                # With the event driven mode disabled the timeout is 0, so we poll as we used to.
+                if self.EVENT_DRIVEN and not refresh_again and selected_module != -1:
+                    wakeup_reasons = self.wakeup.wait(timeout=self._seconds_to_sleep())
+                else:
+                    wakeup_reasons = self.wakeup.wait(timeout=0)
+
                 # Accumulate the Should Refresh flag along the actions
                 should_refresh = refresh_again or selected_module == -1
 
@@ -234,14 +325,8 @@ class Main(PyXavi):
                 # It comes from the previous loop iteration, in case we showed a modal message
                 refresh_again = False
 
-                # Check the things to do every minute
-                should_refresh = self.do_every_minute_tasks() or should_refresh
-
-                # Check the things to do every given seconds
-                should_refresh = self.do_every_seconds_tasks(selected_module) or should_refresh
-
-                # Check real-time tasks
-                should_refresh = self.do_real_time_tasks(selected_module) or should_refresh
+                # Buttons want an immediate answer, they skip the frame budget
+                button_pressed = WakeupReason.BUTTON in wakeup_reasons or selected_module == -1
 
                 # Handle module selection by pressing the Yellow button or at startup
                 if self.gpio.is_button_pressed("yellow") or selected_module == -1:
@@ -253,8 +338,11 @@ class Main(PyXavi):
                                     self.application_modules[selected_module])
                     # Reset option selection when changing module
                     selected_option_in_module = -1
-                    time.sleep(0.2) # Debounce delay
                     should_refresh = True
+                    # Tasks that the new module needs become due, the others stop
+                    self.scheduler.set_current_module(self.application_modules[selected_module])
+                    self.frame_limiter.set_current_module(self.application_modules[selected_module])
+                    self._current_module = self.application_modules[selected_module]
                 
                 # Handle option selection in the current module by pressing the Blue button
                 if self.gpio.is_button_pressed("blue"):
@@ -267,7 +355,6 @@ class Main(PyXavi):
                         self._xlog.info("Blue button pressed - moving to next option in module " + 
                                         self.application_modules[selected_module] + 
                                         ": " + options_in_current_module[selected_option_in_module])
-                        time.sleep(0.2) # Debounce delay
                         should_refresh = True
                 
                 # Handle action in the current module by pressing the Green button
@@ -281,14 +368,14 @@ class Main(PyXavi):
                                         ": " + option_key)
                         
                         # This is a bit hacky, but we want to show a "Please wait" modal message while performing the action.
-                        modal_message = "Please wait..."
+                        modal_message = self.options_wait_messages.get(option_key, "Please wait...")
                         self.refresh_screen(
                             selected_module=selected_module,
                             selected_option_in_module=selected_option_in_module,
                             modal_message=modal_message,
-                            modal_wait=modal_wait,
-                            refresh_again=refresh_again
+                            modal_wait=modal_wait
                         )
+                        self.frame_limiter.rendered()
 
                         # Now trigger the action
                         modal_message = self.trigger_selected_option_action(
@@ -304,19 +391,44 @@ class Main(PyXavi):
                             # Wait for the modal message to be acknowledged
                             modal_wait = True
 
-                    time.sleep(0.2) # Debounce delay
+                # Run the tasks that are due for the current module
+                should_refresh = self.scheduler.run_due_tasks() or should_refresh
 
-                # Run the selected module.
-                # Must happen after the button press handling to avoid skipping modules.
+                # Pick up whatever the sensor threads read since the last iteration
+                should_refresh = self.apply_sensor_readings() or should_refresh
+
+                # An option action that ran in a sensor thread finished, show how it went
+                if self._finished_action_result is not None:
+                    modal_message, self._finished_action_result = self._finished_action_result, None
+                    self._xlog.info(f"Action result: {modal_message}")
+                    should_refresh = True
+                    modal_wait = True
+
+                # New GPS data was pushed by the reader thread, no need to wait for the next task
+                if WakeupReason.GPS in wakeup_reasons and \
+                    self.application_modules[selected_module] in [ModuleDefinitions.COCKPIT, ModuleDefinitions.GPS]:
+                    should_refresh = self.refresh_gps_data() or should_refresh
+
+                # Everything that asked for a refresh in this iteration is a single frame request
                 if should_refresh:
+                    self.frame_limiter.request(urgent=button_pressed)
 
-                    self.refresh_screen(
+                # Run the selected module, once the frame budget allows it.
+                # Must happen after the button press handling to avoid skipping modules.
+                if self.frame_limiter.should_render():
+
+                    refresh_again = self.refresh_screen(
                         selected_module=selected_module,
                         selected_option_in_module=selected_option_in_module,
                         modal_message=modal_message,
-                        modal_wait=modal_wait,
-                        refresh_again=refresh_again
+                        modal_wait=modal_wait
                     )
+                    self.frame_limiter.rendered()
+
+                    # The modal message was shown, the next frame removes it
+                    if refresh_again:
+                        modal_message = ""
+                        modal_wait = False
 
         except Exception as e:
             self._xlog.error(f"Exception in main run: {e}")
@@ -331,11 +443,14 @@ class Main(PyXavi):
                        selected_module: int, 
                        selected_option_in_module: int, 
                        modal_message: str, 
-                       modal_wait: bool,
-                       refresh_again: bool = False):
+                       modal_wait: bool) -> bool:
         """
         Refresh the screen based on the selected module and option.
+        Returns True if the given modal message was shown and the screen needs another refresh to remove it.
         """
+        # The "No GPS signal" message below is not cleared this way, it stays while there is no signal
+        refresh_again = False
+        requested_modal_message = modal_message
 
         # Interfere in the drawing of the screen in case we need to say something
         NO_SIGNAL = "No GPS signal detected"
@@ -348,6 +463,10 @@ class Main(PyXavi):
             else:
                 modal_message = ""
 
+        # Keep saying that we wait while an option action runs in the background
+        if modal_message == "" and self._running_action_message is not None:
+            modal_message = self._running_action_message
+
         # Prepare the statusbar info common to all modules
         shared_data = Dictionary({
             # Data for the status bar
@@ -389,6 +508,7 @@ class Main(PyXavi):
                 "gyroscope": self.gathered_values.get("gyroscope"),
                 "magnetometer": self.gathered_values.get("magnetometer"),
                 "pitch_roll_yaw": self.gathered_values.get("pitch_roll_yaw"),
+                "selected_option": options_in_current_module[selected_option_in_module] if selected_option_in_module != -1 else ""
             })))
         
         # Cockpit module
@@ -441,130 +561,161 @@ class Main(PyXavi):
             modal_wait = False
             # And refresh the screen again to remove it
             self._xlog.debug("Clearing modal message after showing it.")
-            refresh_again = True
+            refresh_again = requested_modal_message != ""
 
-    def do_real_time_tasks(self, selected_module: int) -> bool:
-        """
-        Tasks that need to be done in real-time.
-        Returns True if refreshing the screen is needed, False otherwise.
+        return refresh_again
 
-        We really can't do trully realtime, as it monopolises the main thread.
-        We'll do a fraction of a second to allow other processes to run.
+    def _seconds_to_sleep(self) -> float | None:
+        """
+        Time the main loop can sleep: until the next task is due or the pending frame can be rendered.
+        """
+        deadlines = [
+            seconds for seconds in [self.scheduler.seconds_until_next_task(), self.frame_limiter.seconds_until_next_frame()]
+            if seconds is not None
+        ]
+        return min(deadlines) if len(deadlines) > 0 else None
 
-        Will not do too much logging here, as it pollutes the logs a lot.
+    def register_scheduled_tasks(self):
+        """
+        Register the periodic tasks with their default periods and the modules that need them.
+        Periods, jitter and visibility can be changed from the config under scheduler.tasks.<name>.
         """
 
-        current_millisecond = int(time.time() * 1000)
-        triggering_millisecond = self._last_processed_millisecond + self.SECONDS_TO_REACT_FOR_REALTIME_TASKS * 1000
-        if current_millisecond >= triggering_millisecond:
-            self._last_processed_millisecond = current_millisecond
+        # The clock in the status bar changes at every minute
+        self.scheduler.register("clock", self.refresh_clock, period=60, align=True)
 
-            if self.application_modules[selected_module] == ModuleDefinitions.ACCELEROMETER:
-                self._xlog.debug("🕐 Realtime: Running accelerometer module")
+        # Temperature, humidity and air pressure. The temperature module needs them even
+        # when the status bar does not show the temperature.
+        self.scheduler.register("environment", self.refresh_environment_data,
+                                period=self.SECONDS_TO_REACT_FOR_ENVIRONMENT,
+                                only_in_modules=None if self.STATUSBAR_SHOW_TEMPERATURE else [ModuleDefinitions.TEMPERATURE])
 
-                # Get accelerometer values
-                accel_x, accel_y, accel_z = self.accelerometer.get_accelerometer_values()
-                gyro_x, gyro_y, gyro_z = self.accelerometer.get_gyroscope_values()
-                mag_x, mag_y, mag_z = self.accelerometer.get_magnetometer_values()
-                # temp = self.accelerometer.get_temperature()
-                pitch, roll, yaw = self.accelerometer.get_pitch_roll_yaw()
+        # UPS battery status
+        if self.STATUSBAR_SHOW_BATTERY:
+            self.scheduler.register("ups", self.refresh_ups_data, period=self.SECONDS_TO_REACT_FOR_UPS, jitter=2)
 
-                self.gathered_values.set("acceleration", (accel_x, accel_y, accel_z))
-                self.gathered_values.set("gyroscope", (gyro_x, gyro_y, gyro_z))
-                self.gathered_values.set("magnetometer", (mag_x, mag_y, mag_z))
-                self.gathered_values.set("pitch_roll_yaw", (pitch, roll, yaw))
+        # GPS at the rate the receiver produces fixes
+        self.scheduler.register("gps", self.refresh_gps_data,
+                                period=self._xconfig.get("gps.hardware.update_interval_ms", 1000) / 1000)
 
-                return True
-            
-            if self.application_modules[selected_module] == ModuleDefinitions.COCKPIT:
-                self._xlog.debug("🕐 Realtime: Running cockpit module")
+        # WiFi, which spawns a process to ask the system
+        self.scheduler.register("wifi", self.refresh_wifi_data, period=self.SECONDS_TO_REACT_FOR_WIFI, jitter=2)
 
-                return self.refresh_gps_data()
+        # Accelerometer, gyroscope and magnetometer are only shown in their module
+        self.scheduler.register("imu", self.refresh_imu_data,
+                                period=self.SECONDS_TO_REACT_FOR_REALTIME_TASKS,
+                                only_in_modules=[ModuleDefinitions.ACCELEROMETER])
 
+    def refresh_clock(self) -> bool:
+        if self.STATUSBAR_SHOW_TIME:
+            self._xlog.debug("🕐 New minute detected. Time change requires screen refresh.")
+            return True
         return False
-    
-    def do_every_seconds_tasks(self, selected_module: int, seconds: int = None) -> bool:
+
+    def register_sensors(self):
         """
-        Tasks that need to be done every given seconds.
-        Returns True if refreshing the screen is needed, False otherwise.
+        Register the I2C sensors in the hub. Each reader runs in its own worker thread.
+        """
+        self.sensor_hub.add_sensor("temperature", lambda: {
+            "temperature": self.temperature.get_temperature(),
+            "humidity": self.temperature.get_humidity(),
+        })
+        self.sensor_hub.add_sensor("air_pressure", lambda: {
+            "air_pressure": self.air_pressure.get_air_pressure(),
+        })
+        self.sensor_hub.add_sensor("ups", lambda: {
+            "battery_percentage": self.ups.get_battery_percentage(),
+            "battery_is_charging": self.ups.is_charging(),
+        })
+        self.sensor_hub.add_sensor("imu", self.read_imu_values)
+
+    def read_imu_values(self) -> dict:
+        # Runs in the IMU worker thread
+        snapshot = self.accelerometer.snapshot()
+        return {
+            "acceleration": snapshot.acceleration,
+            "gyroscope": snapshot.gyroscope,
+            "magnetometer": snapshot.magnetometer,
+            "pitch_roll_yaw": snapshot.pitch_roll_yaw,
+        }
 
-        Will not do too much logging here, as it pollutes the logs a lot.
+    def refresh_environment_data(self) -> bool:
+        self.sensor_hub.request("temperature")
+        self.sensor_hub.request("air_pressure")
+        # The values arrive later through apply_sensor_readings()
+        return False
+
+    def refresh_imu_data(self) -> bool:
+        self.sensor_hub.request("imu")
+        return False
+
+    def refresh_ups_data(self) -> bool:
+        self.sensor_hub.request("ups")
+        return False
+
+    def apply_sensor_readings(self) -> bool:
+        """
+        Copy into gathered_values the sensor readings that we did not apply yet.
+        Returns True if any displayed value changed.
         """
         return_value = False
 
-        if seconds is None:
-            seconds = self.SECONDS_TO_REACT_FOR_TASKS
+        for sensor_name, apply_method in [
+            ("temperature", self._apply_temperature_reading),
+            ("air_pressure", self._apply_air_pressure_reading),
+            ("ups", self._apply_ups_reading),
+            ("imu", self._apply_imu_reading),
+        ]:
+            reading = self.sensor_hub.get_latest(sensor_name)
+            if reading is None or reading.sequence == self._applied_sensor_sequences.get(sensor_name):
+                continue
+            self._applied_sensor_sequences[sensor_name] = reading.sequence
+            return_value = apply_method(reading.values) or return_value
 
-        current_second = int(time.time())
-        triggering_second = self._last_processed_second + seconds
-        if current_second >= triggering_second:
-            self._last_processed_second = current_second
-            self._xlog.debug("🕐 New second detected: " + str(time.localtime(current_second).tm_sec) + f". Running every-second {self.SECONDS_TO_REACT_FOR_TASKS}s tasks.")
+        return return_value
+
+    def _apply_temperature_reading(self, values: dict) -> bool:
+        return_value = False
 
-            # Obtain the UPS battery status
-            if self.STATUSBAR_SHOW_BATTERY:
-                return_value = self.refresh_ups_data() or return_value
+        current_temperature = round(values["temperature"], 1)
+        if current_temperature != self.gathered_values.get("temperature", 0):
+            self.gathered_values.set("temperature", current_temperature)
+            return_value = True
 
-            # Obtain the GPS data
-            return_value = self.refresh_gps_data() or return_value
+        current_humidity = round(values["humidity"], 1)
+        if current_humidity != self.gathered_values.get("humidity", 0):
+            self.gathered_values.set("humidity", current_humidity)
+            return_value = True
 
-            # Obtain the WiFi data
-            return_value = self.refresh_wifi_data() or return_value
+        if return_value:
+            self._xlog.info(f"Updated gathered values: Temperature={self.gathered_values.get('temperature')}°C, Humidity={self.gathered_values.get('humidity')}%")
 
         return return_value
 
-    def do_every_minute_tasks(self) -> bool:
-        """
-        Tasks that need to be done every minute.
-        Returns True if refreshing the screen is needed, False otherwise.
-        """
-        current_minute = time.localtime().tm_min
-        if current_minute != self._last_processed_minute:
-            self._last_processed_minute = current_minute
-            self._xlog.debug("🕐 New minute detected: " + str(current_minute) + ". Running every-minute tasks.")
-
-            # By default we do not need to refresh the screen
-            return_value = False
-
-            # Get temperature and humidity from the temperature sensor
-            if self.STATUSBAR_SHOW_TEMPERATURE:
-                current_temperature = round(self.temperature.get_temperature(), 1)
-                if current_temperature != self.gathered_values.get("temperature", 0):
-                    self.gathered_values.set("temperature", current_temperature)
-                    return_value = True
-
-                current_humidity = round(self.temperature.get_humidity(), 1)
-                if current_humidity != self.gathered_values.get("humidity", 0):
-                    self.gathered_values.set("humidity", current_humidity)
-                    return_value = True
-
-                current_air_pressure = round(self.air_pressure.get_air_pressure(), 1)
-                if current_air_pressure != self.gathered_values.get("air_pressure", 0):
-                    self.gathered_values.set("air_pressure", current_air_pressure)
-                    return_value = True
-
-                if return_value:
-                    self._xlog.info(f"Updated gathered values: Temperature={self.gathered_values.get('temperature')}°C, Humidity={self.gathered_values.get('humidity')}%, Air Pressure={self.gathered_values.get('air_pressure')} hPa")
-
-            if self.STATUSBAR_SHOW_TIME:
-                self._xlog.debug("Time change requires screen refresh.")
-                return_value = True
-
-            # We have a status change
-            return return_value
-        
-        # No change in minute, no tasks to do
+    def _apply_air_pressure_reading(self, values: dict) -> bool:
+        current_air_pressure = round(values["air_pressure"], 1)
+        if current_air_pressure != self.gathered_values.get("air_pressure", 0):
+            self.gathered_values.set("air_pressure", current_air_pressure)
+            self._xlog.info(f"Updated gathered values: Air Pressure={current_air_pressure} hPa")
+            return True
         return False
 
-    def refresh_ups_data(self) -> bool:
+    def _apply_imu_reading(self, values: dict) -> bool:
+        self.gathered_values.set("acceleration", values["acceleration"])
+        self.gathered_values.set("gyroscope", values["gyroscope"])
+        self.gathered_values.set("magnetometer", values["magnetometer"])
+        self.gathered_values.set("pitch_roll_yaw", values["pitch_roll_yaw"])
+        return True
+
+    def _apply_ups_reading(self, values: dict) -> bool:
         return_value = False
 
-        current_battery_percentage = math.ceil(self.ups.get_battery_percentage())
+        current_battery_percentage = math.ceil(values["battery_percentage"])
         if current_battery_percentage != self.gathered_values.get("battery_percentage", 0):
             self.gathered_values.set("battery_percentage", current_battery_percentage)
             return_value = True
 
-        current_battery_is_charging = self.ups.is_charging()
+        current_battery_is_charging = values["battery_is_charging"]
         if current_battery_is_charging != self.gathered_values.get("battery_is_charging", False):
             self.gathered_values.set("battery_is_charging", current_battery_is_charging)
             return_value = True
@@ -590,35 +741,38 @@ class Main(PyXavi):
         return True
     
     def refresh_gps_data(self) -> bool:
-        gps_info = self.gps.get_position()
+        # The state of the link changes even when no fix arrives
+        link_changed = self._apply_gps_health() and \
+            "link_state" in self.GPS_VALUES_SHOWN_IN_MODULE.get(self._current_module, [])
+
+        fix = self.gps.get_latest_fix()
+
+        # Nothing new since the last time: don't recompute anything
+        if fix is None or fix.sequence == self._applied_gps_sequence:
+            return link_changed
+        self._applied_gps_sequence = fix.sequence
+        gps_info = fix.values
 
         if gps_info is None or isinstance(gps_info, dict) is False:
-            return False
+            return link_changed
         
         # We're supposed to have always the signal quality
         self.gathered_values.get("gps")["signal_quality"] = gps_info.get("signal_quality", 0)
 
         if gps_info.get("latitude", None) is None or gps_info.get("longitude", None) is None:
-            return False
+            return link_changed
 
-        # Calculate speed based on previous position
-        previous_time = self.gathered_values.get("gps", {}).get("timestamp", None)
-        current_time = gps_info.get("timestamp", None)
-        previous_point = {
-            "latitude": self.gathered_values.get("gps", {}).get("latitude", 0.0),
-            "longitude": self.gathered_values.get("gps", {}).get("longitude", 0.0),
-        }
-        current_point = {
-            "latitude": gps_info.get("latitude", 0.0),
-            "longitude": gps_info.get("longitude", 0.0),
-        }
-        if previous_time is None or current_time is None:
-            speed = None
-        else:
-            speed = round(Calculations.calculate_speed_between_points(
-                previous_point, current_point, previous_time, current_time), 1)
+        # Smooth the speed and heading from the receiver's values and the position deltas
+        self.motion_estimator.update(
+            gps_time=gps_info.get("timestamp", None),
+            point=Geodesy.point(gps_info.get("latitude"), gps_info.get("longitude")),
+            speed=gps_info.get("speed", None),
+            course=gps_info.get("heading", None),
+            acceleration=self._get_forward_acceleration()
+        )
 
         # Now update gathered values
+        previous_gps_values = self.gathered_values.get("gps")
         self.gathered_values.set("gps", {
             "latitude": gps_info.get("latitude", 0.0),
             "longitude": gps_info.get("longitude", 0.0),
@@ -628,18 +782,86 @@ class Main(PyXavi):
             "altitude_units": gps_info.get("altitude_units", None),
             "timestamp": gps_info.get("timestamp", None),
             "status": gps_info.get("status", None),
-            "speed": speed,
-            "heading": gps_info.get("heading", None),
+            "speed": self.motion_estimator.speed,
+            "heading": self.motion_estimator.heading,
             "signal_quality": gps_info.get("signal_quality", GPSSignalQuality.SIGNAL_UNKNOWN),
             "num_sats": gps_info.get("num_sats", 0),
+            "link_state": previous_gps_values.get("link_state"),
+            "link_detail": previous_gps_values.get("link_detail"),
         })
-        return True
+
+        # Only refresh the screen if a value that the current module shows has changed
+        return any(
+            previous_gps_values.get(key) != self.gathered_values.get("gps").get(key)
+            for key in ["signal_quality"] + self.GPS_VALUES_SHOWN_IN_MODULE.get(self._current_module, [])
+        )
+
+    def _apply_gps_health(self) -> bool:
+        """
+        Copy the state of the link with the receiver into gathered_values.
+        The detail is the seconds without data while stale, or until the next attempt while reconnecting.
+        Returns True if it changed.
+        """
+        health = self.gps.get_health()
+        if health.state == GPSLinkState.STALE and health.seconds_since_data is not None:
+            detail = int(health.seconds_since_data)
+        elif health.state == GPSLinkState.RECONNECTING and health.retry_in is not None:
+            detail = math.ceil(health.retry_in)
+        else:
+            detail = None
+
+        gps_values = self.gathered_values.get("gps")
+        if gps_values.get("link_state") != health.state:
+            self._xlog.info(f"🛰️ GPS link is {health.state} ({health.reconnects} reconnects, {health.parse_errors} parse errors)")
+        changed = gps_values.get("link_state") != health.state or gps_values.get("link_detail") != detail
+        gps_values["link_state"] = health.state
+        gps_values["link_detail"] = detail
+        return changed
+
+    def _get_forward_acceleration(self) -> float | None:
+        """
+        Acceleration in m/s2 along the direction of travel, from the IMU axis configured
+        in gps.motion.imu_axis. None if not configured or if the last reading is too old.
+        """
+        if self.MOTION_IMU_AXIS is None:
+            return None
+
+        # Keep the IMU readings coming while the GPS is in use
+        self.sensor_hub.request("imu")
+        reading = self.sensor_hub.get_latest("imu")
+        if reading is None or time.time() - reading.timestamp > self.MOTION_IMU_MAX_AGE:
+            return None
+        return reading.values["acceleration"][self.MOTION_IMU_AXIS] / self.accelerometer.ACCELERATION_LSB_PER_G * 9.80665
 
     def trigger_selected_option_action(self, module_name: str, option_key: str) -> str:
         self._xlog.info(f"Triggering action for {module_name}, option: {option_key}")
         returning_value = ""
 
-        if module_name == ModuleDefinitions.POWER:
+        if module_name == ModuleDefinitions.ACCELEROMETER:
+
+            # The calibrations use the IMU for a while, they run in its sensor thread
+            if self._running_action_message is not None:
+                returning_value = "Still calibrating"
+
+            elif option_key == AccelerometerActions.CALIBRATE_MAGNETOMETER:
+                self.run_action_in_sensor(
+                    sensor_name="imu",
+                    option_key=option_key,
+                    job=self.accelerometer.calibrate_magnetometer,
+                    success_message="Compass calibrated",
+                    failure_message="Calibration failed"
+                )
+
+            elif option_key == AccelerometerActions.CALIBRATE_GYROSCOPE:
+                self.run_action_in_sensor(
+                    sensor_name="imu",
+                    option_key=option_key,
+                    job=self.accelerometer.calibrate_gyroscope,
+                    success_message="Gyro calibrated",
+                    failure_message="Calibration failed"
+                )
+
+        elif module_name == ModuleDefinitions.POWER:
 
             if option_key == PowerActions.POWER_SLEEP:
                 if self._xconfig.get("ups.mock", False):
@@ -680,6 +902,22 @@ class Main(PyXavi):
         return returning_value
 
 
+    def run_action_in_sensor(self, sensor_name: str, option_key: str, job: callable,
+                             success_message: str, failure_message: str):
+        """
+        Run a long option action in the thread of the sensor it uses. Its wait message stays
+        on screen meanwhile, and the main loop shows the result once the job returns.
+        """
+        self._running_action_message = self.options_wait_messages.get(option_key, "Please wait...")
+
+        def on_done(result):
+            # Runs in the sensor thread
+            self._running_action_message = None
+            self._finished_action_result = success_message if result else failure_message
+            self.wakeup.notify(WakeupReason.SENSOR)
+
+        self.sensor_hub.submit(sensor_name, job, on_done)
+
     def close_nicely(self):
         self._xlog.debug("Closing nicely")
 
@@ -690,6 +928,9 @@ class Main(PyXavi):
                 "statusbar_active": False
             }))
 
+        if self.frame_limiter is not None:
+            self._xlog.debug(f"Frame requests: {self.frame_limiter.get_stats()}")
+
         # Close the LCD
         if self.lcd is not None:
             self._xlog.debug("Closing LCD")
@@ -700,6 +941,16 @@ class Main(PyXavi):
             self._xlog.debug("Closing GPIO")
             self.gpio.close()
 
+        # Stop the sensor threads before closing the drivers they use
+        if self.sensor_hub is not None:
+            self._xlog.debug("Closing Sensor Hub")
+            self.sensor_hub.close()
+
+        # Stop the IMU sampling thread
+        if self.accelerometer is not None:
+            self._xlog.debug("Closing Accelerometer")
+            self.accelerometer.close()
+
         # Close the UPS
         if self.ups is not None:
             self._xlog.debug("Closing UPS")
@@ -709,3 +960,8 @@ class Main(PyXavi):
         if self.gps is not None:
             self._xlog.debug("Closing GPS")
             self.gps.close()
+
+        # Once the GPS stopped, write what is left of the track
+        if self.track_recorder is not None:
+            self._xlog.debug("Closing Track Recorder")
+            self.track_recorder.close()